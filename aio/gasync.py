@@ -0,0 +1,484 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+import httplib2
+import httpx
+from google.auth.transport.requests import Request
+from googleapiclient.errors import HttpError
+
+from batch.gbatch import BatchResult, failure_summary
+from event.gevent import event_body, event_patch
+from gcalendar.gcalendar import MAX_PAGE_SIZE, calendar_body, calendar_patch
+from quota.gquota import failure_reason
+from telemetry.gtelemetry import Telemetry, default_telemetry
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://www.googleapis.com/calendar/v3/"
+
+
+def _path(*parts: str) -> str:
+    """Сборка пути ресурса с экранированием идентификаторов."""
+    return "/".join(quote(part, safe="") for part in parts)
+
+
+def _method_name(method: str, path: str) -> str:
+    """Метка запроса для метрик: идентификаторы в пути заменяются на *."""
+    parts = path.strip("/").split("/")
+    return " ".join(
+        [method, "/".join(p if i % 2 == 0 else "*" for i, p in enumerate(parts))]
+    )
+
+
+class AsyncClient:
+    def __init__(
+        self,
+        credentials,
+        max_concurrency: int = 100,
+        base_url: str = BASE_URL,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        telemetry: Optional[Telemetry] = None,
+    ):
+        """Асинхронный HTTP-клиент Calendar API с пулом keep-alive соединений.
+
+        Семафор ограничивает число одновременных запросов клиента.
+        """
+        self.credentials = credentials
+        self.max_concurrency = max_concurrency
+        self.telemetry = telemetry if telemetry is not None else default_telemetry()
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+        # Примитивы asyncio создаются внутри работающего цикла событий
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        body: Optional[dict] = None,
+        headers: Optional[dict] = None,
+    ) -> dict:
+        """Выполнение запроса; ошибки HTTP поднимаются как HttpError."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        name = _method_name(method, path)
+        with self.telemetry.span(name):
+            async with self._semaphore:
+                headers = await self._authorize(dict(headers or {}))
+                started = time.perf_counter()
+                response = await self._http.request(
+                    method, path, params=params, json=body, headers=headers
+                )
+                elapsed = time.perf_counter() - started
+            error = None
+            if response.status_code >= 300:
+                resp = httplib2.Response(
+                    {"status": response.status_code, **response.headers}
+                )
+                resp.reason = response.reason_phrase
+                error = HttpError(resp, response.content, uri=str(response.url))
+            self.telemetry.observe(
+                name,
+                elapsed,
+                len(response.request.content),
+                len(response.content),
+                failure_reason(error) if error is not None else None,
+            )
+            if error is not None:
+                raise error
+        if not response.content:
+            return {}
+        return response.json()
+
+    async def close(self):
+        await self._http.aclose()
+
+    async def _authorize(self, headers: dict) -> dict:
+        if self.credentials is None:
+            return headers
+        if not self.credentials.valid:
+            if self._refresh_lock is None:
+                self._refresh_lock = asyncio.Lock()
+            async with self._refresh_lock:
+                if not self.credentials.valid:
+                    # Обновление токена блокирующее, выносим его в поток
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(
+                        None, self.credentials.refresh, Request()
+                    )
+        self.credentials.apply(headers)
+        return headers
+
+
+async def _gather_results(items: list, coroutine) -> List[BatchResult]:
+    """Параллельное выполнение операций с привязкой результата к входу."""
+
+    async def run(index, item):
+        result = BatchResult(index, item)
+        result.attempts = 1
+        try:
+            result.response = await coroutine(item)
+        except Exception as e:
+            result.error = e
+        return result
+
+    return list(await asyncio.gather(*(run(i, item) for i, item in enumerate(items))))
+
+
+class AsyncGCalendar:
+    def __init__(
+        self,
+        gapi_workspace,
+        max_concurrency: int = 100,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """Асинхронный вариант GCalendar."""
+        self.client = AsyncClient(
+            gapi_workspace.get_credentials(),
+            max_concurrency=max_concurrency,
+            transport=transport,
+        )
+        self.data = None
+        self.error = None
+        logger.info("AsyncGCalendar initialized")
+
+    async def close(self):
+        await self.client.close()
+
+    async def create(self, data: dict):
+        """Создание нового календаря."""
+        try:
+            logger.info("Creating calendar: %s", data.get("name", "New Calendar"))
+            calendar_entry = await self.client.request(
+                "POST", "calendars", body=calendar_body(data)
+            )
+            self.data = calendar_entry
+            logger.info("Calendar %s successfully created", calendar_entry["id"])
+            return calendar_entry
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error creating calendar: %s", e)
+            return False
+
+    async def delete(self, calendar_id: str):
+        """Удаление календаря по ID."""
+        try:
+            logger.info("Deleting calendar with id: %s", calendar_id)
+            await self.client.request("DELETE", _path("calendars", calendar_id))
+            self.data = None
+            logger.info("Calendar %s successfully deleted", calendar_id)
+            return True
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error deleting calendar %s: %s", calendar_id, e)
+            return False
+
+    async def select(self, data: dict):
+        """Выбор календаря по имени."""
+        try:
+            logger.info("Selecting calendar by name: %s", data.get("name"))
+            async for calendar in self.iter_calendars():
+                if data.get("name") == calendar["summary"]:
+                    self.data = calendar
+                    logger.info("Calendar %s selected", calendar["id"])
+                    return calendar.get("id", False)
+            logger.warning("Calendar with name %s not found", data.get("name"))
+            return False
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error selecting calendar: %s", e)
+            return False
+
+    async def edit(self, calendar_id: str, data: dict):
+        """Редактирование календаря."""
+        try:
+            logger.info("Editing calendar with id: %s", calendar_id)
+            updated_calendar = await self.client.request(
+                "PATCH", _path("calendars", calendar_id), body=calendar_patch(data)
+            )
+            self.data = updated_calendar
+            logger.info("Calendar %s successfully updated", calendar_id)
+            return updated_calendar
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error updating calendar %s: %s", calendar_id, e)
+            return False
+
+    async def eventlist(self, calendar_id: str, data: dict):
+        """Получение списка событий."""
+        try:
+            logger.info("Retrieving event list for calendar %s", calendar_id)
+            limit = data.get("limit", 10)
+            events = []
+            async for event in self.iter_events(
+                calendar_id, data, page_size=min(limit, MAX_PAGE_SIZE)
+            ):
+                events.append(event)
+                if len(events) >= limit:
+                    break
+            logger.info("Found %s events for calendar %s", len(events), calendar_id)
+            return events
+        except Exception as e:
+            self.error = str(e)
+            logger.error(
+                "Error retrieving event list for calendar %s: %s", calendar_id, e
+            )
+            return []
+
+    async def iter_events(
+        self,
+        calendar_id: str,
+        data: dict,
+        page_size: int = MAX_PAGE_SIZE,
+        fields: Optional[str] = None,
+    ) -> AsyncIterator[dict]:
+        """Ленивый постраничный обход событий календаря; ошибка пробрасывается."""
+        params = {
+            "timeMin": data.get("from"),
+            "timeMax": data.get("till", None),
+            "maxResults": min(page_size, MAX_PAGE_SIZE),
+            "singleEvents": True,
+            "orderBy": "startTime",
+        }
+        if fields:
+            params["fields"] = f"nextPageToken,items({fields})"
+        path = _path("calendars", calendar_id, "events")
+        try:
+            async for event in self._paginate(path, params):
+                yield event
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error iterating events for calendar %s: %s", calendar_id, e)
+            raise
+
+    async def iter_calendars(self) -> AsyncIterator[dict]:
+        """Ленивый постраничный обход списка календарей пользователя."""
+        async for calendar in self._paginate("users/me/calendarList", {}):
+            yield calendar
+
+    async def get(self, calendar_id: str):
+        """Получение информации о календаре по ID."""
+        try:
+            logger.info("Retrieving information for calendar %s", calendar_id)
+            calendar = await self.client.request("GET", _path("calendars", calendar_id))
+            self.data = calendar
+            logger.info(
+                "Information for calendar %s successfully retrieved", calendar_id
+            )
+            return self.data
+        except Exception as e:
+            self.error = str(e)
+            logger.error(
+                "Error retrieving information for calendar %s: %s", calendar_id, e
+            )
+            return False
+
+    async def create_many(self, datas: Iterable[dict]) -> List[BatchResult]:
+        """Параллельное создание календарей."""
+        logger.info("Creating calendars concurrently")
+
+        async def create(data):
+            return await self.client.request(
+                "POST", "calendars", body=calendar_body(data)
+            )
+
+        return self._finish(
+            await _gather_results(list(datas), create), "creating calendars"
+        )
+
+    async def delete_many(self, calendar_ids: Iterable[str]) -> List[BatchResult]:
+        """Параллельное удаление календарей по ID."""
+        logger.info("Deleting calendars concurrently")
+
+        async def delete(calendar_id):
+            return await self.client.request("DELETE", _path("calendars", calendar_id))
+
+        return self._finish(
+            await _gather_results(list(calendar_ids), delete), "deleting calendars"
+        )
+
+    async def _paginate(self, path: str, params: dict) -> AsyncIterator[dict]:
+        page_token = None
+        while True:
+            response = await self.client.request(
+                "GET", path, params={**params, "pageToken": page_token}
+            )
+            page_token = response.get("nextPageToken")
+            for item in response.get("items", []):
+                yield item
+            if not page_token:
+                return
+
+    def _finish(self, results: List[BatchResult], action: str) -> List[BatchResult]:
+        error = failure_summary(results, action)
+        if error:
+            self.error = error
+        return results
+
+
+class AsyncGEvent:
+    def __init__(self, gcalendar: AsyncGCalendar):
+        """Асинхронный вариант GEvent, использует клиент календаря."""
+        self.client = gcalendar.client
+        self.data = None
+        self.error = None
+        logger.info("AsyncGEvent initialized")
+
+    async def create(self, calendar_id: str, event_data: dict):
+        """Создание нового события."""
+        try:
+            logger.info("Creating event: %s", event_data.get("name", "New Event"))
+            event_entry = await self.client.request(
+                "POST",
+                _path("calendars", calendar_id, "events"),
+                body=event_body(event_data),
+            )
+            self.data = event_entry
+            logger.info("Event %s successfully created", event_entry["id"])
+            return event_entry
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error creating event: %s", e)
+            return False
+
+    async def delete(self, calendar_id: str, event_id: str):
+        """Удаление события по ID."""
+        try:
+            logger.info(
+                "Deleting event with id: %s from calendar %s", event_id, calendar_id
+            )
+            await self.client.request(
+                "DELETE", _path("calendars", calendar_id, "events", event_id)
+            )
+            self.data = None
+            logger.info("Event %s successfully deleted", event_id)
+            return True
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error deleting event %s: %s", event_id, e)
+            return False
+
+    async def select(self, calendar_id: str, data: dict):
+        """Поиск события по имени."""
+        try:
+            logger.info("Selecting event by name: %s", data.get("name"))
+            events = await self.client.request(
+                "GET", _path("calendars", calendar_id, "events")
+            )
+            for event in events["items"]:
+                if data.get("name") in event["summary"]:
+                    self.data = event
+                    logger.info("Event %s selected", event["id"])
+                    return event.get("id", False)
+            logger.warning("Event with name %s not found", data.get("name"))
+            return False
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error selecting event: %s", e)
+            return False
+
+    async def edit(self, calendar_id: str, event_id: str, event_data: dict):
+        """Редактирование события."""
+        try:
+            logger.info("Editing event with id: %s", event_id)
+            updated_event = await self.client.request(
+                "PATCH",
+                _path("calendars", calendar_id, "events", event_id),
+                body=event_patch(event_data),
+            )
+            self.data = updated_event
+            logger.info("Event %s successfully updated", event_id)
+            return updated_event
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error editing event %s: %s", event_id, e)
+            return False
+
+    async def get(self, calendar_id: str, event_id: str):
+        """Получение события по ID."""
+        try:
+            logger.info("Retrieving event %s from calendar %s", event_id, calendar_id)
+            event = await self.client.request(
+                "GET", _path("calendars", calendar_id, "events", event_id)
+            )
+            self.data = event
+            logger.info("Event %s successfully retrieved", event_id)
+            return event
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error retrieving event %s: %s", event_id, e)
+            return False
+
+    async def create_many(
+        self, calendar_id: str, events: Iterable[dict]
+    ) -> List[BatchResult]:
+        """Параллельное создание событий."""
+        logger.info("Creating events concurrently in calendar %s", calendar_id)
+        path = _path("calendars", calendar_id, "events")
+
+        async def create(event_data):
+            return await self.client.request("POST", path, body=event_body(event_data))
+
+        return self._finish(
+            await _gather_results(list(events), create), "creating events"
+        )
+
+    async def edit_many(
+        self, calendar_id: str, changes: Iterable[Tuple[str, dict]]
+    ) -> List[BatchResult]:
+        """Параллельное редактирование событий, changes — пары (event_id, event_data)."""
+        logger.info("Editing events concurrently in calendar %s", calendar_id)
+
+        async def edit(change):
+            event_id, event_data = change
+            return await self.client.request(
+                "PATCH",
+                _path("calendars", calendar_id, "events", event_id),
+                body=event_patch(event_data),
+            )
+
+        return self._finish(
+            await _gather_results(list(changes), edit), "editing events"
+        )
+
+    async def delete_many(
+        self, calendar_id: str, event_ids: Iterable[str]
+    ) -> List[BatchResult]:
+        """Параллельное удаление событий по ID."""
+        logger.info("Deleting events concurrently from calendar %s", calendar_id)
+
+        async def delete(event_id):
+            return await self.client.request(
+                "DELETE", _path("calendars", calendar_id, "events", event_id)
+            )
+
+        return self._finish(
+            await _gather_results(list(event_ids), delete), "deleting events"
+        )
+
+    def _finish(self, results: List[BatchResult], action: str) -> List[BatchResult]:
+        error = failure_summary(results, action)
+        if error:
+            self.error = error
+        return results
@@ -1,23 +1,42 @@
+import json
 import os
 import logging
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 from typing import Optional, Dict
 
+from auth.gcredentials import (
+    BackgroundRefresher,
+    CredentialManager,
+    FileTokenStore,
+    MemoryTokenStore,
+    SCOPES,
+)
+
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
 
 class GAPIWorkspace:
-    def __init__(self, IDuserOAuth: Dict, filename: Optional[str] = None):
-        """Авторизация через Google API с использованием OAuth."""
+    def __init__(
+        self,
+        IDuserOAuth: Dict,
+        filename: Optional[str] = None,
+        auto_refresh: bool = False,
+    ):
+        """Авторизация через Google API с использованием OAuth.
+
+        При auto_refresh токен обновляется фоновым потоком до истечения срока.
+        """
         self.creds: Optional[Credentials] = None
         self.filename: Optional[str] = filename
+        self.store = FileTokenStore(filename) if filename else MemoryTokenStore()
+        self.manager: Optional[CredentialManager] = None
+        self.refresher: Optional[BackgroundRefresher] = None
 
         logger.info("Initializing GAPIWorkspace")
 
         # Если файл с токенами существует, загружаем токены
+        # Чтение без блокировки: файл заменяется атомарно (FileTokenStore.save)
         if filename and os.path.exists(filename):
             self.creds = Credentials.from_authorized_user_file(filename)
             logger.info("Loaded credentials from file")
@@ -26,19 +45,39 @@ class GAPIWorkspace:
         if not self.creds or not self.creds.valid:
             if self.creds and self.creds.expired and self.creds.refresh_token:
                 logger.info("Token expired, refreshing")
-                self.creds.refresh(Request())
+                # Блокировка файла: параллельный процесс мог уже обновить токен
+                self.manager = CredentialManager(self.creds, self.store)
+                self.manager.refresh_if_needed()
             else:
                 logger.info("No valid credentials found, starting OAuth flow")
-                flow = InstalledAppFlow.from_client_config(
-                    IDuserOAuth, ["https://www.googleapis.com/auth/calendar"]
-                )
+                # oauthlib и requests нужны только для первой авторизации
+                from google_auth_oauthlib.flow import InstalledAppFlow
+
+                flow = InstalledAppFlow.from_client_config(IDuserOAuth, SCOPES)
                 self.creds = flow.run_local_server(port=8000)
 
-            # Сохраняем токены, если файл указан
-            if filename:
-                with open(filename, "w") as token_file:
-                    token_file.write(self.creds.to_json())
-                    logger.info(f"Saved credentials to {filename}")
+                # Сохраняем токены, если файл указан
+                if filename:
+                    with self.store.locked():
+                        self.store.save(json.loads(self.creds.to_json()))
+
+        if auto_refresh:
+            self.start_refresh()
+
+    def start_refresh(self) -> BackgroundRefresher:
+        """Запуск фонового обновления токена до истечения срока действия."""
+        if self.manager is None:
+            self.manager = CredentialManager(self.creds, self.store)
+        if self.refresher is None:
+            self.refresher = BackgroundRefresher([self.manager]).start()
+            logger.info("Started background token refresh")
+        return self.refresher
+
+    def stop_refresh(self):
+        """Остановка фонового обновления токена."""
+        if self.refresher is not None:
+            self.refresher.stop()
+            self.refresher = None
 
     def get_credentials(self) -> Optional[Credentials]:
         """Возвращает авторизационные данные."""
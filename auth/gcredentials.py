@@ -0,0 +1,263 @@
+import datetime
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+
+@contextmanager
+def file_lock(path: str):
+    """Межпроцессная эксклюзивная блокировка через lock-файл."""
+    with open(path, "a+") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class MemoryTokenStore:
+    def __init__(self):
+        """Хранилище токена в памяти, общее для потоков процесса."""
+        self._info: Optional[dict] = None
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def locked(self):
+        with self._lock:
+            yield
+
+    def load(self) -> Optional[dict]:
+        return dict(self._info) if self._info else None
+
+    def save(self, info: dict):
+        self._info = dict(info)
+
+
+class FileTokenStore:
+    def __init__(self, filename: str):
+        """Хранилище токена в JSON-файле с блокировкой между процессами."""
+        self.filename = filename
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def locked(self):
+        with self._lock, file_lock(f"{self.filename}.lock"):
+            yield
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.filename, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, info: dict):
+        # Атомарная замена: читатели не увидят наполовину записанный файл
+        tmp_name = f"{self.filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_name, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        os.replace(tmp_name, self.filename)
+        logger.info("Saved credentials to %s", self.filename)
+
+
+def _credentials_info(credentials) -> dict:
+    """Сериализация учетных данных для хранилища токенов."""
+    if hasattr(credentials, "to_json"):
+        return json.loads(credentials.to_json())
+    expiry = credentials.expiry.isoformat() + "Z" if credentials.expiry else None
+    return {"token": credentials.token, "expiry": expiry}
+
+
+def _parse_expiry(value: Optional[str]) -> Optional[datetime.datetime]:
+    if not value:
+        return None
+    return datetime.datetime.fromisoformat(value.rstrip("Z"))
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class CredentialManager:
+    def __init__(
+        self,
+        credentials,
+        store=None,
+        refresh_margin: float = 600.0,
+        clock: Callable[[], datetime.datetime] = _utcnow,
+    ):
+        """Управление токеном: заблаговременное обновление и общий кэш токена.
+
+        Токен обновляется за refresh_margin секунд до истечения. Перед
+        обновлением читается хранилище: если другой процесс уже получил
+        свежий токен, он подставляется в те же учетные данные без запроса.
+        """
+        self.credentials = credentials
+        self.store = store if store is not None else MemoryTokenStore()
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.refreshes = 0
+        self._lock = threading.Lock()
+
+    def due_in(self) -> float:
+        """Секунды до момента, когда токен нужно обновить."""
+        expiry = self.credentials.expiry
+        if not self.credentials.token or expiry is None:
+            return 0.0
+        remaining = (expiry - self.clock()).total_seconds()
+        return max(0.0, remaining - self.refresh_margin)
+
+    def refresh_if_needed(self, force: bool = False) -> bool:
+        """Обновление токена, если он скоро истечет; True при обновлении."""
+        with self._lock:
+            if not force and self.due_in() > 0:
+                return False
+            with self.store.locked():
+                if self._adopt_stored() and not force:
+                    return False
+                logger.info("Refreshing access token")
+                self.credentials.refresh(Request())
+                self.refreshes += 1
+                self.store.save(_credentials_info(self.credentials))
+            return True
+
+    def _adopt_stored(self) -> bool:
+        """Подстановка более свежего токена из хранилища."""
+        info = self.store.load()
+        if not info or not info.get("token"):
+            return False
+        expiry = _parse_expiry(info.get("expiry"))
+        if expiry is None or (expiry - self.clock()).total_seconds() <= (
+            self.refresh_margin
+        ):
+            return False
+        if self.credentials.expiry is None or expiry > self.credentials.expiry:
+            self.credentials.token = info["token"]
+            self.credentials.expiry = expiry
+            logger.info("Adopted token refreshed by another worker")
+        return True
+
+
+class BackgroundRefresher:
+    def __init__(
+        self,
+        managers: Iterable[CredentialManager] = (),
+        retry_interval: float = 30.0,
+        max_wait: float = 300.0,
+    ):
+        """Фоновый поток, обновляющий токены до истечения срока действия.
+
+        Поток просыпается не реже чем раз в max_wait секунд, после ошибки
+        обновления повторяет попытку через retry_interval секунд.
+        """
+        self.retry_interval = retry_interval
+        self.max_wait = max_wait
+        self._managers: List[CredentialManager] = list(managers)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, manager: CredentialManager):
+        with self._lock:
+            self._managers.append(manager)
+        self._wakeup.set()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="credential-refresher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self) -> float:
+        """Обновление всех просроченных токенов; возвращает паузу до следующего."""
+        with self._lock:
+            managers = list(self._managers)
+        wait = self.max_wait
+        for manager in managers:
+            try:
+                manager.refresh_if_needed()
+                wait = min(wait, manager.due_in())
+            except Exception as e:
+                logger.error("Error refreshing credentials: %s", e)
+                wait = min(wait, self.retry_interval)
+        return wait
+
+    def _run(self):
+        while not self._stopped.is_set():
+            wait = self.run_once()
+            self._wakeup.wait(max(wait, 1.0))
+            self._wakeup.clear()
+
+
+class DelegatedCredentials:
+    def __init__(
+        self,
+        service_account_info: dict,
+        scopes: Optional[List[str]] = None,
+        store_factory: Optional[Callable[[str], object]] = None,
+        refresher: Optional[BackgroundRefresher] = None,
+        refresh_margin: float = 600.0,
+    ):
+        """Сервисный аккаунт с делегированием на уровне домена.
+
+        for_user() выдает по одному менеджеру учетных данных на пользователя;
+        все они обновляются общим фоновым потоком refresher.
+        """
+        self.base = service_account.Credentials.from_service_account_info(
+            service_account_info, scopes=scopes or SCOPES
+        )
+        self.store_factory = store_factory or (lambda subject: MemoryTokenStore())
+        self.refresher = refresher
+        self.refresh_margin = refresh_margin
+        self._managers: Dict[str, CredentialManager] = {}
+        self._lock = threading.Lock()
+
+    def for_user(self, subject: str) -> CredentialManager:
+        """Менеджер учетных данных от имени пользователя subject."""
+        with self._lock:
+            manager = self._managers.get(subject)
+            if manager is None:
+                manager = CredentialManager(
+                    self.base.with_subject(subject),
+                    store=self.store_factory(subject),
+                    refresh_margin=self.refresh_margin,
+                )
+                self._managers[subject] = manager
+                if self.refresher is not None:
+                    self.refresher.add(manager)
+                logger.info("Created delegated credentials for %s", subject)
+            return manager
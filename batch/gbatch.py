@@ -0,0 +1,188 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from quota.gquota import QuotaGuard, failure_reason, retry_after
+from telemetry.gtelemetry import ERRORS, payload_size, request_method
+
+logger = logging.getLogger(__name__)
+
+# Calendar API рекомендует не более 50 запросов в одном batch
+DEFAULT_CHUNK_SIZE = 50
+MAX_CHUNK_SIZE = 1000
+
+
+def failure_summary(results: List["BatchResult"], action: str) -> Optional[str]:
+    """Сводка по неудачным запросам batch для поля error."""
+    failed = sum(1 for result in results if not result.ok)
+    if not failed:
+        logger.info("Finished %s: %s succeeded", action, len(results))
+        return None
+    summary = f"{failed} of {len(results)} failed while {action}"
+    logger.error("Error %s: %s", action, summary)
+    return summary
+
+
+class BatchResult:
+    """Результат отдельного запроса внутри batch."""
+
+    def __init__(self, index: int, item: Any = None):
+        self.index = index
+        self.item = item  # Входные данные, породившие запрос
+        self.response = None
+        self.error: Optional[Exception] = None
+        self.attempts = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"BatchResult(index={self.index}, {state})"
+
+
+class GBatch:
+    def __init__(
+        self,
+        service,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        quota: Optional[QuotaGuard] = None,
+        workers: int = 1,
+    ):
+        """Группировка запросов Google API в batch-запросы.
+
+        quota задает ограничение скорости и политику повторов подзапросов.
+        workers — число порций, отправляемых параллельно; общий ограничитель
+        quota распределяет между ними бюджет запросов.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        self.service = service
+        self.chunk_size = min(chunk_size, MAX_CHUNK_SIZE)
+        self.workers = workers
+        self.quota = quota if quota is not None else QuotaGuard()
+        self.results: List[BatchResult] = []
+        self._pending = []
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Отправляем накопленные запросы только при нормальном выходе
+        if exc_type is None:
+            self.execute()
+        return False
+
+    def add(self, request, item: Any = None) -> BatchResult:
+        """Добавление запроса в очередь batch."""
+        result = BatchResult(self._count, item)
+        self._count += 1
+        self._pending.append((result, request))
+        return result
+
+    def reject(self, item: Any, error: Exception) -> BatchResult:
+        """Регистрация элемента, для которого не удалось собрать запрос."""
+        result = BatchResult(self._count, item)
+        self._count += 1
+        result.error = error
+        self.results.append(result)
+        return result
+
+    def execute(self) -> List[BatchResult]:
+        """Отправка всех запросов порциями с повтором неудачных."""
+        pending, self._pending = self._pending, []
+        logger.info("Executing batch of %s requests", len(pending))
+        chunks = [
+            pending[start : start + self.chunk_size]
+            for start in range(0, len(pending), self.chunk_size)
+        ]
+        if self.workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(chunks)),
+                thread_name_prefix="batch",
+            ) as executor:
+                list(executor.map(self._execute_with_retry, chunks))
+        else:
+            for chunk in chunks:
+                self._execute_with_retry(chunk)
+        for chunk in chunks:
+            self.results.extend(result for result, _ in chunk)
+        self.results.sort(key=lambda r: r.index)
+        return self.results
+
+    def _execute_with_retry(self, chunk):
+        """Выполнение порции с повтором только упавших подзапросов."""
+        attempt = 0
+        while chunk:
+            # Каждый подзапрос batch расходует квоту как отдельный запрос
+            self.quota.acquire(len(chunk))
+            self.quota.metrics.record("requests", len(chunk))
+            with self.quota.telemetry.span("batch", size=len(chunk)):
+                started = time.perf_counter()
+                self._execute_chunk(chunk)
+                self._observe(chunk, time.perf_counter() - started)
+            chunk = [
+                (result, request)
+                for result, request in chunk
+                if not result.ok and self.quota.should_retry(result.error, attempt)
+            ]
+            if chunk:
+                # Раунд повтора снижает скорость и учитывается один раз,
+                # задержка берется по ошибке с наибольшим Retry-After
+                worst = max(
+                    (result.error for result, _ in chunk),
+                    key=lambda error: retry_after(error) or 0.0,
+                )
+                delay = self.quota.backoff(worst, attempt)
+                logger.info("Retrying %s requests in %.2fs", len(chunk), delay)
+                self.quota.sleep(delay)
+                attempt += 1
+
+    def _observe(self, chunk, seconds: float):
+        """Учет batch-запроса и ошибок подзапросов в телеметрии."""
+        telemetry = self.quota.telemetry
+        telemetry.observe(
+            "batch", seconds, sum(payload_size(request) for _, request in chunk)
+        )
+        for result, request in chunk:
+            if not result.ok:
+                telemetry.count(
+                    ERRORS,
+                    method=request_method(request),
+                    reason=failure_reason(result.error),
+                )
+
+    def _execute_chunk(self, chunk):
+        answered = set()
+        batch = self.service.new_batch_http_request()
+        for position, (result, request) in enumerate(chunk):
+            result.response = None
+            result.error = None
+            result.attempts += 1
+            batch.add(
+                request,
+                callback=self._callback(result, answered),
+                request_id=str(position),
+            )
+        try:
+            batch.execute()
+        except Exception as e:
+            # Ошибка всего batch относится ко всем подзапросам без ответа
+            logger.error("Batch request failed: %s", e)
+            for result, _ in chunk:
+                if result.index not in answered:
+                    result.error = e
+
+    @staticmethod
+    def _callback(result: BatchResult, answered: set):
+        def callback(request_id, response, exception):
+            answered.add(result.index)
+            result.response = response
+            result.error = exception
+
+        return callback
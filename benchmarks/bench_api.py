@@ -0,0 +1,174 @@
+"""Бенчмарк операций с календарями и событиями на локальном эмуляторе API.
+
+Измеряет пропускную способность и хвостовые задержки create/edit/list/select
+и пакетных операций через настоящий HTTP-транспорт без обращения к Google.
+Результаты можно сохранить и сравнить с базовыми для поиска регрессий.
+Запуск: python -m benchmarks.bench_api --save baseline.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from emulator.gemulator import CalendarEmulator, EmulatorWorkspace, Faults, seed_events
+from event.gevent import GEvent
+from gcalendar.gcalendar import GCalendar
+from quota.gquota import QuotaGuard, RateLimiter, RetryPolicy
+
+
+def percentile(timings: List[float], fraction: float) -> float:
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(timings)
+    return ordered[max(0, int(round(fraction * len(ordered))) - 1)]
+
+
+def summarize(timings: List[float], elapsed: float, items: int) -> Dict[str, float]:
+    """Сводка замеров: пропускная способность и задержки в миллисекундах."""
+    return {
+        "operations": len(timings),
+        "throughput": items / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "max_ms": max(timings) * 1000,
+    }
+
+
+def measure(operation: Callable[[int], int], rounds: int) -> Dict[str, float]:
+    """Замер rounds вызовов operation(round); она возвращает число обработанных объектов."""
+    timings = []
+    items = 0
+    started = time.perf_counter()
+    for number in range(rounds):
+        call_started = time.perf_counter()
+        items += operation(number)
+        timings.append(time.perf_counter() - call_started)
+    return summarize(timings, time.perf_counter() - started, items)
+
+
+def event_data(number: int) -> dict:
+    hour = number % 24
+    return {
+        "name": f"Benchmark event {number}",
+        "description": "Created by bench_api",
+        "start_time": f"2024-03-01T{hour:02d}:00:00+00:00",
+        "end_time": f"2024-03-01T{hour:02d}:30:00+00:00",
+    }
+
+
+def run(emulator: CalendarEmulator, rounds: int, events: int) -> Dict[str, dict]:
+    """Выполнение всех сценариев против запущенного эмулятора."""
+    # Эмулятор не ограничивает квоту: общий лимит процесса исказил бы замеры
+    quota = QuotaGuard(
+        limiter=RateLimiter(user_rate=1e6, project_rate=1e6),
+        policy=RetryPolicy(base_delay=0.01),
+    )
+    gcalendar = GCalendar(EmulatorWorkspace(), factory=emulator.factory(), quota=quota)
+    gevent = GEvent(gcalendar)
+    calendar_id = gcalendar.create({"name": "Benchmark"})["id"]
+    listed_id = gcalendar.create({"name": "Benchmark list"})["id"]
+    seed_events(emulator.backend, listed_id, events)
+    created: List[str] = []
+
+    def create(number: int) -> int:
+        created.append(gevent.create(calendar_id, event_data(number))["id"])
+        return 1
+
+    def edit(number: int) -> int:
+        event_id = created[number % len(created)]
+        return int(bool(gevent.edit(calendar_id, event_id, {"name": f"Edit {number}"})))
+
+    def list_all(number: int) -> int:
+        return sum(1 for _ in gcalendar.iter_events(listed_id, {}, single_events=False))
+
+    def select(number: int) -> int:
+        return int(bool(gevent.select(calendar_id, {"name": f"Edit {number}"})))
+
+    def select_calendar(number: int) -> int:
+        return int(bool(gcalendar.select({"name": "Benchmark"})))
+
+    def create_many(number: int) -> int:
+        datas = (event_data(number * rounds + index) for index in range(rounds))
+        return sum(result.ok for result in gevent.create_many(calendar_id, datas))
+
+    results = {
+        "create": measure(create, rounds),
+        "edit": measure(edit, rounds),
+        "list": measure(list_all, max(1, rounds // 20)),
+        "select_event": measure(select, rounds),
+        "select_calendar": measure(select_calendar, rounds),
+        "create_many": measure(create_many, max(1, rounds // 50)),
+    }
+    gcalendar.delete_many([calendar_id, listed_id])
+    return results
+
+
+def compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """Регрессии относительно базовых результатов с допуском tolerance."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']:.3f} ms > {base['p95_ms']:.3f} ms"
+            )
+        if current["throughput"] < base["throughput"] / (1 + tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput']:.1f}/s"
+                f" < {base['throughput']:.1f}/s"
+            )
+    return regressions
+
+
+def report(results: Dict[str, dict]):
+    for name, stats in results.items():
+        print(
+            f"{name:<16} {stats['throughput']:10.1f} items/s"
+            f"  p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms"
+            f"  p99 {stats['p99_ms']:8.3f} ms"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--events", type=int, default=5000, help="events to list")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write results to a JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    with CalendarEmulator(faults=faults) as emulator:
+        results = run(emulator, args.rounds, args.events)
+    report(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Микробенчмарк создания сервиса Calendar API.
+
+Сравнивает googleapiclient.discovery.build при каждом создании GCalendar
+с общей фабрикой ServiceFactory. Запуск: python -m benchmarks.bench_service
+"""
+
+import argparse
+import statistics
+import time
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from service.gservice import ServiceFactory
+
+
+def measure(label: str, construct, rounds: int):
+    """Замер времени construct() за rounds повторов."""
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        construct()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(
+        f"{label:<40} median {statistics.median(timings):8.3f} ms"
+        f"  p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.3f} ms"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    creds = Credentials(token="benchmark")
+    factory = ServiceFactory()
+
+    measure(
+        "build() per instance (before)",
+        lambda: build("calendar", "v3", credentials=creds, static_discovery=True),
+        args.rounds,
+    )
+    measure(
+        "ServiceFactory, new credentials",
+        lambda: factory.build(Credentials(token="benchmark")),
+        args.rounds,
+    )
+    measure(
+        "ServiceFactory, shared credentials", lambda: factory.build(creds), args.rounds
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    def __init__(self, max_entries: int = 1024):
+        """LRU-кэш ответов в памяти процесса."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache:
+    def __init__(self, directory: str):
+        """Кэш ответов на диске: один JSON-файл на ресурс."""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, key: str, entry: dict):
+        # Запись через временный файл, чтобы не оставить поврежденный JSON
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend=None,
+        max_age: float = 0.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Read-through кэш GET-запросов с условными запросами по ETag.
+
+        Записи моложе max_age секунд отдаются без обращения к API,
+        более старые перепроверяются заголовком If-None-Match.
+        """
+        self.backend = backend if backend is not None else MemoryCache()
+        self.max_age = max_age
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+    def fetch(
+        self,
+        key: str,
+        request,
+        execute: Optional[Callable] = None,
+        revalidate: bool = False,
+    ) -> dict:
+        """Выполнение GET-запроса через кэш.
+
+        execute — функция выполнения запроса, по умолчанию request.execute().
+        При revalidate копия проверяется условным запросом даже до max_age.
+        """
+        entry = self.backend.get(key)
+        fresh = entry is not None and self.clock() - entry["stored_at"] < self.max_age
+        if fresh and not revalidate:
+            self._count("hits")
+            return copy.deepcopy(entry["body"])
+        if entry is not None and entry.get("etag"):
+            request.headers["If-None-Match"] = entry["etag"]
+        try:
+            body = execute(request) if execute else request.execute()
+        except HttpError as e:
+            if entry is None or e.resp.status != 304:
+                raise
+            # Ресурс не изменился: ответ 304 без тела
+            self._count("revalidated")
+            self.store(key, entry["body"])
+            return copy.deepcopy(entry["body"])
+        self._count("misses")
+        self.store(key, body)
+        return copy.deepcopy(body)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Закэшированное тело ресурса без обращения к API."""
+        entry = self.backend.get(key)
+        return copy.deepcopy(entry["body"]) if entry is not None else None
+
+    def store(self, key: str, body: dict):
+        """Сохранение тела ресурса вместе с его ETag."""
+        if not isinstance(body, dict):
+            return
+        self.backend.set(
+            key,
+            {
+                "etag": body.get("etag"),
+                "body": copy.deepcopy(body),
+                "stored_at": self.clock(),
+            },
+        )
+
+    def invalidate(self, key: str):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий и промахов кэша."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+            }
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+def if_match(request, body: Optional[dict]):
+    """Добавление заголовка If-Match для защиты от потерянных обновлений."""
+    if body and body.get("etag"):
+        request.headers["If-Match"] = body["etag"]
+    return request
@@ -0,0 +1,192 @@
+"""Командная строка интеграции: list, sync, import, export, benchmark.
+
+Модуль импортирует только стандартную библиотеку и conf. Google API,
+google-auth и модули проекта загружаются подкомандой, которой они нужны,
+поэтому --help, ошибки аргументов и подкоманды без API стартуют без них.
+Логирование настраивается явно по аргументам --log-file и --log-level.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import sys
+import time
+from typing import List, Tuple
+
+import conf
+
+logger = logging.getLogger(__name__)
+
+_started = time.perf_counter()
+
+# Подкоманды, аргументы которых разбирают существующие скрипты
+DELEGATED = {
+    "import": "import_events",
+    "export": "export_events",
+}
+BENCHMARKS = {
+    "api": "benchmarks.bench_api",
+    "service": "benchmarks.bench_service",
+}
+
+
+class ImportProfile:
+    def __init__(self):
+        """Время ленивых импортов подкоманд и число загруженных ими модулей."""
+        self.records: List[Tuple[str, float, int]] = []
+
+    def load(self, name: str):
+        """Импорт модуля name с замером времени."""
+        before = len(sys.modules)
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        self.records.append(
+            (name, time.perf_counter() - started, len(sys.modules) - before)
+        )
+        return module
+
+    def report(self, stream=None):
+        stream = stream if stream is not None else sys.stderr
+        total = time.perf_counter() - _started
+        imports = sum(seconds for _, seconds, _ in self.records)
+        for name, seconds, modules in self.records:
+            print(
+                f"import {name:<28} {seconds * 1000:8.1f} ms  +{modules} modules",
+                file=stream,
+            )
+        print(
+            f"imports {imports * 1000:.1f} ms of {total * 1000:.1f} ms total,"
+            f" {len(sys.modules)} modules loaded",
+            file=stream,
+        )
+
+
+profile = ImportProfile()
+
+
+def load_gcalendar():
+    """GCalendar с учетными данными из .env/."""
+    main = profile.load("main")
+    gcalendar = profile.load("gcalendar.gcalendar")
+    return gcalendar.GCalendar(main.initialize_gapi())
+
+
+def cmd_list(args) -> int:
+    """Вывод календарей или событий календаря в JSONL."""
+    gcalendar = load_gcalendar()
+    if args.calendar is None:
+        try:
+            for calendar in gcalendar.iter_calendars():
+                print(json.dumps(calendar, ensure_ascii=False))
+        except Exception as e:
+            logger.error("Error listing calendars: %s", e)
+            return 1
+        return 0
+    data = {"from": args.time_min, "till": args.time_max, "limit": args.limit}
+    events = gcalendar.eventlist(args.calendar, data)
+    for event in events:
+        print(json.dumps(event, ensure_ascii=False))
+    return 1 if gcalendar.error else 0
+
+
+def cmd_sync(args) -> int:
+    """Инкрементальная синхронизация календарей в локальную базу SQLite."""
+    gsync = profile.load("sync.gsync")
+    gcalendar = load_gcalendar()
+    store = gsync.EventStore(args.store)
+    syncer = gsync.GSync(gcalendar, store)
+    failed = 0
+    try:
+        for calendar_id in args.calendars:
+            stats = syncer.sync(calendar_id)
+            if stats is False:
+                failed += 1
+                continue
+            print(json.dumps({"calendar_id": calendar_id, **stats}))
+    finally:
+        store.close()
+    return 1 if failed else 0
+
+
+def cmd_delegated(args, argv: List[str]) -> int:
+    """Передача аргументов подкоманды скрипту import_events/export_events."""
+    return profile.load(DELEGATED[args.command]).main(argv)
+
+
+def cmd_benchmark(args, argv: List[str]) -> int:
+    return profile.load(BENCHMARKS[args.suite]).main(argv) or 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Google Calendar integration tools"
+    )
+    parser.add_argument(
+        "--log-file",
+        default="app.log",
+        help="log file; an empty value logs to the console only",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+    )
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="print time spent importing modules to stderr",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    list_parser = commands.add_parser("list", help="list calendars or events")
+    list_parser.add_argument(
+        "--calendar", default=None, help="list events of this calendar"
+    )
+    list_parser.add_argument("--from", dest="time_min", default=None)
+    list_parser.add_argument("--till", dest="time_max", default=None)
+    list_parser.add_argument("--limit", type=int, default=100)
+
+    sync_parser = commands.add_parser("sync", help="sync events to a local store")
+    sync_parser.add_argument("calendars", nargs="+", help="calendar IDs")
+    sync_parser.add_argument("--store", default="events.db", help="SQLite file")
+
+    # Аргументы разбирает вызываемый скрипт, включая -h
+    commands.add_parser("import", add_help=False, help="import events (see: import -h)")
+    commands.add_parser(
+        "export", add_help=False, help="export calendars (see: export -h)"
+    )
+    benchmark_parser = commands.add_parser(
+        "benchmark", add_help=False, help="run benchmarks (see: benchmark api -h)"
+    )
+    benchmark_parser.add_argument("suite", choices=sorted(BENCHMARKS))
+    return parser
+
+
+def main(argv=None) -> int:
+    """Разбор аргументов, настройка логирования и запуск подкоманды."""
+    profile.records.clear()
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    delegated = args.command in DELEGATED or args.command == "benchmark"
+    if rest and not delegated:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    conf.configure_logging(args.log_file or None, getattr(logging, args.log_level))
+    try:
+        if args.command == "list":
+            return cmd_list(args)
+        if args.command == "sync":
+            return cmd_sync(args)
+        if args.command == "benchmark":
+            return cmd_benchmark(args, rest)
+        return cmd_delegated(args, rest)
+    finally:
+        if args.import_profile:
+            profile.report()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,39 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
+_listener = None
 
 
-# Настройка базового логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    encoding="UTF-8",
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
\ No newline at end of file
+def configure_logging(filename="app.log", level=logging.INFO):
+    """Неблокирующее логирование через очередь.
+
+    Вызывающий поток только кладет запись в очередь, запись в файл и консоль
+    выполняет фоновый поток QueueListener. С filename=None лог пишется
+    только в консоль, например в контейнере с файловой системой только
+    для чтения. Вызывается точками входа, а не при импорте модуля.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if filename:
+        handlers.append(logging.FileHandler(filename, encoding="UTF-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Сообщение форматируется обработчиками слушателя, здесь только подстановка
+    # аргументов; иначе basicConfig добавит к нему свой префикс
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
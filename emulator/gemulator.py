@@ -0,0 +1,798 @@
+import copy
+import datetime
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from google.oauth2.credentials import Credentials
+
+from freebusy.gfreebusy import to_rfc3339, to_timestamp
+from lookup.glookup import tokenize
+from recurrence.grecurrence import RecurrenceExpander
+from service.gservice import ServiceFactory
+
+logger = logging.getLogger(__name__)
+
+SERVICE_PATH = "/calendar/v3"
+BATCH_PATH = "/batch/calendar/v3"
+
+DEFAULT_PAGE_SIZE = 250
+MAX_PAGE_SIZE = 2500
+MAX_BATCH_SIZE = 1000
+
+# Горизонт разворачивания повторений при singleEvents без timeMax
+EXPANSION_HORIZON = 2 * 365 * 24 * 3600
+
+HTTP_REASONS = {
+    200: "OK",
+    204: "No Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    410: "Gone",
+    412: "Precondition Failed",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, reason: str, message: str):
+        """Ошибка Calendar API с HTTP-статусом и reason."""
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+    def body(self) -> dict:
+        domain = "usageLimits" if "RateLimit" in self.reason else "global"
+        return {
+            "error": {
+                "code": self.status,
+                "message": self.message,
+                "errors": [
+                    {"domain": domain, "reason": self.reason, "message": self.message}
+                ],
+            }
+        }
+
+
+def _now() -> str:
+    return to_rfc3339(round(time.time(), 3))
+
+
+def _merge(target: dict, patch: dict):
+    """Слияние тела PATCH: вложенные объекты сливаются, null удаляет поле."""
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+def _page(items: List[dict], query: dict, key: str = "items") -> dict:
+    """Страница списка по maxResults и pageToken (смещению)."""
+    try:
+        size = int(query.get("maxResults", DEFAULT_PAGE_SIZE))
+        offset = int(query.get("pageToken") or 0)
+    except ValueError:
+        raise ApiError(400, "invalid", "Invalid maxResults or pageToken")
+    size = max(1, min(size, MAX_PAGE_SIZE))
+    response = {key: items[offset : offset + size]}
+    if offset + size < len(items):
+        response["nextPageToken"] = str(offset + size)
+    return response
+
+
+def _start_key(event: dict) -> float:
+    start = event.get("start", {})
+    moment = start.get("dateTime") or start.get("date")
+    return to_timestamp(moment) if moment else 0.0
+
+
+def _matches_text(event: dict, text: str) -> bool:
+    """Поиск q как в Calendar API: каждое слово запроса — целое слово события."""
+    words = set()
+    for field in ("summary", "description", "location"):
+        words.update(tokenize(str(event.get(field, ""))))
+    return all(word in words for word in tokenize(text))
+
+
+class CalendarBackend:
+    def __init__(self, owner: str = "emulator@example.com"):
+        """Состояние эмулятора в памяти: календари, события и журнал изменений.
+
+        Каждое изменение получает номер из общего счетчика; syncToken — номер
+        последнего изменения на момент выдачи. Удаленные события хранятся
+        со статусом cancelled, чтобы инкрементальная синхронизация их видела.
+        Сохраненные ресурсы не изменяются на месте: каждое изменение создает
+        новый объект, поэтому списки отдаются без копирования.
+        """
+        self.owner = owner
+        self._calendars: Dict[str, dict] = {}
+        self._events: Dict[str, Dict[str, Tuple[int, dict]]] = {}
+        self._acls: Dict[str, Dict[str, dict]] = {}
+        self._seq = 0
+        # Токены с номером не больше этого считаются просроченными (410)
+        self._expired_seq = -1
+        self._channels: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self._expander = RecurrenceExpander()
+        self._new_calendar({"summary": owner, "timeZone": "UTC"}, owner)
+
+    def expire_sync_tokens(self):
+        """Объявление всех выданных syncToken недействительными."""
+        with self._lock:
+            self._expired_seq = self._seq
+
+    def event_count(self, calendar_id: str) -> int:
+        with self._lock:
+            return sum(
+                1
+                for _, event in self._events.get(calendar_id, {}).values()
+                if event.get("status") != "cancelled"
+            )
+
+    def handle(
+        self, method: str, path: str, query: dict, headers: dict, body: Optional[dict]
+    ) -> Tuple[int, dict, Optional[dict]]:
+        """Обработка одного запроса REST; возвращает статус, заголовки и тело."""
+        for route_method, pattern, name in ROUTES:
+            match = pattern.fullmatch(path)
+            if match is None or route_method != method:
+                continue
+            params = {key: unquote(value) for key, value in match.groupdict().items()}
+            with self._lock:
+                return getattr(self, name)(query, headers, body or {}, **params)
+        if any(pattern.fullmatch(path) for _, pattern, _ in ROUTES):
+            raise ApiError(405, "methodNotAllowed", f"{method} is not allowed")
+        raise ApiError(404, "notFound", f"Not Found: {path}")
+
+    # Календари и список календарей
+
+    def insert_calendar(self, query, headers, body):
+        if not body.get("summary"):
+            raise ApiError(400, "required", "Missing summary")
+        calendar_id = f"{uuid.uuid4().hex}@group.calendar.emulator"
+        return 200, {}, self._new_calendar(body, calendar_id)
+
+    def get_calendar(self, query, headers, body, calendar_id):
+        return self._conditional_get(headers, self._calendar(calendar_id))
+
+    def patch_calendar(self, query, headers, body, calendar_id):
+        calendar = self._calendar(calendar_id)
+        self._check_match(headers, calendar)
+        updated = copy.deepcopy(calendar)
+        _merge(updated, body)
+        return 200, {}, self._store_calendar(updated)
+
+    def update_calendar(self, query, headers, body, calendar_id):
+        calendar = self._calendar(calendar_id)
+        self._check_match(headers, calendar)
+        updated = {**copy.deepcopy(body), "id": calendar["id"]}
+        return 200, {}, self._store_calendar(updated)
+
+    def delete_calendar(self, query, headers, body, calendar_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        if calendar_id == self.owner:
+            raise ApiError(400, "cannotDeletePrimaryCalendar", "Cannot delete primary")
+        del self._calendars[calendar_id]
+        self._events.pop(calendar_id, None)
+        self._acls.pop(calendar_id, None)
+        return 204, {}, None
+
+    def list_calendar_list(self, query, headers, body):
+        entries = [self._list_entry(calendar) for calendar in self._calendars.values()]
+        return 200, {}, {"kind": "calendar#calendarList", **_page(entries, query)}
+
+    def get_calendar_list_entry(self, query, headers, body, calendar_id):
+        entry = self._list_entry(self._calendar(calendar_id))
+        return self._conditional_get(headers, entry)
+
+    # Правила доступа
+
+    def list_acl(self, query, headers, body, calendar_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        rules = list(self._acls[calendar_id].values())
+        return 200, {}, {"kind": "calendar#acl", **_page(rules, query)}
+
+    def insert_acl(self, query, headers, body, calendar_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        if not body.get("role") or not body.get("scope", {}).get("type"):
+            raise ApiError(400, "required", "Missing role or scope")
+        # Как и Calendar API, повторная вставка правила для scope меняет роль
+        return 200, {}, self._store_rule(calendar_id, body)
+
+    def get_acl(self, query, headers, body, calendar_id, rule_id):
+        return 200, {}, copy.deepcopy(self._rule(calendar_id, rule_id))
+
+    def patch_acl(self, query, headers, body, calendar_id, rule_id):
+        rule = copy.deepcopy(self._rule(calendar_id, rule_id))
+        _merge(rule, {key: value for key, value in body.items() if key != "scope"})
+        return 200, {}, self._store_rule(self._calendar(calendar_id)["id"], rule)
+
+    def update_acl(self, query, headers, body, calendar_id, rule_id):
+        rule = self._rule(calendar_id, rule_id)
+        updated = {**copy.deepcopy(body), "scope": rule["scope"]}
+        return 200, {}, self._store_rule(self._calendar(calendar_id)["id"], updated)
+
+    def delete_acl(self, query, headers, body, calendar_id, rule_id):
+        self._rule(calendar_id, rule_id)
+        del self._acls[self._calendar(calendar_id)["id"]][rule_id]
+        return 204, {}, None
+
+    # События
+
+    def list_events(self, query, headers, body, calendar_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        stored = self._events[calendar_id].values()
+        token = query.get("syncToken")
+        if token is not None:
+            if any(key in query for key in ("timeMin", "timeMax", "q", "iCalUID")):
+                raise ApiError(400, "invalid", "syncToken cannot be combined")
+            since = self._parse_token(token)
+            events = [event for seq, event in stored if seq > since]
+        else:
+            events = self._filter(
+                [event for _, event in stored], query, query.get("showDeleted")
+            )
+        if query.get("singleEvents") == "true" and token is None:
+            events = self._expand(events, query)
+        elif query.get("orderBy") == "updated":
+            events.sort(key=lambda event: event["updated"])
+        response = {
+            "kind": "calendar#events",
+            "summary": self._calendars[calendar_id]["summary"],
+            **_page(events, query),
+        }
+        if "nextPageToken" not in response:
+            response["nextSyncToken"] = f"s{self._seq}"
+        return 200, {}, response
+
+    def insert_event(self, query, headers, body, calendar_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        if "start" not in body or "end" not in body:
+            raise ApiError(400, "required", "Missing start or end")
+        event_id = body.get("id") or uuid.uuid4().hex
+        if event_id in self._events[calendar_id]:
+            raise ApiError(409, "duplicate", "The requested identifier already exists")
+        now = _now()
+        event = {
+            **copy.deepcopy(body),
+            "kind": "calendar#event",
+            "id": event_id,
+            "status": body.get("status", "confirmed"),
+            "created": now,
+            "iCalUID": body.get("iCalUID") or f"{event_id}@emulator",
+            "organizer": {"email": calendar_id, "self": True},
+            "sequence": 0,
+        }
+        return 200, {}, self._store_event(calendar_id, event)
+
+    def get_event(self, query, headers, body, calendar_id, event_id):
+        return self._conditional_get(headers, self._event(calendar_id, event_id))
+
+    def patch_event(self, query, headers, body, calendar_id, event_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        event = self._event(calendar_id, event_id)
+        self._check_match(headers, event)
+        updated = copy.deepcopy(event)
+        _merge(updated, body)
+        return 200, {}, self._store_event(calendar_id, updated)
+
+    def update_event(self, query, headers, body, calendar_id, event_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        event = self._event(calendar_id, event_id)
+        self._check_match(headers, event)
+        keep = ("kind", "id", "created", "iCalUID", "organizer", "sequence")
+        updated = {**copy.deepcopy(body), **{key: event[key] for key in keep}}
+        return 200, {}, self._store_event(calendar_id, updated)
+
+    def delete_event(self, query, headers, body, calendar_id, event_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        event = self._event(calendar_id, event_id)
+        if event.get("status") == "cancelled":
+            raise ApiError(410, "deleted", "Resource has been deleted")
+        self._check_match(headers, event)
+        self._store_event(calendar_id, {**event, "status": "cancelled"})
+        return 204, {}, None
+
+    # Каналы уведомлений
+
+    def watch_events(self, query, headers, body, calendar_id):
+        calendar_id = self._calendar(calendar_id)["id"]
+        return 200, {}, self._new_channel(body, f"calendars/{calendar_id}/events")
+
+    def watch_calendar_list(self, query, headers, body):
+        return 200, {}, self._new_channel(body, "users/me/calendarList")
+
+    def stop_channel(self, query, headers, body):
+        if self._channels.pop(body.get("id"), None) is None:
+            raise ApiError(404, "notFound", "Channel not found")
+        return 204, {}, None
+
+    def _new_channel(self, body: dict, resource: str) -> dict:
+        ttl = int(body.get("params", {}).get("ttl", 7 * 24 * 3600))
+        channel = {
+            "kind": "api#channel",
+            "id": body.get("id") or uuid.uuid4().hex,
+            "resourceId": uuid.uuid4().hex,
+            "resourceUri": f"https://www.googleapis.com/calendar/v3/{resource}",
+            "expiration": str(int((time.time() + ttl) * 1000)),
+        }
+        self._channels[channel["id"]] = channel
+        return channel
+
+    def _new_calendar(self, body: dict, calendar_id: str) -> dict:
+        self._events[calendar_id] = {}
+        self._acls[calendar_id] = {}
+        self._store_rule(
+            calendar_id,
+            {"role": "owner", "scope": {"type": "user", "value": self.owner}},
+        )
+        return self._store_calendar({**copy.deepcopy(body), "id": calendar_id})
+
+    def _store_calendar(self, calendar: dict) -> dict:
+        self._seq += 1
+        calendar.update(kind="calendar#calendar", etag=f'"{self._seq}"')
+        self._calendars[calendar["id"]] = calendar
+        return copy.deepcopy(calendar)
+
+    def _store_event(self, calendar_id: str, event: dict) -> dict:
+        self._seq += 1
+        event.update(etag=f'"{self._seq}"', updated=_now())
+        if self._events[calendar_id].get(event["id"]) is not None:
+            event["sequence"] = event.get("sequence", 0) + 1
+        self._events[calendar_id][event["id"]] = (self._seq, event)
+        return copy.deepcopy(event)
+
+    def _store_rule(self, calendar_id: str, rule: dict) -> dict:
+        self._seq += 1
+        scope = rule["scope"]
+        rule_id = (
+            "default"
+            if scope["type"] == "default"
+            else f"{scope['type']}:{scope.get('value', '')}"
+        )
+        stored = {
+            **copy.deepcopy(rule),
+            "kind": "calendar#aclRule",
+            "id": rule_id,
+            "etag": f'"{self._seq}"',
+        }
+        self._acls[calendar_id][rule_id] = stored
+        return copy.deepcopy(stored)
+
+    def _rule(self, calendar_id: str, rule_id: str) -> dict:
+        rule = self._acls[self._calendar(calendar_id)["id"]].get(rule_id)
+        if rule is None:
+            raise ApiError(404, "notFound", "Not Found")
+        return rule
+
+    def _calendar(self, calendar_id: str) -> dict:
+        if calendar_id == "primary":
+            calendar_id = self.owner
+        calendar = self._calendars.get(calendar_id)
+        if calendar is None:
+            raise ApiError(404, "notFound", "Not Found")
+        return calendar
+
+    def _event(self, calendar_id: str, event_id: str) -> dict:
+        calendar_id = self._calendar(calendar_id)["id"]
+        stored = self._events[calendar_id].get(event_id)
+        if stored is None:
+            raise ApiError(404, "notFound", "Not Found")
+        return stored[1]
+
+    def _list_entry(self, calendar: dict) -> dict:
+        entry = copy.deepcopy(calendar)
+        entry.update(
+            kind="calendar#calendarListEntry",
+            accessRole="owner",
+            primary=calendar["id"] == self.owner,
+        )
+        return entry
+
+    def _parse_token(self, token: str) -> int:
+        try:
+            since = int(token[1:]) if token.startswith("s") else None
+        except ValueError:
+            since = None
+        if since is None or since <= self._expired_seq or since > self._seq:
+            raise ApiError(410, "fullSyncRequired", "Sync token is no longer valid")
+        return since
+
+    def _filter(
+        self, events: List[dict], query: dict, show_deleted: Optional[str]
+    ) -> List[dict]:
+        if show_deleted != "true":
+            events = [event for event in events if event.get("status") != "cancelled"]
+        if "iCalUID" in query:
+            events = [e for e in events if e.get("iCalUID") == query["iCalUID"]]
+        if "q" in query:
+            events = [event for event in events if _matches_text(event, query["q"])]
+        if "updatedMin" in query:
+            since = to_timestamp(query["updatedMin"])
+            events = [e for e in events if to_timestamp(e["updated"]) >= since]
+        for condition in query.get("privateExtendedProperty", []):
+            key, _, value = condition.partition("=")
+            events = [
+                event
+                for event in events
+                if event.get("extendedProperties", {}).get("private", {}).get(key)
+                == value
+            ]
+        if query.get("singleEvents") != "true":
+            lower = to_timestamp(query["timeMin"]) if "timeMin" in query else None
+            upper = to_timestamp(query["timeMax"]) if "timeMax" in query else None
+            events = [
+                event
+                for event in events
+                if (upper is None or _start_key(event) < upper)
+                and (
+                    lower is None
+                    or event.get("recurrence")
+                    or self._ends_after(event, lower)
+                )
+            ]
+        return events
+
+    @staticmethod
+    def _ends_after(event: dict, moment: float) -> bool:
+        end = event.get("end", {})
+        end = end.get("dateTime") or end.get("date")
+        return end is None or to_timestamp(end) > moment
+
+    def _expand(self, events: List[dict], query: dict) -> List[dict]:
+        """Разворачивание повторений для singleEvents=true в порядке начала."""
+        time_min = query.get("timeMin")
+        time_max = query.get("timeMax")
+        if time_max is None:
+            origin = to_timestamp(time_min) if time_min else time.time()
+            time_max = to_rfc3339(origin + EXPANSION_HORIZON)
+        return list(self._expander.expand(events, time_min, time_max))
+
+    @staticmethod
+    def _check_match(headers: dict, resource: dict):
+        expected = headers.get("if-match")
+        if expected is not None and expected != resource["etag"]:
+            raise ApiError(412, "conditionNotMet", "Precondition Failed")
+
+    @staticmethod
+    def _conditional_get(headers: dict, resource: dict):
+        if headers.get("if-none-match") == resource["etag"]:
+            return 304, {"ETag": resource["etag"]}, None
+        return 200, {"ETag": resource["etag"]}, copy.deepcopy(resource)
+
+
+_CALENDAR = r"/calendars/(?P<calendar_id>[^/]+)"
+_EVENT = _CALENDAR + r"/events/(?P<event_id>[^/]+)"
+_RULE = _CALENDAR + r"/acl/(?P<rule_id>[^/]+)"
+
+ROUTES = [
+    (method, re.compile(path), name)
+    for method, path, name in (
+        ("GET", r"/users/me/calendarList", "list_calendar_list"),
+        ("POST", r"/users/me/calendarList/watch", "watch_calendar_list"),
+        (
+            "GET",
+            r"/users/me/calendarList/(?P<calendar_id>[^/]+)",
+            "get_calendar_list_entry",
+        ),
+        ("POST", r"/calendars", "insert_calendar"),
+        ("GET", _CALENDAR, "get_calendar"),
+        ("PATCH", _CALENDAR, "patch_calendar"),
+        ("PUT", _CALENDAR, "update_calendar"),
+        ("DELETE", _CALENDAR, "delete_calendar"),
+        ("GET", _CALENDAR + r"/acl", "list_acl"),
+        ("POST", _CALENDAR + r"/acl", "insert_acl"),
+        ("GET", _RULE, "get_acl"),
+        ("PATCH", _RULE, "patch_acl"),
+        ("PUT", _RULE, "update_acl"),
+        ("DELETE", _RULE, "delete_acl"),
+        ("GET", _CALENDAR + r"/events", "list_events"),
+        ("POST", _CALENDAR + r"/events", "insert_event"),
+        ("POST", _CALENDAR + r"/events/watch", "watch_events"),
+        ("GET", _EVENT, "get_event"),
+        ("PATCH", _EVENT, "patch_event"),
+        ("PUT", _EVENT, "update_event"),
+        ("DELETE", _EVENT, "delete_event"),
+        ("POST", r"/channels/stop", "stop_channel"),
+    )
+]
+
+
+class Faults:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 403,
+        error_reason: str = "rateLimitExceeded",
+        rate_limit: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        """Внедряемые задержки и ошибки квоты.
+
+        latency и jitter задают задержку HTTP-запроса в секундах (равномерно
+        в [latency, latency + jitter]). error_rate — доля запросов, на которые
+        отвечается error_status с error_reason. rate_limit — предел запросов
+        в секунду; сверх него сервер отвечает 403 rateLimitExceeded, как
+        Calendar API при исчерпании квоты. Подзапросы batch считаются отдельно.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.error_reason = error_reason
+        self.rate_limit = rate_limit
+        self._random = random.Random(seed)
+        self._tokens = rate_limit or 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + self.jitter * self._random.random()
+
+    def check(self):
+        """Исключение ApiError, если запрос должен завершиться ошибкой."""
+        with self._lock:
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate_limit,
+                    self._tokens + (now - self._updated) * self.rate_limit,
+                )
+                self._updated = now
+                if self._tokens < 1:
+                    raise ApiError(403, "rateLimitExceeded", "Rate Limit Exceeded")
+                self._tokens -= 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise ApiError(self.error_status, self.error_reason, "Injected error")
+
+
+class EmulatorWorkspace:
+    """Замена GAPIWorkspace с фиктивным токеном для работы с эмулятором."""
+
+    def __init__(self):
+        self.credentials = Credentials(token="emulator")
+
+    def get_credentials(self):
+        return self.credentials
+
+
+class CalendarEmulator:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        backend: Optional[CalendarBackend] = None,
+        faults: Optional[Faults] = None,
+    ):
+        """Локальный HTTP-сервер Calendar API v3 для тестов и бенчмарков.
+
+        Поддерживает calendars, calendarList, acl и events с пагинацией, syncToken,
+        If-Match/If-None-Match, multipart batch, а также внедряемые задержки
+        и ошибки квоты. Клиент подключается через ServiceFactory(root_url).
+        """
+        self.host = host
+        self.port = port
+        self.backend = backend if backend is not None else CalendarBackend()
+        self.faults = faults if faults is not None else Faults()
+        self.requests = 0
+        self.calls: Dict[str, int] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def root_url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_port
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="calendar-emulator",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("Calendar emulator listening on %s", self.root_url)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread.join()
+            self._thread = None
+
+    def factory(self, **kwargs) -> ServiceFactory:
+        """Фабрика сервисов, направляющая запросы в эмулятор."""
+        return ServiceFactory(root_url=self.root_url, **kwargs)
+
+    def dispatch(
+        self, method: str, target: str, headers: Dict[str, str], content: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Обработка HTTP-запроса; возвращает статус, заголовки и тело ответа."""
+        with self._lock:
+            self.requests += 1
+        delay = self.faults.delay()
+        if delay:
+            time.sleep(delay)
+        url = urlsplit(target)
+        headers = {key.lower(): value for key, value in headers.items()}
+        if method == "POST" and url.path == BATCH_PATH:
+            return self._batch(headers, content)
+        return self._call(method, url, headers, content)
+
+    def _call(self, method, url, headers, content) -> Tuple[int, Dict[str, str], bytes]:
+        try:
+            if not url.path.startswith(SERVICE_PATH):
+                raise ApiError(404, "notFound", f"Not Found: {url.path}")
+            path = url.path[len(SERVICE_PATH) :]
+            query = {
+                key: values if key == "privateExtendedProperty" else values[-1]
+                for key, values in parse_qs(url.query).items()
+            }
+            body = json.loads(content) if content else None
+            self._count(method, path)
+            self.faults.check()
+            status, extra, payload = self.backend.handle(
+                method, path, query, headers, body
+            )
+        except ApiError as e:
+            status, extra, payload = e.status, {}, e.body()
+        except ValueError as e:
+            status, extra, payload = 400, {}, ApiError(400, "parseError", str(e)).body()
+        except Exception as e:
+            logger.exception("Emulator failed to handle %s %s", method, url.path)
+            status, extra, payload = (
+                500,
+                {},
+                ApiError(500, "backendError", str(e)).body(),
+            )
+        if payload is None:
+            return status, extra, b""
+        response_headers = {"Content-Type": "application/json; charset=UTF-8", **extra}
+        return status, response_headers, json.dumps(payload).encode("utf-8")
+
+    def _batch(self, headers, content) -> Tuple[int, Dict[str, str], bytes]:
+        """Разбор multipart/mixed batch и сборка ответа из ответов подзапросов."""
+        content_type = headers.get("content-type", "")
+        message = BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + content
+        )
+        if not message.is_multipart():
+            error = ApiError(400, "invalid", "Batch body must be multipart/mixed")
+            return 400, {}, json.dumps(error.body()).encode("utf-8")
+        parts = message.get_payload()
+        if len(parts) > MAX_BATCH_SIZE:
+            error = ApiError(400, "invalid", "Too many requests in batch")
+            return 400, {}, json.dumps(error.body()).encode("utf-8")
+        self._count("POST", "batch")
+        boundary = f"batch_{uuid.uuid4().hex}"
+        chunks = []
+        for part in parts:
+            method, target, sub_headers, body = _parse_http(part.get_payload())
+            status, extra, payload = self._call(
+                method, urlsplit(target), sub_headers, body
+            )
+            lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}"]
+            lines += [f"{key}: {value}" for key, value in extra.items()]
+            lines.append(f"Content-Length: {len(payload)}")
+            content_id = part.get("Content-ID", "<+>").strip("<>")
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                + "\r\n".join(lines)
+                + "\r\n\r\n"
+                + payload.decode("utf-8")
+                + "\r\n"
+            )
+        chunks.append(f"--{boundary}--\r\n")
+        response_headers = {"Content-Type": f"multipart/mixed; boundary={boundary}"}
+        return 200, response_headers, "".join(chunks).encode("utf-8")
+
+    def _count(self, method: str, path: str):
+        name = "batch"
+        for route_method, pattern, route in ROUTES:
+            if route_method == method and pattern.fullmatch(path):
+                name = route
+                break
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+
+def _parse_http(payload: str) -> Tuple[str, str, Dict[str, str], bytes]:
+    """Разбор HTTP-запроса из части batch: метод, путь, заголовки и тело."""
+    head, _, body = payload.replace("\r\n", "\n").partition("\n\n")
+    request_line, *header_lines = head.split("\n")
+    method, target, _ = request_line.split(" ", 2)
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, target, headers, body.strip().encode("utf-8")
+
+
+def _handler(emulator: CalendarEmulator):
+    class EmulatorHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Заголовки и тело пишутся отдельно: без TCP_NODELAY каждый ответ
+        # keep-alive соединения ждал бы отложенного ACK клиента
+        disable_nagle_algorithm = True
+
+        def _serve(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            content = self.rfile.read(length) if length else b""
+            status, headers, body = emulator.dispatch(
+                self.command, self.path, dict(self.headers.items()), content
+            )
+            self.send_response(status, HTTP_REASONS.get(status))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _serve
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return EmulatorHandler
+
+
+def seed_events(
+    backend: CalendarBackend,
+    calendar_id: str,
+    count: int,
+    start: Optional[datetime.datetime] = None,
+    step: datetime.timedelta = datetime.timedelta(hours=1),
+) -> List[str]:
+    """Наполнение календаря count событиями напрямую, минуя HTTP."""
+    moment = start or datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    ids = []
+    for number in range(count):
+        end = moment + step / 2
+        _, _, event = backend.handle(
+            "POST",
+            f"/calendars/{calendar_id}/events",
+            {},
+            {},
+            {
+                "summary": f"Event {number}",
+                "start": {"dateTime": moment.isoformat()},
+                "end": {"dateTime": end.isoformat()},
+            },
+        )
+        ids.append(event["id"])
+        moment += step
+    return ids
@@ -1,12 +1,163 @@
+import datetime
 import logging
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+from batch.gbatch import DEFAULT_CHUNK_SIZE, BatchResult, GBatch, failure_summary
+from cache.gcache import ResponseCache, if_match
+from lookup.glookup import NameIndex
+from quota.gquota import QuotaGuard
 
 logger = logging.getLogger(__name__)
 
 
+def event_body(event_data: dict) -> dict:
+    """Преобразование данных события в тело запроса Calendar API.
+
+    Для событий на весь день вместо start_time/end_time передаются
+    start_date/end_date в формате YYYY-MM-DD; end_date не включается
+    в событие и по умолчанию равна следующему дню после start_date.
+    """
+    event = {
+        "summary": event_data.get("name", "New Event"),
+        "description": event_data.get("description", ""),
+        "start": {
+            "dateTime": event_data.get("start_time"),
+            "timeZone": event_data.get("timezone", "GMT+02:00"),
+        },
+        "end": {
+            "dateTime": event_data.get("end_time"),
+            "timeZone": event_data.get("timezone", "GMT+02:00"),
+        },
+        "reminders": {
+            "useDefault": False,
+            "overrides": [
+                {"method": alarm["type"], "minutes": int(alarm["time"])}
+                for alarm in event_data.get("alarm", [])
+            ],
+        },
+    }
+    if event_data.get("start_date"):
+        event["start"] = {"date": event_data["start_date"]}
+        end_date = event_data.get("end_date") or next_day(event_data["start_date"])
+        event["end"] = {"date": end_date}
+    if event_data.get("ical_uid"):
+        event["iCalUID"] = event_data["ical_uid"]
+    if event_data.get("event_id"):
+        # ID, назначенный клиентом: символы base32hex, от 5 до 1024
+        event["id"] = event_data["event_id"]
+    if event_data.get("properties"):
+        event["extendedProperties"] = {"private": _properties(event_data)}
+    return event
+
+
+def next_day(date: str) -> str:
+    """Дата YYYY-MM-DD следующего дня: конец однодневного события."""
+    return (datetime.date.fromisoformat(date) + datetime.timedelta(days=1)).isoformat()
+
+
+def _properties(event_data: dict) -> dict:
+    """Приватные свойства события: значения в API всегда строки."""
+    return {
+        key: None if value is None else str(value)
+        for key, value in event_data["properties"].items()
+    }
+
+
+def event_query(data: dict) -> dict:
+    """Параметры фильтрации events().list из данных запроса.
+
+    text — полнотекстовый поиск (q), updated_min — события, измененные не
+    раньше указанного времени, ical_uid — события с этим iCalUID, properties —
+    словарь приватных свойств, каждое из которых должно совпасть,
+    show_deleted — включать отмененные события. Фильтры применяет сервер.
+    """
+    params = {}
+    if data.get("text"):
+        params["q"] = data["text"]
+    if data.get("updated_min"):
+        params["updatedMin"] = data["updated_min"]
+    if data.get("ical_uid"):
+        params["iCalUID"] = data["ical_uid"]
+    if data.get("properties"):
+        params["privateExtendedProperty"] = [
+            f"{key}={value}" for key, value in data["properties"].items()
+        ]
+    if data.get("show_deleted"):
+        params["showDeleted"] = True
+    return params
+
+
+def _time_patch(event_data: dict, prefix: str, current: Optional[dict]):
+    """Новое значение start/end или None, если поле не меняется."""
+    if "start_date" in event_data or "end_date" in event_data:
+        if prefix == "start":
+            date = event_data.get("start_date")
+        else:
+            date = event_data.get("end_date")
+            if not date and event_data.get("start_date"):
+                # end.date не включается в событие: по умолчанию следующий день
+                date = next_day(event_data["start_date"])
+        # null сбрасывает dateTime при переводе события в формат "весь день"
+        return {"date": date, "dateTime": None, "timeZone": None} if date else None
+    if f"{prefix}_time" not in event_data and "timezone" not in event_data:
+        return None
+    value = {k: v for k, v in (current or {}).items() if k != "date"}
+    if f"{prefix}_time" in event_data:
+        value["dateTime"] = event_data[f"{prefix}_time"]
+    if "timezone" in event_data:
+        value["timeZone"] = event_data["timezone"]
+    if current is None or "date" in current:
+        value["date"] = None
+    return value
+
+
+def event_patch(event_data: dict, current: Optional[dict] = None) -> dict:
+    """Минимальное тело PATCH-запроса по измененным полям event_data.
+
+    В тело попадают только переданные поля; если известна текущая версия
+    события current, поля с совпадающими значениями отбрасываются.
+    """
+    patch = {}
+    if "name" in event_data:
+        patch["summary"] = event_data["name"]
+    if "description" in event_data:
+        patch["description"] = event_data["description"]
+    if "alarm" in event_data:
+        patch["reminders"] = event_body({"alarm": event_data["alarm"]})["reminders"]
+    if "ical_uid" in event_data:
+        patch["iCalUID"] = event_data["ical_uid"]
+    if "properties" in event_data:
+        # PATCH объединяет свойства с текущими, None удаляет свойство
+        patch["extendedProperties"] = {"private": _properties(event_data)}
+    for prefix in ("start", "end"):
+        value = _time_patch(event_data, prefix, (current or {}).get(prefix))
+        if value is not None:
+            patch[prefix] = value
+    if current is None:
+        return patch
+    return {
+        key: value
+        for key, value in patch.items()
+        if _without_nulls(value) != current.get(key)
+    }
+
+
+def _without_nulls(value):
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if v is not None}
+    return value
+
+
 class GEvent:
     def __init__(self, gcalendar):
         """Инициализация работы с событиями в Google Calendar."""
         self.service = gcalendar.service
+        # Индекс имен общий с календарем, если он был подключен
+        self.lookup: Optional[NameIndex] = getattr(gcalendar, "lookup", None)
+        self.cache: Optional[ResponseCache] = getattr(gcalendar, "cache", None)
+        self.quota: QuotaGuard = getattr(gcalendar, "quota", None) or QuotaGuard()
         self.data = None
         self.error = None
         logger.info("GEvent initialized")
@@ -14,95 +165,312 @@ class GEvent:
     def create(self, calendar_id: str, event_data: dict):
         """Создание нового события."""
         try:
-            logger.info(f"Creating event: {event_data.get('name', 'New Event')}")
-            event = {
-                "summary": event_data.get("name", "New Event"),
-                "description": event_data.get("description", ""),
-                "start": {
-                    "dateTime": event_data.get("start_time"),
-                    "timeZone": event_data.get("timezone", "GMT+02:00"),
-                },
-                "end": {
-                    "dateTime": event_data.get("end_time"),
-                    "timeZone": event_data.get("timezone", "GMT+02:00"),
-                },
-                "reminders": {
-                    "useDefault": False,
-                    "overrides": [
-                        {"method": alarm["type"], "minutes": int(alarm["time"])}
-                        for alarm in event_data.get("alarm", [])
-                    ],
-                },
-            }
-            event_entry = (
-                self.service.events()
-                .insert(calendarId=calendar_id, body=event)
-                .execute()
+            logger.info("Creating event: %s", event_data.get("name", "New Event"))
+            event = event_body(event_data)
+            event_entry = self.quota.execute(
+                self.service.events().insert(calendarId=calendar_id, body=event)
             )
             self.data = event_entry
-            logger.info(f"Event {event_entry['id']} successfully created")
+            self._index_put(calendar_id, event_entry)
+            self._cache_store(calendar_id, event_entry)
+            logger.info("Event %s successfully created", event_entry["id"])
             return event_entry  # Возвращаем объект события
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error creating event: {e}")
+            logger.error("Error creating event: %s", e)
             return False
 
     def delete(self, calendar_id: str, event_id: str):
         """Удаление события по ID."""
         try:
             logger.info(
-                f"Deleting event with id: {event_id} from calendar {calendar_id}"
+                "Deleting event with id: %s from calendar %s", event_id, calendar_id
+            )
+            self.quota.execute(
+                self.service.events().delete(calendarId=calendar_id, eventId=event_id)
             )
-            self.service.events().delete(
-                calendarId=calendar_id, eventId=event_id
-            ).execute()
             self.data = None
-            logger.info(f"Event {event_id} successfully deleted")
+            self._index_remove(calendar_id, event_id)
+            self._cache_invalidate(calendar_id, event_id)
+            logger.info("Event %s successfully deleted", event_id)
             return True
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error deleting event {event_id}: {e}")
+            logger.error("Error deleting event %s: %s", event_id, e)
             return False
 
     def select(self, calendar_id: str, data: dict):
         """Поиск события по имени."""
         try:
-            logger.info(f"Selecting event by name: {data.get('name')}")
-            events = self.service.events().list(calendarId=calendar_id).execute()
-            for event in events["items"]:
+            logger.info("Selecting event by name: %s", data.get("name"))
+            if self.lookup is not None:
+                events = self.lookup.search(
+                    self._indexed_scope(calendar_id), data.get("name")
+                )
+            else:
+                events = self._select_candidates(calendar_id, data.get("name"))
+            for event in events:
                 if data.get("name") in event["summary"]:
                     self.data = event
-                    logger.info(f"Event {event['id']} selected")
+                    logger.info("Event %s selected", event["id"])
                     return event.get("id", False)
-            logger.warning(f"Event with name {data.get('name')} not found")
+            logger.warning("Event with name %s not found", data.get("name"))
             return False
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error selecting event: {e}")
+            logger.error("Error selecting event: %s", e)
             return False
 
-    def edit(self, calendar_id: str, event_id: str, event_data: dict):
-        """Редактирование события."""
+    def edit(
+        self,
+        calendar_id: str,
+        event_id: str,
+        event_data: dict,
+        etag: Optional[str] = None,
+    ):
+        """Редактирование события одним PATCH-запросом без предварительного GET.
+
+        Отправляются только измененные поля. При наличии копии в кэше или etag
+        запрос защищается заголовком If-Match.
+        """
         try:
-            logger.info(f"Editing event with id: {event_id}")
-            event = (
-                self.service.events()
-                .get(calendarId=calendar_id, eventId=event_id)
-                .execute()
-            )
-            event["summary"] = event_data.get("name", event["summary"])
-            event["description"] = event_data.get(
-                "description", event.get("description", "")
-            )
-            updated_event = (
-                self.service.events()
-                .update(calendarId=calendar_id, eventId=event_id, body=event)
-                .execute()
+            logger.info("Editing event with id: %s", event_id)
+            current = self._cached(calendar_id, event_id)
+            body = event_patch(event_data, current)
+            if current is not None and not body:
+                # Копию мог изменить другой клиент: пропуск только после
+                # проверки условным GET (304 без тела, если она актуальна)
+                current = self._fetch(calendar_id, event_id, revalidate=True)
+                body = event_patch(event_data, current)
+            if current is not None and not body:
+                self.data = current
+                logger.info("Event %s unchanged, skipping update", event_id)
+                return current
+            request = self.service.events().patch(
+                calendarId=calendar_id, eventId=event_id, body=body
             )
+            if_match(request, {"etag": etag} if etag else current)
+            updated_event = self._execute_write(calendar_id, event_id, request)
             self.data = updated_event
-            logger.info(f"Event {event_id} successfully updated")
+            self._index_put(calendar_id, updated_event)
+            self._cache_store(calendar_id, updated_event)
+            logger.info("Event %s successfully updated", event_id)
             return updated_event
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error editing event {event_id}: {e}")
+            logger.error("Error editing event %s: %s", event_id, e)
             return False
+
+    def get(self, calendar_id: str, event_id: str):
+        """Получение события по ID."""
+        try:
+            logger.info("Retrieving event %s from calendar %s", event_id, calendar_id)
+            event = self._fetch(calendar_id, event_id)
+            self.data = event
+            logger.info("Event %s successfully retrieved", event_id)
+            return event
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error retrieving event %s: %s", event_id, e)
+            return False
+
+    def create_many(
+        self,
+        calendar_id: str,
+        events: Iterable[dict],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[BatchResult]:
+        """Пакетное создание событий через batch-запросы."""
+        logger.info("Creating events in batch for calendar %s", calendar_id)
+        batch = GBatch(self.service, chunk_size=chunk_size, quota=self.quota)
+        for event_data in events:
+            try:
+                request = self.service.events().insert(
+                    calendarId=calendar_id, body=event_body(event_data)
+                )
+            except Exception as e:
+                batch.reject(event_data, e)
+                continue
+            batch.add(request, item=event_data)
+        results = self._finish_batch(batch, "creating events")
+        for result in results:
+            if result.ok:
+                self._index_put(calendar_id, result.response)
+                self._cache_store(calendar_id, result.response)
+        return results
+
+    def edit_many(
+        self,
+        calendar_id: str,
+        changes: Iterable[Tuple[str, dict]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[BatchResult]:
+        """Пакетное редактирование событий, changes — пары (event_id, event_data)."""
+        logger.info("Editing events in batch for calendar %s", calendar_id)
+        batch = GBatch(self.service, chunk_size=chunk_size, quota=self.quota)
+        for event_id, event_data in changes:
+            current = self._cached(calendar_id, event_id)
+            try:
+                request = self.service.events().patch(
+                    calendarId=calendar_id,
+                    eventId=event_id,
+                    body=event_patch(event_data, current),
+                )
+            except Exception as e:
+                batch.reject((event_id, event_data), e)
+                continue
+            if_match(request, current)
+            batch.add(request, item=(event_id, event_data))
+        results = self._finish_batch(batch, "editing events")
+        for result in results:
+            if result.ok:
+                self._index_put(calendar_id, result.response)
+                self._cache_store(calendar_id, result.response)
+            elif getattr(getattr(result.error, "resp", None), "status", None) == 412:
+                self._cache_invalidate(calendar_id, result.item[0])
+        return results
+
+    def delete_many(
+        self,
+        calendar_id: str,
+        event_ids: Iterable[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[BatchResult]:
+        """Пакетное удаление событий по ID."""
+        logger.info("Deleting events in batch from calendar %s", calendar_id)
+        batch = GBatch(self.service, chunk_size=chunk_size, quota=self.quota)
+        for event_id in event_ids:
+            request = self.service.events().delete(
+                calendarId=calendar_id, eventId=event_id
+            )
+            batch.add(request, item=event_id)
+        results = self._finish_batch(batch, "deleting events")
+        for result in results:
+            if result.ok:
+                self._index_remove(calendar_id, result.item)
+                self._cache_invalidate(calendar_id, result.item)
+        return results
+
+    def find(self, calendar_id: str, name: str, match: str = "substring"):
+        """Поиск событий по имени через индекс.
+
+        match: "exact", "prefix", "substring" или "token" (все слова имени).
+        """
+        try:
+            logger.info("Finding events by name (%s): %s", match, name)
+            if self.lookup is None:
+                raise ValueError("Lookup index is not configured")
+            scope = self._indexed_scope(calendar_id)
+            events = self.lookup.find(scope, name, match)
+            logger.info("Found %s events matching %s", len(events), name)
+            return events
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error finding events: %s", e)
+            return []
+
+    def search(self, calendar_id: str, data: dict, fields: Optional[str] = None):
+        """Поиск событий с фильтрацией на сервере и обходом всех страниц.
+
+        Фильтры data описаны в event_query; fields задает проекцию полей
+        события, например "id,summary,extendedProperties".
+        """
+        try:
+            logger.info("Searching events in calendar %s", calendar_id)
+            params = event_query(data)
+            if fields:
+                params["fields"] = f"nextPageToken,items({fields})"
+            events = list(self._iter_all(calendar_id, **params))
+            logger.info("Found %s events in calendar %s", len(events), calendar_id)
+            return events
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error searching events in calendar %s: %s", calendar_id, e)
+            return []
+
+    def find_by_properties(
+        self, calendar_id: str, properties: dict, fields: Optional[str] = None
+    ):
+        """События, созданные с приватными свойствами properties.
+
+        Сервер возвращает только совпавшие события, поэтому поиск своего
+        события по ключу обходится одним небольшим запросом.
+        """
+        return self.search(calendar_id, {"properties": properties}, fields)
+
+    def _indexed_scope(self, calendar_id: str) -> str:
+        scope = f"events/{calendar_id}"
+        if not self.lookup.is_fresh(scope):
+            self.lookup.load(scope, self._iter_all(calendar_id))
+        return scope
+
+    def _select_candidates(self, calendar_id: str, name: str) -> Iterator[dict]:
+        """События для поиска подстроки name в summary.
+
+        q сервера находит только целые слова, поэтому сначала проверяются
+        отобранные им события, а если среди них совпадения нет — все.
+        """
+        if name:
+            yield from self._iter_all(calendar_id, q=name)
+        yield from self._iter_all(calendar_id)
+
+    def _iter_all(self, calendar_id: str, **params) -> Iterator[dict]:
+        page_token = None
+        while True:
+            response = self.quota.execute(
+                self.service.events().list(
+                    calendarId=calendar_id, pageToken=page_token, **params
+                )
+            )
+            yield from response.get("items", [])
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    def _index_put(self, calendar_id: str, event: dict):
+        if self.lookup is not None and event:
+            self.lookup.put(f"events/{calendar_id}", event)
+
+    def _index_remove(self, calendar_id: str, event_id: str):
+        if self.lookup is not None:
+            self.lookup.remove(f"events/{calendar_id}", event_id)
+
+    def _fetch(self, calendar_id: str, event_id: str, revalidate: bool = False) -> dict:
+        request = self.service.events().get(calendarId=calendar_id, eventId=event_id)
+        if self.cache is None:
+            return self.quota.execute(request)
+        return self.cache.fetch(
+            f"events/{calendar_id}/{event_id}",
+            request,
+            self.quota.execute,
+            revalidate=revalidate,
+        )
+
+    def _cached(self, calendar_id: str, event_id: str) -> Optional[dict]:
+        if self.cache is None:
+            return None
+        return self.cache.get(f"events/{calendar_id}/{event_id}")
+
+    def _execute_write(self, calendar_id: str, event_id: str, request) -> dict:
+        try:
+            return self.quota.execute(request)
+        except HttpError as e:
+            # 412: событие изменилось с момента чтения, копия в кэше устарела
+            if e.resp.status == 412:
+                self._cache_invalidate(calendar_id, event_id)
+            raise
+
+    def _cache_store(self, calendar_id: str, event: dict):
+        if self.cache is not None and event:
+            self.cache.store(f"events/{calendar_id}/{event['id']}", event)
+
+    def _cache_invalidate(self, calendar_id: str, event_id: str):
+        if self.cache is not None:
+            self.cache.invalidate(f"events/{calendar_id}/{event_id}")
+
+    def _finish_batch(self, batch: GBatch, action: str) -> List[BatchResult]:
+        results = batch.execute()
+        error = failure_summary(results, action)
+        if error:
+            self.error = error
+        return results
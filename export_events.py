@@ -0,0 +1,62 @@
+import argparse
+import logging
+
+import conf
+from exporter.gexport import WRITERS, GExport
+from gcalendar.gcalendar import MAX_PAGE_SIZE, GCalendar
+from main import initialize_gapi
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(
+        description="Export events of all calendars to JSONL, iCalendar or Parquet"
+    )
+    parser.add_argument("directory", help="output directory, one file per calendar")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument(
+        "--calendar",
+        action="append",
+        dest="calendars",
+        help="calendar ID to export (repeatable); all calendars by default",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="checkpoint file used to resume an interrupted export",
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=MAX_PAGE_SIZE)
+    parser.add_argument(
+        "--single-events",
+        action="store_true",
+        help="expand recurring events into instances",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Экспорт событий календарей в файлы"""
+    args = parse_args(argv)
+    gapi_workspace = initialize_gapi()
+    exporter = GExport(
+        GCalendar(gapi_workspace),
+        args.directory,
+        fmt=args.format,
+        checkpoint_path=args.checkpoint,
+        workers=args.workers,
+        page_size=args.page_size,
+        single_events=args.single_events,
+    )
+    stats = exporter.run(args.calendars)
+    if stats is False:
+        logger.error("Export failed: %s", exporter.error)
+        return 1
+    return 0 if not stats["failed"] else 2
+
+
+if __name__ == "__main__":
+    conf.configure_logging()
+    raise SystemExit(main())
@@ -0,0 +1,509 @@
+import datetime
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from gcalendar.gcalendar import MAX_PAGE_SIZE
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet-экспорт необязателен
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = ".export-checkpoint"
+CALENDARS_NAME = "calendars.jsonl"
+
+# Колонки Parquet-файла; полное событие хранится в колонке raw
+PARQUET_COLUMNS = (
+    "calendar_id",
+    "id",
+    "ical_uid",
+    "status",
+    "summary",
+    "description",
+    "location",
+    "start",
+    "end",
+    "timezone",
+    "all_day",
+    "recurrence",
+    "created",
+    "updated",
+    "raw",
+)
+
+
+def export_filename(calendar_id: str, extension: str) -> str:
+    """Имя файла экспорта календаря без символов, недопустимых в путях."""
+    name = re.sub(r"[^\w.@-]", "_", calendar_id)
+    return f"{name}.{extension}"
+
+
+def _ics_escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line: str) -> str:
+    """Перенос строки длиннее 75 октетов (RFC 5545, 3.1)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        # Не разрезаем многобайтовый символ UTF-8
+        while limit < len(encoded) and encoded[limit] & 0xC0 == 0x80:
+            limit -= 1
+        parts.append(encoded[:limit].decode("utf-8"))
+        encoded = encoded[limit:]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_time(name: str, value: dict) -> str:
+    if "date" in value:
+        return f"{name};VALUE=DATE:{value['date'].replace('-', '')}"
+    moment = datetime.datetime.fromisoformat(value["dateTime"])
+    if moment.tzinfo is None:
+        if value.get("timeZone"):
+            return f"{name};TZID={value['timeZone']}:{moment:%Y%m%dT%H%M%S}"
+        return f"{name}:{moment:%Y%m%dT%H%M%S}"
+    moment = moment.astimezone(datetime.timezone.utc)
+    return f"{name}:{moment:%Y%m%dT%H%M%SZ}"
+
+
+def event_ics(event: dict) -> str:
+    """Событие Calendar API в виде блока VEVENT.
+
+    Измененный или отмененный экземпляр серии получает UID серии и
+    RECURRENCE-ID из originalStartTime, чтобы клиенты применили его
+    к одному повторению, а не ко всей серии.
+    """
+    uid = event.get("iCalUID") or event.get("recurringEventId") or event["id"]
+    lines = ["BEGIN:VEVENT", f"UID:{uid}"]
+    if event.get("updated"):
+        stamp = datetime.datetime.fromisoformat(event["updated"])
+        lines.append(
+            f"DTSTAMP:{stamp.astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}"
+        )
+    original = event.get("originalStartTime")
+    if original:
+        lines.append(_ics_time("RECURRENCE-ID", original))
+    if event.get("start"):
+        lines.append(_ics_time("DTSTART", event["start"]))
+    elif original:
+        # У отмененного экземпляра API возвращает только исходное время
+        lines.append(_ics_time("DTSTART", original))
+    if event.get("end"):
+        lines.append(_ics_time("DTEND", event["end"]))
+    for field, name in (
+        ("summary", "SUMMARY"),
+        ("description", "DESCRIPTION"),
+        ("location", "LOCATION"),
+    ):
+        if event.get(field):
+            lines.append(f"{name}:{_ics_escape(event[field])}")
+    if event.get("status"):
+        lines.append(f"STATUS:{event['status'].upper()}")
+    lines.extend(event.get("recurrence", []))
+    for override in event.get("reminders", {}).get("overrides", []):
+        action = "EMAIL" if override.get("method") == "email" else "DISPLAY"
+        lines.extend(
+            [
+                "BEGIN:VALARM",
+                f"ACTION:{action}",
+                f"TRIGGER:-PT{override.get('minutes', 0)}M",
+                f"DESCRIPTION:{_ics_escape(event.get('summary', ''))}",
+                "END:VALARM",
+            ]
+        )
+    lines.append("END:VEVENT")
+    return "".join(_ics_fold(line) for line in lines)
+
+
+def event_row(calendar_id: str, event: dict) -> dict:
+    """Плоская строка события для колоночного формата."""
+    start = event.get("start", {})
+    end = event.get("end", {})
+    return {
+        "calendar_id": calendar_id,
+        "id": event.get("id"),
+        "ical_uid": event.get("iCalUID"),
+        "status": event.get("status"),
+        "summary": event.get("summary"),
+        "description": event.get("description"),
+        "location": event.get("location"),
+        "start": start.get("dateTime") or start.get("date"),
+        "end": end.get("dateTime") or end.get("date"),
+        "timezone": start.get("timeZone"),
+        "all_day": "date" in start,
+        "recurrence": "\n".join(event.get("recurrence", [])) or None,
+        "created": event.get("created"),
+        "updated": event.get("updated"),
+        "raw": json.dumps(event),
+    }
+
+
+class _FileWriter:
+    """Запись в файл с продолжением с байтового смещения."""
+
+    extension = ""
+    resumable = True
+
+    def __init__(self, path: str, calendar_id: str, offset: int = 0):
+        self.path = path
+        self.calendar_id = calendar_id
+        if offset and os.path.exists(path):
+            self._file = open(path, "r+b")
+            # Отбрасываем все, что записано после последней подтвержденной страницы
+            self._file.truncate(offset)
+            self._file.seek(offset)
+        else:
+            self._file = open(path, "wb")
+            self._start()
+
+    def reset(self):
+        self._file.seek(0)
+        self._file.truncate()
+        self._start()
+
+    def tell(self) -> int:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self, complete: bool = False):
+        if complete:
+            self._finish()
+        self._file.close()
+
+    def _start(self):
+        pass
+
+    def _finish(self):
+        pass
+
+
+class JsonlWriter(_FileWriter):
+    extension = "jsonl"
+
+    def write(self, events: List[dict]):
+        self._file.write(
+            "".join(json.dumps(event) + "\n" for event in events).encode("utf-8")
+        )
+
+
+class IcsWriter(_FileWriter):
+    extension = "ics"
+
+    def write(self, events: List[dict]):
+        self._file.write("".join(event_ics(event) for event in events).encode("utf-8"))
+
+    def _start(self):
+        header = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//GoogleCalendarIntegration//export//EN",
+            f"X-WR-CALNAME:{_ics_escape(self.calendar_id)}",
+        ]
+        self._file.write("".join(_ics_fold(line) for line in header).encode("utf-8"))
+
+    def _finish(self):
+        self._file.write(b"END:VCALENDAR\r\n")
+
+
+class ParquetWriter:
+    """Колоночный экспорт через pyarrow; строки пишутся группами по row_group_size.
+
+    Parquet-файл нельзя дописать после сбоя, поэтому календарь
+    при продолжении экспорта выгружается заново.
+    """
+
+    extension = "parquet"
+    resumable = False
+    row_group_size = 10000
+
+    def __init__(self, path: str, calendar_id: str, offset: int = 0):
+        if pyarrow is None:
+            raise RuntimeError("Parquet export requires the pyarrow package")
+        self.path = path
+        self.calendar_id = calendar_id
+        self.schema = pyarrow.schema(
+            [
+                (name, pyarrow.bool_() if name == "all_day" else pyarrow.string())
+                for name in PARQUET_COLUMNS
+            ]
+        )
+        self._rows: List[dict] = []
+        self._written = 0
+        self._writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, events: List[dict]):
+        self._rows.extend(event_row(self.calendar_id, event) for event in events)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def reset(self):
+        self._writer.close()
+        self._rows = []
+        self._written = 0
+        self._writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+    def tell(self) -> int:
+        return self._written + len(self._rows)
+
+    def close(self, complete: bool = False):
+        if complete:
+            self._flush()
+        self._writer.close()
+
+    def _flush(self):
+        if self._rows:
+            table = pyarrow.Table.from_pylist(self._rows, schema=self.schema)
+            self._writer.write_table(table)
+            self._written += len(self._rows)
+            self._rows = []
+
+
+WRITERS = {"jsonl": JsonlWriter, "ics": IcsWriter, "parquet": ParquetWriter}
+
+
+class ExportCheckpoint:
+    def __init__(self, path: str = ":memory:"):
+        """Прогресс экспорта: следующая страница и смещение файла по календарям."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            keys = [
+                row[1]
+                for row in self._conn.execute("PRAGMA table_info(calendars)")
+                if row[5]
+            ]
+            if keys == ["calendar_id"]:
+                # Прежняя схема хранила один формат на календарь: экспорт заново
+                self._conn.execute("DROP TABLE calendars")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS calendars ("
+                " calendar_id TEXT NOT NULL,"
+                " format TEXT NOT NULL,"
+                " page_token TEXT,"
+                " offset INTEGER NOT NULL,"
+                " events INTEGER NOT NULL,"
+                " done INTEGER NOT NULL,"
+                " PRIMARY KEY (calendar_id, format))"
+            )
+
+    def get(self, calendar_id: str, fmt: str) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_token, offset, events, done FROM calendars"
+                " WHERE calendar_id = ? AND format = ?",
+                (calendar_id, fmt),
+            ).fetchone()
+        if row is None:
+            return {"page_token": None, "offset": 0, "events": 0, "done": False}
+        page_token, offset, events, done = row
+        return {
+            "page_token": page_token,
+            "offset": offset,
+            "events": events,
+            "done": bool(done),
+        }
+
+    def save(self, calendar_id: str, fmt: str, state: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO calendars"
+                " (calendar_id, format, page_token, offset, events, done)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    calendar_id,
+                    fmt,
+                    state["page_token"],
+                    state["offset"],
+                    state["events"],
+                    int(state["done"]),
+                ),
+            )
+
+    def clear(self, fmt: str, calendar_ids: Iterable[str]):
+        """Удаление прогресса календарей после завершенного экспорта."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM calendars WHERE calendar_id = ? AND format = ?",
+                [(calendar_id, fmt) for calendar_id in calendar_ids],
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class GExport:
+    def __init__(
+        self,
+        gcalendar,
+        directory: str,
+        fmt: str = "jsonl",
+        checkpoint_path: Optional[str] = None,
+        workers: int = 4,
+        page_size: int = MAX_PAGE_SIZE,
+        single_events: bool = False,
+    ):
+        """Потоковый экспорт событий всех календарей в JSONL, iCalendar или Parquet.
+
+        Каждый календарь пишется в свой файл в directory, календари
+        выгружаются параллельно в workers потоков. В памяти держится не больше
+        одной страницы событий на поток. После каждой страницы в checkpoint_path
+        сохраняются токен следующей страницы и длина файла, поэтому повторный
+        запуск продолжает экспорт с последней завершенной страницы. Когда все
+        календари выгружены без ошибок, прогресс удаляется, и следующий запуск
+        снова экспортирует календари полностью.
+        """
+        if fmt not in WRITERS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.gcalendar = gcalendar
+        self.service = gcalendar.service
+        self.quota = gcalendar.quota
+        self.directory = directory
+        self.fmt = fmt
+        os.makedirs(directory, exist_ok=True)
+        self.checkpoint = ExportCheckpoint(
+            checkpoint_path or os.path.join(directory, CHECKPOINT_NAME)
+        )
+        self.workers = workers
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        self.single_events = single_events
+        self.data = None
+        self.error = None
+        logger.info("GExport initialized")
+
+    def run(self, calendar_ids: Optional[Iterable[str]] = None):
+        """Экспорт календарей; по умолчанию всех из calendarList.
+
+        Возвращает {"calendars", "events", "resumed", "failed"} или False при ошибке.
+        """
+        try:
+            if calendar_ids is None:
+                calendar_ids = self._export_calendar_list()
+            stats = {"calendars": 0, "events": 0, "resumed": 0, "failed": []}
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {
+                    calendar_id: pool.submit(self._export_calendar, calendar_id)
+                    for calendar_id in calendar_ids
+                }
+                for calendar_id, future in futures.items():
+                    try:
+                        events, resumed = future.result()
+                    except Exception as e:
+                        logger.error("Error exporting calendar %s: %s", calendar_id, e)
+                        stats["failed"].append(calendar_id)
+                        continue
+                    stats["calendars"] += 1
+                    stats["events"] += events
+                    stats["resumed"] += resumed
+            if not stats["failed"]:
+                self.checkpoint.clear(self.fmt, futures)
+            self.data = stats
+            logger.info(
+                "Exported %s events from %s calendars, %s failed",
+                stats["events"],
+                stats["calendars"],
+                len(stats["failed"]),
+            )
+            return stats
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error exporting calendars: %s", e)
+            return False
+
+    def _export_calendar_list(self) -> List[str]:
+        """Запись calendarList в calendars.jsonl; возвращает ID календарей."""
+        calendar_ids = []
+        path = os.path.join(self.directory, CALENDARS_NAME)
+        with open(path, "w", encoding="utf-8") as f:
+            for calendar in self.gcalendar.iter_calendars():
+                f.write(json.dumps(calendar) + "\n")
+                calendar_ids.append(calendar["id"])
+        logger.info("Exported calendar list with %s calendars", len(calendar_ids))
+        return calendar_ids
+
+    def _export_calendar(self, calendar_id: str):
+        """Постраничная выгрузка календаря; возвращает (событий, продолжен ли)."""
+        state = self.checkpoint.get(calendar_id, self.fmt)
+        if state["done"]:
+            logger.info("Calendar %s already exported", calendar_id)
+            return state["events"], False
+        writer_class = WRITERS[self.fmt]
+        path = os.path.join(
+            self.directory, export_filename(calendar_id, writer_class.extension)
+        )
+        resumed = bool(writer_class.resumable and state["offset"])
+        if not resumed:
+            state = {"page_token": None, "offset": 0, "events": 0, "done": False}
+        else:
+            logger.info("Resuming export of calendar %s", calendar_id)
+        writer = writer_class(path, calendar_id, state["offset"])
+        complete = False
+        try:
+            while True:
+                try:
+                    response = self._list_page(calendar_id, state["page_token"])
+                except HttpError as e:
+                    if not state["page_token"] or e.resp.status not in (400, 410):
+                        raise
+                    # Сохраненный токен страницы больше не принимается сервером
+                    logger.warning(
+                        "Page token expired for calendar %s, restarting export",
+                        calendar_id,
+                    )
+                    writer.reset()
+                    state = {"page_token": None, "offset": 0, "events": 0}
+                    continue
+                items = response.get("items", [])
+                writer.write(items)
+                state["events"] += len(items)
+                state["page_token"] = response.get("nextPageToken")
+                state["done"] = not state["page_token"]
+                if state["done"]:
+                    writer.close(complete=True)
+                    complete = True
+                    state["offset"] = os.path.getsize(path)
+                else:
+                    state["offset"] = writer.tell()
+                self.checkpoint.save(calendar_id, self.fmt, state)
+                if complete:
+                    logger.info(
+                        "Exported %s events from calendar %s",
+                        state["events"],
+                        calendar_id,
+                    )
+                    return state["events"], resumed
+        finally:
+            if not complete:
+                writer.close()
+
+    def _list_page(self, calendar_id: str, page_token: Optional[str]) -> dict:
+        params = {
+            "calendarId": calendar_id,
+            "maxResults": self.page_size,
+            "pageToken": page_token,
+        }
+        if self.single_events:
+            params["singleEvents"] = True
+        return self.quota.execute(self.service.events().list(**params))
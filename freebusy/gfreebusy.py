@@ -0,0 +1,301 @@
+import datetime
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Ограничение freebusy().query на число календарей в одном запросе
+MAX_FREEBUSY_ITEMS = 50
+
+Moment = Union[str, float, int, datetime.datetime]
+
+# Период вперед от текущего момента, за который разворачиваются серии
+RECURRENCE_HORIZON = 366 * 24 * 3600
+
+
+def to_timestamp(value: Moment) -> float:
+    """Секунды Unix из RFC 3339, datetime или числа.
+
+    datetime без часового пояса и даты без времени считаются UTC.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+def to_rfc3339(timestamp: float) -> str:
+    """Секунды Unix в строку RFC 3339 в UTC."""
+    moment = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+def event_interval(event: dict) -> Optional[Tuple[float, float]]:
+    """Интервал занятости события; None для отмененных и «свободных» событий."""
+    if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+        return None
+    start, end = event.get("start", {}), event.get("end", {})
+    start = start.get("dateTime") or start.get("date")
+    end = end.get("dateTime") or end.get("date")
+    if not start or not end:
+        return None
+    return to_timestamp(start), to_timestamp(end)
+
+
+def merge_intervals(intervals: Iterable[Tuple[float, float]]):
+    """Объединение пересекающихся и смежных интервалов.
+
+    Возвращает пару отсортированных списков (начала, концы) без пересечений.
+    """
+    starts: List[float] = []
+    ends: List[float] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class BusyIndex:
+    def __init__(self):
+        """Индекс занятости календарей на отсортированных массивах.
+
+        Для каждого календаря хранятся непересекающиеся интервалы, упорядоченные
+        по началу, поэтому проверка конфликта — один двоичный поиск.
+        """
+        self._starts: Dict[str, List[float]] = {}
+        self._ends: Dict[str, List[float]] = {}
+        self._lock = threading.RLock()
+
+    def set(self, calendar_id: str, intervals: Iterable[Tuple[float, float]]):
+        """Замена всех интервалов календаря."""
+        starts, ends = merge_intervals(intervals)
+        with self._lock:
+            self._starts[calendar_id] = starts
+            self._ends[calendar_id] = ends
+
+    def load_events(
+        self,
+        calendar_id: str,
+        events: Iterable[dict],
+        time_min: Optional[Moment] = None,
+        time_max: Optional[Moment] = None,
+    ):
+        """Загрузка занятости из событий Calendar API.
+
+        Основные события серий (список без singleEvents) разворачиваются
+        в экземпляры до time_max, по умолчанию на RECURRENCE_HORIZON вперед;
+        измененные и отмененные экземпляры заменяют повторения серии.
+        """
+        events = list(events)
+        masters = {event.get("id") for event in events if event.get("recurrence")}
+        recurring = []
+        intervals = []
+        for event in events:
+            if event.get("recurrence") or event.get("recurringEventId") in masters:
+                recurring.append(event)
+            else:
+                interval = event_interval(event)
+                if interval is not None:
+                    intervals.append(interval)
+        if recurring:
+            # grecurrence сам импортирует этот модуль
+            from recurrence.grecurrence import RecurrenceExpander
+
+            if time_max is None:
+                time_max = time.time() + RECURRENCE_HORIZON
+            instances = RecurrenceExpander().expand(recurring, time_min, time_max)
+            intervals.extend(filter(None, map(event_interval, instances)))
+        self.set(calendar_id, intervals)
+
+    def load_store(
+        self,
+        store,
+        calendar_id: str,
+        time_min: Optional[Moment] = None,
+        time_max: Optional[Moment] = None,
+    ):
+        """Загрузка занятости из синхронизированного EventStore."""
+        self.load_events(calendar_id, store.events(calendar_id), time_min, time_max)
+
+    def add(self, calendar_id: str, start: Moment, end: Moment):
+        """Добавление интервала с объединением соседних."""
+        start, end = to_timestamp(start), to_timestamp(end)
+        with self._lock:
+            starts = self._starts.setdefault(calendar_id, [])
+            ends = self._ends.setdefault(calendar_id, [])
+            # Интервалы, которые пересекаются или соприкасаются с новым
+            first = bisect_left(ends, start)
+            last = bisect_right(starts, end)
+            if first < last:
+                start = min(start, starts[first])
+                end = max(end, ends[last - 1])
+            starts[first:last] = [start]
+            ends[first:last] = [end]
+
+    def remove(self, calendar_id: str):
+        with self._lock:
+            self._starts.pop(calendar_id, None)
+            self._ends.pop(calendar_id, None)
+
+    def calendars(self) -> List[str]:
+        with self._lock:
+            return list(self._starts)
+
+    def busy(self, calendar_id: str, start: Moment, end: Moment) -> List[tuple]:
+        """Интервалы занятости календаря, пересекающие [start, end)."""
+        start, end = to_timestamp(start), to_timestamp(end)
+        with self._lock:
+            starts = self._starts.get(calendar_id, [])
+            ends = self._ends.get(calendar_id, [])
+            first = bisect_right(ends, start)
+            last = bisect_left(starts, end)
+            return list(zip(starts[first:last], ends[first:last]))
+
+    def conflicts(self, calendar_id: str, start: Moment, end: Moment) -> bool:
+        """Пересекается ли [start, end) с занятостью календаря."""
+        start, end = to_timestamp(start), to_timestamp(end)
+        with self._lock:
+            ends = self._ends.get(calendar_id, [])
+            position = bisect_right(ends, start)
+            return position < len(ends) and self._starts[calendar_id][position] < end
+
+    def conflicts_many(
+        self, calendar_ids: Iterable[str], start: Moment, end: Moment
+    ) -> List[str]:
+        """Календари, у которых [start, end) пересекается с занятостью."""
+        start, end = to_timestamp(start), to_timestamp(end)
+        return [
+            calendar_id
+            for calendar_id in calendar_ids
+            if self.conflicts(calendar_id, start, end)
+        ]
+
+    def first_free_slot(
+        self,
+        calendar_ids: Iterable[str],
+        duration: float,
+        start: Moment,
+        end: Moment,
+    ) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+        """Первый общий свободный интервал длиной duration секунд в [start, end).
+
+        Интервалы календарей сливаются лениво через heapq.merge, поэтому
+        просматривается только занятость до найденного окна.
+        """
+        cursor, end = to_timestamp(start), to_timestamp(end)
+        with self._lock:
+            busy = heapq.merge(
+                *(self._iter_from(calendar_id, cursor) for calendar_id in calendar_ids)
+            )
+            for busy_start, busy_end in busy:
+                if busy_start - cursor >= duration or busy_start >= end:
+                    break
+                cursor = max(cursor, busy_end)
+        if end - cursor < duration:
+            return None
+        return (
+            datetime.datetime.fromtimestamp(cursor, datetime.timezone.utc),
+            datetime.datetime.fromtimestamp(cursor + duration, datetime.timezone.utc),
+        )
+
+    def _iter_from(self, calendar_id: str, moment: float) -> Iterator[tuple]:
+        starts = self._starts.get(calendar_id, [])
+        ends = self._ends.get(calendar_id, [])
+        for position in range(bisect_right(ends, moment), len(starts)):
+            yield starts[position], ends[position]
+
+
+class GFreeBusy:
+    def __init__(
+        self,
+        gcalendar,
+        index: Optional[BusyIndex] = None,
+        chunk_size: int = MAX_FREEBUSY_ITEMS,
+        workers: int = 4,
+    ):
+        """Запросы freebusy().query с разбиением календарей на порции.
+
+        Порции по chunk_size календарей выполняются параллельно в workers потоков,
+        результаты загружаются в индекс занятости index.
+        """
+        self.service = gcalendar.service
+        self.quota = gcalendar.quota
+        self.index = index if index is not None else BusyIndex()
+        self.chunk_size = min(chunk_size, MAX_FREEBUSY_ITEMS)
+        self.workers = workers
+        self.data = None
+        self.error = None
+        logger.info("GFreeBusy initialized")
+
+    def query(
+        self,
+        calendar_ids: Iterable[str],
+        time_min: Moment,
+        time_max: Moment,
+        timezone: Optional[str] = None,
+    ):
+        """Занятость календарей за период; {calendar_id: [(start, end)]} или False."""
+        try:
+            calendar_ids = list(calendar_ids)
+            logger.info("Querying free/busy for %s calendars", len(calendar_ids))
+            body = {
+                "timeMin": to_rfc3339(to_timestamp(time_min)),
+                "timeMax": to_rfc3339(to_timestamp(time_max)),
+            }
+            if timezone:
+                body["timeZone"] = timezone
+            chunks = [
+                calendar_ids[i : i + self.chunk_size]
+                for i in range(0, len(calendar_ids), self.chunk_size)
+            ]
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                responses = list(
+                    pool.map(lambda chunk: self._query_chunk(chunk, body), chunks)
+                )
+            busy = {}
+            errors = []
+            for response in responses:
+                for calendar_id, entry in response.get("calendars", {}).items():
+                    if entry.get("errors"):
+                        reasons = ", ".join(
+                            e.get("reason", "") for e in entry["errors"]
+                        )
+                        errors.append(f"{calendar_id}: {reasons}")
+                        continue
+                    intervals = [
+                        (to_timestamp(period["start"]), to_timestamp(period["end"]))
+                        for period in entry.get("busy", [])
+                    ]
+                    self.index.set(calendar_id, intervals)
+                    busy[calendar_id] = self.index.busy(calendar_id, time_min, time_max)
+            if errors:
+                self.error = "; ".join(errors)
+                logger.warning("Free/busy errors: %s", self.error)
+            self.data = busy
+            return busy
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error querying free/busy: %s", e)
+            return False
+
+    def _query_chunk(self, calendar_ids: List[str], body: dict) -> dict:
+        request = self.service.freebusy().query(
+            body={
+                **body,
+                "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+            }
+        )
+        return self.quota.execute(request)
@@ -1,15 +1,103 @@
 import logging
-from googleapiclient.discovery import build
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+from googleapiclient.errors import HttpError
+
+from batch.gbatch import DEFAULT_CHUNK_SIZE, BatchResult, GBatch, failure_summary
+from cache.gcache import ResponseCache, if_match
+from event.gevent import event_query
+from lookup.glookup import NameIndex
+from model.gmodel import EVENT_API_FIELDS, Calendar, Event
+from quota.gquota import QuotaGuard
+from recurrence.grecurrence import RecurrenceExpander
+from service.gservice import ServiceFactory, default_factory
 
 logger = logging.getLogger(__name__)
 
+# Максимальный размер страницы events().list в Calendar API
+MAX_PAGE_SIZE = 2500
+
+# Ключ набора календарей в индексе имен
+CALENDAR_LIST_SCOPE = "calendarList"
+
+# Действия ensure над календарем
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+UNCHANGED = "unchanged"
+
+
+def calendar_body(data: dict) -> dict:
+    """Преобразование данных календаря в тело запроса Calendar API."""
+    return {
+        "summary": data.get("name", "New Calendar"),
+        "description": data.get("description", ""),
+        "timeZone": data.get("timezone", "GMT+02:00"),
+    }
+
+
+def calendar_patch(data: dict, current: Optional[dict] = None) -> dict:
+    """Минимальное тело PATCH-запроса по измененным полям календаря."""
+    fields = (
+        ("name", "summary"),
+        ("description", "description"),
+        ("timezone", "timeZone"),
+    )
+    patch = {api_key: data[key] for key, api_key in fields if key in data}
+    if current is None:
+        return patch
+    return {key: value for key, value in patch.items() if current.get(key) != value}
+
+
+def acl_rule_id(rule: dict) -> str:
+    """ID правила доступа, который Calendar API выводит из scope."""
+    scope = rule["scope"]
+    if scope["type"] == "default":
+        return "default"
+    return f"{scope['type']}:{scope['value']}"
+
+
+class EnsureResult:
+    """Итог приведения одного календаря к спецификации ensure."""
+
+    def __init__(self, name: str, spec: Optional[dict] = None):
+        self.name = name
+        self.spec = spec  # None для календаря, удаляемого через prune
+        self.action = UNCHANGED
+        self.calendar: Optional[dict] = None
+        self.acl_changes = 0
+        self.error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"EnsureResult(name={self.name!r}, action={self.action}, {state})"
+
 
 class GCalendar:
-    def __init__(self, gapi_workspace):
-        """Инициализация сервиса Google Calendar."""
-        self.service = build(
-            "calendar", "v3", credentials=gapi_workspace.get_credentials()
-        )
+    def __init__(
+        self,
+        gapi_workspace,
+        lookup: Optional[NameIndex] = None,
+        cache: Optional[ResponseCache] = None,
+        quota: Optional[QuotaGuard] = None,
+        factory: Optional[ServiceFactory] = None,
+    ):
+        """Инициализация сервиса Google Calendar.
+
+        lookup — необязательный индекс имен для select/find без запросов к API,
+        cache — необязательный кэш GET-запросов календарей и событий с ETag,
+        quota — ограничитель скорости и политика повторов для всех запросов,
+        factory — фабрика сервисов, по умолчанию общая для процесса.
+        """
+        factory = factory if factory is not None else default_factory()
+        self.service = factory.build(gapi_workspace.get_credentials())
+        self.lookup = lookup
+        self.cache = cache
+        self.quota = quota if quota is not None else QuotaGuard()
         self.data = None
         self.error = None
         logger.info("GCalendar initialized")
@@ -17,110 +105,519 @@ class GCalendar:
     def create(self, data: dict):
         """Создание нового календаря."""
         try:
-            logger.info(f"Creating calendar: {data.get('name', 'New Calendar')}")
-            calendar = {
-                "summary": data.get("name", "New Calendar"),
-                "description": data.get("description", ""),
-                "timeZone": data.get("timezone", "GMT+02:00"),
-            }
-            calendar_entry = self.service.calendars().insert(body=calendar).execute()
+            logger.info("Creating calendar: %s", data.get("name", "New Calendar"))
+            calendar = calendar_body(data)
+            calendar_entry = self.quota.execute(
+                self.service.calendars().insert(body=calendar)
+            )
             self.data = calendar_entry
-            logger.info(f"Calendar {calendar_entry['id']} successfully created")
+            self._index_put(calendar_entry)
+            self._cache_store(calendar_entry)
+            logger.info("Calendar %s successfully created", calendar_entry["id"])
             return calendar_entry  # Возвращаем полный объект календаря
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error creating calendar: {e}")
+            logger.error("Error creating calendar: %s", e)
             return False
 
     def delete(self, calendar_id: str):
         """Удаление календаря по ID."""
         try:
-            logger.info(f"Deleting calendar with id: {calendar_id}")
-            self.service.calendars().delete(calendarId=calendar_id).execute()
+            logger.info("Deleting calendar with id: %s", calendar_id)
+            self.quota.execute(self.service.calendars().delete(calendarId=calendar_id))
             self.data = None
-            logger.info(f"Calendar {calendar_id} successfully deleted")
+            self._index_remove(calendar_id)
+            self._cache_invalidate(calendar_id)
+            logger.info("Calendar %s successfully deleted", calendar_id)
             return True
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error deleting calendar {calendar_id}: {e}")
+            logger.error("Error deleting calendar %s: %s", calendar_id, e)
             return False
 
     def select(self, data: dict):
         """Выбор календаря по имени."""
         try:
-            logger.info(f"Selecting calendar by name: {data.get('name')}")
-            calendars = self.service.calendarList().list().execute()
-            for calendar in calendars["items"]:
+            logger.info("Selecting calendar by name: %s", data.get("name"))
+            if self.lookup is not None:
+                calendars = self.lookup.exact(self._indexed_scope(), data.get("name"))
+            else:
+                response = self.quota.execute(self.service.calendarList().list())
+                calendars = response["items"]
+            for calendar in calendars:
                 if data.get("name") == calendar["summary"]:
                     self.data = calendar
-                    logger.info(f"Calendar {calendar['id']} selected")
+                    logger.info("Calendar %s selected", calendar["id"])
                     return calendar.get("id", False)
-            logger.warning(f"Calendar with name {data.get('name')} not found")
+            logger.warning("Calendar with name %s not found", data.get("name"))
             return False
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error selecting calendar: {e}")
+            logger.error("Error selecting calendar: %s", e)
             return False
 
-    def edit(self, calendar_id: str, data: dict):
-        """Редактирование календаря."""
+    def edit(self, calendar_id: str, data: dict, etag: Optional[str] = None):
+        """Редактирование календаря одним PATCH-запросом без предварительного GET.
+
+        Отправляются только измененные поля. При наличии копии в кэше или etag
+        запрос защищается заголовком If-Match.
+        """
         try:
-            logger.info(f"Editing calendar with id: {calendar_id}")
-            calendar = self.service.calendars().get(calendarId=calendar_id).execute()
-            calendar["summary"] = data.get("name", calendar["summary"])
-            calendar["description"] = data.get(
-                "description", calendar.get("description", "")
-            )
-            updated_calendar = (
-                self.service.calendars()
-                .update(calendarId=calendar_id, body=calendar)
-                .execute()
-            )
+            logger.info("Editing calendar with id: %s", calendar_id)
+            current = self._cached(calendar_id)
+            body = calendar_patch(data, current)
+            if current is not None and not body:
+                # Пропуск только после проверки копии условным GET
+                current = self._fetch(calendar_id, revalidate=True)
+                body = calendar_patch(data, current)
+            if current is not None and not body:
+                self.data = current
+                logger.info("Calendar %s unchanged, skipping update", calendar_id)
+                return current
+            request = self.service.calendars().patch(calendarId=calendar_id, body=body)
+            if_match(request, {"etag": etag} if etag else current)
+            updated_calendar = self._execute_write(calendar_id, request)
             self.data = updated_calendar
-            logger.info(f"Calendar {calendar_id} successfully updated")
+            self._index_put(updated_calendar)
+            self._cache_store(updated_calendar)
+            logger.info("Calendar %s successfully updated", calendar_id)
             return updated_calendar
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error updating calendar {calendar_id}: {e}")
+            logger.error("Error updating calendar %s: %s", calendar_id, e)
             return False
 
     def eventlist(self, calendar_id: str, data: dict):
         """Получение списка событий."""
         try:
-            logger.info(f"Retrieving event list for calendar {calendar_id}")
-            events_result = (
-                self.service.events()
-                .list(
-                    calendarId=calendar_id,
-                    timeMin=data["from"],
-                    timeMax=data.get("till", None),
-                    maxResults=data.get("limit", 10),
-                    singleEvents=True,
-                    orderBy="startTime",
+            logger.info("Retrieving event list for calendar %s", calendar_id)
+            limit = data.get("limit", 10)
+            events = list(
+                islice(
+                    self.iter_events(
+                        calendar_id,
+                        data,
+                        page_size=min(limit, MAX_PAGE_SIZE),
+                        single_events=data.get("single_events", True),
+                    ),
+                    limit,
                 )
-                .execute()
             )
-            events = events_result.get("items", [])
-            logger.info(f"Found {len(events)} events for calendar {calendar_id}")
+            logger.info("Found %s events for calendar %s", len(events), calendar_id)
             return events
         except Exception as e:
             self.error = str(e)
-            logger.error(f"Error retrieving event list for calendar {calendar_id}: {e}")
+            logger.error(
+                "Error retrieving event list for calendar %s: %s", calendar_id, e
+            )
             return []
 
+    def iter_events(
+        self,
+        calendar_id: str,
+        data: dict,
+        page_size: int = MAX_PAGE_SIZE,
+        fields: Optional[str] = None,
+        single_events: bool = True,
+    ) -> Iterator[dict]:
+        """Ленивый постраничный обход событий календаря.
+
+        fields задает проекцию полей события, например "id,summary,start".
+        При single_events=False сервер не разворачивает повторения и возвращает
+        основные события серий и исключения без сортировки по времени.
+        Фильтры text, updated_min, ical_uid, properties и show_deleted из data
+        передаются серверу (см. event_query).
+        Ошибка любой страницы пробрасывается вызывающему (текст остается в
+        self.error), чтобы оборванный обход нельзя было принять за полный.
+        """
+        params = {
+            "calendarId": calendar_id,
+            "timeMin": data.get("from"),
+            "timeMax": data.get("till", None),
+            "maxResults": min(page_size, MAX_PAGE_SIZE),
+            **event_query(data),
+        }
+        if single_events:
+            params.update({"singleEvents": True, "orderBy": "startTime"})
+        if fields:
+            params["fields"] = f"nextPageToken,items({fields})"
+        page_token = None
+        pages = 0
+        try:
+            while True:
+                response = self.quota.execute(
+                    self.service.events().list(pageToken=page_token, **params)
+                )
+                pages += 1
+                page_token = response.get("nextPageToken")
+                items = response.get("items", [])
+                del response
+                yield from items
+                if not page_token:
+                    break
+            logger.info("Iterated %s event pages for calendar %s", pages, calendar_id)
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error iterating events for calendar %s: %s", calendar_id, e)
+            raise
+
+    def iter_instances(
+        self,
+        calendar_id: str,
+        data: dict,
+        expander: Optional[RecurrenceExpander] = None,
+    ) -> Iterator[dict]:
+        """Экземпляры событий за период с локальным разворачиванием повторений.
+
+        С сервера загружаются только основные события серий и исключения,
+        экземпляры вычисляются лениво через expander и кэшируются в нем.
+        """
+        expander = expander if expander is not None else RecurrenceExpander()
+        events = list(self.iter_events(calendar_id, data, single_events=False))
+        yield from expander.expand(events, data.get("from"), data.get("till"))
+
+    def iter_event_models(
+        self,
+        calendar_id: str,
+        data: dict,
+        page_size: int = MAX_PAGE_SIZE,
+        single_events: bool = True,
+    ) -> Iterator[Event]:
+        """Ленивый обход событий в виде компактных моделей Event.
+
+        Сервер возвращает только поля, которые разбирает Event, поэтому
+        ответ меньше, а словари ответа не накапливаются в памяти.
+        """
+        for event in self.iter_events(
+            calendar_id,
+            data,
+            page_size=page_size,
+            fields=EVENT_API_FIELDS,
+            single_events=single_events,
+        ):
+            yield Event.from_api(event, calendar_id)
+
+    def iter_calendar_models(self) -> Iterator[Calendar]:
+        """Обход списка календарей в виде моделей Calendar."""
+        for calendar in self.iter_calendars():
+            yield Calendar.from_api(calendar)
+
     def get(self, calendar_id: str):
         """Получение информации о календаре по ID."""
         try:
-            logger.info(f"Retrieving information for calendar {calendar_id}")
-            calendar = self.service.calendars().get(calendarId=calendar_id).execute()
+            logger.info("Retrieving information for calendar %s", calendar_id)
+            calendar = self._fetch(calendar_id)
             self.data = calendar
             logger.info(
-                f"Information for calendar {calendar_id} successfully retrieved"
+                "Information for calendar %s successfully retrieved", calendar_id
             )
             return self.data
         except Exception as e:
             self.error = str(e)
             logger.error(
-                f"Error retrieving information for calendar {calendar_id}: {e}"
+                "Error retrieving information for calendar %s: %s", calendar_id, e
             )
             return False
+
+    def create_many(
+        self,
+        datas: Iterable[dict],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 1,
+    ) -> List[BatchResult]:
+        """Пакетное создание календарей через batch-запросы.
+
+        workers — число batch-запросов, отправляемых параллельно.
+        """
+        logger.info("Creating calendars in batch")
+        batch = self._batch(chunk_size, workers)
+        for data in datas:
+            request = self.service.calendars().insert(body=calendar_body(data))
+            batch.add(request, item=data)
+        results = self._finish_batch(batch, "creating calendars")
+        for result in results:
+            if result.ok:
+                self._index_put(result.response)
+                self._cache_store(result.response)
+        return results
+
+    def delete_many(
+        self,
+        calendar_ids: Iterable[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 1,
+    ) -> List[BatchResult]:
+        """Пакетное удаление календарей по ID."""
+        logger.info("Deleting calendars in batch")
+        batch = self._batch(chunk_size, workers)
+        for calendar_id in calendar_ids:
+            request = self.service.calendars().delete(calendarId=calendar_id)
+            batch.add(request, item=calendar_id)
+        results = self._finish_batch(batch, "deleting calendars")
+        for result in results:
+            if result.ok:
+                self._index_remove(result.item)
+                self._cache_invalidate(result.item)
+        return results
+
+    def ensure(
+        self,
+        specs: Iterable[dict],
+        prune: bool = False,
+        prefix: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 4,
+    ) -> List[EnsureResult]:
+        """Приведение календарей к декларативному списку спецификаций.
+
+        Спецификация — данные create (name, description, timezone) и
+        необязательные acl — список правил {"role", "scope"}, которыми
+        заменяются все правила календаря, кроме владельцев. С "state":
+        "absent" календарь удаляется. Календари сопоставляются по имени со
+        списком calendarList, и отправляются только нужные создания,
+        изменения и удаления, поэтому повторный запуск ничего не меняет.
+        prune удаляет собственные календари, которых нет в списке; prefix
+        ограничивает их календарями с именем, начинающимся с prefix.
+        Запросы идут batch-порциями, workers порций параллельно.
+        """
+        try:
+            logger.info("Ensuring calendars match specification")
+            existing = {}
+            for entry in self.iter_calendars():
+                if entry.get("accessRole") == "owner" and not entry.get("primary"):
+                    existing.setdefault(entry["summary"], entry)
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error listing calendars: %s", e)
+            return []
+        results = []
+        names = set()
+        batch = self._batch(chunk_size, workers)
+        for spec in specs:
+            result = EnsureResult(spec["name"], spec)
+            results.append(result)
+            if result.name in names:
+                result.error = ValueError(f"Duplicate calendar name {result.name}")
+                continue
+            names.add(result.name)
+            result.calendar = current = existing.get(result.name)
+            if spec.get("state") == "absent":
+                if current is not None:
+                    result.action = DELETE
+                    request = self.service.calendars().delete(calendarId=current["id"])
+                    batch.add(request, item=result)
+            elif current is None:
+                result.action = CREATE
+                request = self.service.calendars().insert(body=calendar_body(spec))
+                batch.add(request, item=result)
+            else:
+                body = calendar_patch(spec, current)
+                if body:
+                    result.action = UPDATE
+                    request = self.service.calendars().patch(
+                        calendarId=current["id"], body=body
+                    )
+                    batch.add(request, item=result)
+        if prune:
+            for name, current in existing.items():
+                if name in names or (prefix and not name.startswith(prefix)):
+                    continue
+                result = EnsureResult(name)
+                result.action, result.calendar = DELETE, current
+                results.append(result)
+                request = self.service.calendars().delete(calendarId=current["id"])
+                batch.add(request, item=result)
+        self._apply_calendar_changes(batch.execute())
+        # Удаленные, отсутствующие и не созданные календари пропускаются
+        self._ensure_acls(
+            [
+                r
+                for r in results
+                if r.ok
+                and r.action != DELETE
+                and r.calendar is not None
+                and "acl" in r.spec
+            ],
+            chunk_size,
+            workers,
+        )
+        failed = sum(1 for result in results if not result.ok)
+        if failed:
+            self.error = f"{failed} of {len(results)} failed while ensuring calendars"
+            logger.error("Error ensuring calendars: %s", self.error)
+        logger.info(
+            "Ensured %s calendars: %s",
+            len(results),
+            ", ".join(
+                f"{sum(1 for r in results if r.action == action)} {action}"
+                for action in (CREATE, UPDATE, DELETE, UNCHANGED)
+            ),
+        )
+        return results
+
+    def iter_calendars(self) -> Iterator[dict]:
+        """Ленивый постраничный обход списка календарей пользователя."""
+        page_token = None
+        while True:
+            response = self.quota.execute(
+                self.service.calendarList().list(pageToken=page_token)
+            )
+            yield from response.get("items", [])
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    def find(self, name: str, match: str = "exact"):
+        """Поиск календарей по имени через индекс.
+
+        match: "exact", "prefix", "substring" или "token" (все слова имени).
+        """
+        try:
+            logger.info("Finding calendars by name (%s): %s", match, name)
+            if self.lookup is None:
+                raise ValueError("Lookup index is not configured")
+            scope = self._indexed_scope()
+            calendars = self.lookup.find(scope, name, match)
+            logger.info("Found %s calendars matching %s", len(calendars), name)
+            return calendars
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error finding calendars: %s", e)
+            return []
+
+    def _indexed_scope(self) -> str:
+        if not self.lookup.is_fresh(CALENDAR_LIST_SCOPE):
+            self.lookup.load(CALENDAR_LIST_SCOPE, self.iter_calendars())
+        return CALENDAR_LIST_SCOPE
+
+    def _index_put(self, calendar: dict):
+        if self.lookup is not None and calendar:
+            # Ответ calendars() не содержит полей calendarList, сохраняем их
+            cached = self.lookup.get(CALENDAR_LIST_SCOPE, calendar["id"]) or {}
+            self.lookup.put(CALENDAR_LIST_SCOPE, {**cached, **calendar})
+
+    def _index_remove(self, calendar_id: str):
+        if self.lookup is not None:
+            self.lookup.remove(CALENDAR_LIST_SCOPE, calendar_id)
+
+    def _fetch(self, calendar_id: str, revalidate: bool = False) -> dict:
+        request = self.service.calendars().get(calendarId=calendar_id)
+        if self.cache is None:
+            return self.quota.execute(request)
+        return self.cache.fetch(
+            f"calendars/{calendar_id}",
+            request,
+            self.quota.execute,
+            revalidate=revalidate,
+        )
+
+    def _cached(self, calendar_id: str) -> Optional[dict]:
+        if self.cache is None:
+            return None
+        return self.cache.get(f"calendars/{calendar_id}")
+
+    def _execute_write(self, calendar_id: str, request) -> dict:
+        try:
+            return self.quota.execute(request)
+        except HttpError as e:
+            # 412: календарь изменился с момента чтения, копия в кэше устарела
+            if e.resp.status == 412:
+                self._cache_invalidate(calendar_id)
+            raise
+
+    def _cache_store(self, calendar: dict):
+        if self.cache is not None and calendar:
+            self.cache.store(f"calendars/{calendar['id']}", calendar)
+
+    def _cache_invalidate(self, calendar_id: str):
+        if self.cache is not None:
+            self.cache.invalidate(f"calendars/{calendar_id}")
+
+    def _batch(self, chunk_size: int, workers: int) -> GBatch:
+        return GBatch(
+            self.service, chunk_size=chunk_size, quota=self.quota, workers=workers
+        )
+
+    def _apply_calendar_changes(self, batch_results: List[BatchResult]):
+        """Перенос ответов batch ensure в результаты, индекс и кэш."""
+        for batch_result in batch_results:
+            result = batch_result.item
+            if not batch_result.ok:
+                result.error = batch_result.error
+            elif result.action == DELETE:
+                self._index_remove(result.calendar["id"])
+                self._cache_invalidate(result.calendar["id"])
+            else:
+                result.calendar = batch_result.response
+                self._index_put(batch_result.response)
+                self._cache_store(batch_result.response)
+
+    def _ensure_acls(self, results: List[EnsureResult], chunk_size: int, workers: int):
+        """Приведение правил доступа календарей к спискам acl спецификаций."""
+        if not results:
+            return
+        current = {id(result): {} for result in results}
+        batch = self._batch(chunk_size, workers)
+        for result in results:
+            # У нового календаря есть только правило владельца
+            if result.action != CREATE:
+                request = self.service.acl().list(calendarId=result.calendar["id"])
+                batch.add(request, item=result)
+        for batch_result in batch.execute():
+            result = batch_result.item
+            if not batch_result.ok:
+                result.error = batch_result.error
+                continue
+            response = batch_result.response
+            rules = list(response.get("items", []))
+            while response.get("nextPageToken"):
+                response = self.quota.execute(
+                    self.service.acl().list(
+                        calendarId=result.calendar["id"],
+                        pageToken=response["nextPageToken"],
+                    )
+                )
+                rules.extend(response.get("items", []))
+            current[id(result)] = {rule["id"]: rule for rule in rules}
+        batch = self._batch(chunk_size, workers)
+        acl = self.service.acl()
+        for result in results:
+            if not result.ok:
+                continue
+            calendar_id = result.calendar["id"]
+            rules = current[id(result)]
+            desired = {acl_rule_id(rule): rule for rule in result.spec["acl"]}
+            for rule_id, rule in desired.items():
+                existing = rules.get(rule_id)
+                if existing is None:
+                    request = acl.insert(
+                        calendarId=calendar_id,
+                        body={"role": rule["role"], "scope": rule["scope"]},
+                    )
+                elif existing["role"] != rule["role"]:
+                    request = acl.patch(
+                        calendarId=calendar_id,
+                        ruleId=rule_id,
+                        body={"role": rule["role"]},
+                    )
+                else:
+                    continue
+                batch.add(request, item=result)
+            for rule_id, existing in rules.items():
+                # Правила владельцев не удаляются, чтобы не потерять доступ
+                if rule_id not in desired and existing["role"] != "owner":
+                    request = acl.delete(calendarId=calendar_id, ruleId=rule_id)
+                    batch.add(request, item=result)
+        for batch_result in batch.execute():
+            result = batch_result.item
+            if batch_result.ok:
+                result.acl_changes += 1
+            elif result.ok:
+                result.error = batch_result.error
+
+    def _finish_batch(self, batch: GBatch, action: str) -> List[BatchResult]:
+        results = batch.execute()
+        error = failure_summary(results, action)
+        if error:
+            self.error = error
+        return results
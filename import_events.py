@@ -0,0 +1,55 @@
+import argparse
+import logging
+
+import conf
+from batch.gbatch import DEFAULT_CHUNK_SIZE
+from gcalendar.gcalendar import GCalendar
+from importer.gimport import FORMATS, GImport
+from main import initialize_gapi
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(
+        description="Import events from CSV, JSONL or iCalendar files"
+    )
+    parser.add_argument("path", help="file with events to import")
+    parser.add_argument("--calendar", default="primary", help="target calendar ID")
+    parser.add_argument(
+        "--format", choices=sorted(set(FORMATS.values())), help="input format"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="checkpoint file used to resume an interrupted import",
+    )
+    parser.add_argument("--errors", default=None, help="JSONL file for failed events")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=4)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Импорт событий из файла в календарь"""
+    args = parse_args(argv)
+    gapi_workspace = initialize_gapi()
+    importer = GImport(
+        GCalendar(gapi_workspace),
+        args.calendar,
+        checkpoint_path=args.checkpoint or f"{args.path}.checkpoint",
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        errors_path=args.errors,
+    )
+    stats = importer.run(args.path, args.format)
+    if stats is False:
+        logger.error("Import failed: %s", importer.error)
+        return 1
+    return 0 if stats["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    conf.configure_logging()
+    raise SystemExit(main())
@@ -0,0 +1,371 @@
+import csv
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from batch.gbatch import DEFAULT_CHUNK_SIZE
+from event.gevent import GEvent
+
+logger = logging.getLogger(__name__)
+
+# Поля event_data, которые понимает GEvent.create
+EVENT_FIELDS = (
+    "name",
+    "description",
+    "start_time",
+    "end_time",
+    "start_date",
+    "end_date",
+    "timezone",
+    "alarm",
+    "ical_uid",
+)
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".ics": "ics"}
+
+ICS_ALARM_ACTIONS = {"DISPLAY": "popup", "AUDIO": "popup", "EMAIL": "email"}
+ICS_DURATION_RE = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+def detect_format(path: str) -> str:
+    """Определение формата файла по расширению."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported import format: {extension}")
+    return FORMATS[extension]
+
+
+def parse_alarms(value: str) -> List[dict]:
+    """Разбор напоминаний вида "popup:10;email:30"."""
+    alarms = []
+    for part in value.split(";"):
+        if part.strip():
+            method, _, minutes = part.strip().partition(":")
+            alarms.append({"type": method, "time": minutes})
+    return alarms
+
+
+def read_csv(path: str) -> Iterator[dict]:
+    """Потоковое чтение CSV с колонками, совпадающими с полями event_data."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            event_data = {
+                key: value
+                for key, value in row.items()
+                if key in EVENT_FIELDS and value not in (None, "")
+            }
+            if "alarm" in event_data:
+                event_data["alarm"] = parse_alarms(event_data["alarm"])
+            yield event_data
+
+
+def read_jsonl(path: str) -> Iterator[dict]:
+    """Потоковое чтение JSONL: одна запись event_data на строку."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON: {e}") from e
+            yield {key: record[key] for key in EVENT_FIELDS if key in record}
+
+
+def _unfold(lines) -> Iterator[str]:
+    """Склейка перенесенных строк iCalendar (RFC 5545, 3.1)."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _parse_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    head, _, value = line.partition(":")
+    name, *raw_params = head.split(";")
+    params = {}
+    for raw in raw_params:
+        key, _, param_value = raw.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _unescape(value: str) -> str:
+    return re.sub(
+        r"\\([nN,;\\])",
+        lambda m: "\n" if m.group(1) in "nN" else m.group(1),
+        value,
+    )
+
+
+def _ics_time(value: str, params: Dict[str, str], prefix: str) -> dict:
+    """Перевод DTSTART/DTEND в поля event_data."""
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return {f"{prefix}_date": f"{value[:4]}-{value[4:6]}-{value[6:8]}"}
+    moment = (
+        f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+        f"T{value[9:11]}:{value[11:13]}:{value[13:15]}"
+    )
+    fields = {f"{prefix}_time": moment + ("Z" if value.endswith("Z") else "")}
+    if "TZID" in params:
+        fields["timezone"] = params["TZID"]
+    elif value.endswith("Z"):
+        fields["timezone"] = "UTC"
+    return fields
+
+
+def _trigger_minutes(value: str) -> Optional[int]:
+    """Минуты до начала события из TRIGGER вида -PT15M."""
+    match = ICS_DURATION_RE.match(value)
+    if not match:
+        return None
+    parts = {k: int(v) for k, v in match.groupdict().items() if v and k != "sign"}
+    seconds = (
+        parts.get("weeks", 0) * 604800
+        + parts.get("days", 0) * 86400
+        + parts.get("hours", 0) * 3600
+        + parts.get("minutes", 0) * 60
+        + parts.get("seconds", 0)
+    )
+    return seconds // 60
+
+
+def read_ics(path: str) -> Iterator[dict]:
+    """Потоковое чтение VEVENT из файла iCalendar."""
+    with open(path, encoding="utf-8") as f:
+        event_data = None
+        alarm = None
+        for line in _unfold(f):
+            name, params, value = _parse_property(line)
+            if name == "BEGIN" and value.upper() == "VEVENT":
+                event_data = {}
+            elif (
+                name == "BEGIN" and value.upper() == "VALARM" and event_data is not None
+            ):
+                alarm = {}
+            elif name == "END" and value.upper() == "VALARM" and alarm is not None:
+                minutes = _trigger_minutes(alarm.get("TRIGGER", ""))
+                if minutes is not None:
+                    event_data.setdefault("alarm", []).append(
+                        {
+                            "type": ICS_ALARM_ACTIONS.get(
+                                alarm.get("ACTION", "").upper(), "popup"
+                            ),
+                            "time": minutes,
+                        }
+                    )
+                alarm = None
+            elif name == "END" and value.upper() == "VEVENT" and event_data is not None:
+                yield event_data
+                event_data = None
+            elif alarm is not None:
+                alarm[name] = value
+            elif event_data is not None:
+                if name == "SUMMARY":
+                    event_data["name"] = _unescape(value)
+                elif name == "DESCRIPTION":
+                    event_data["description"] = _unescape(value)
+                elif name == "UID":
+                    event_data["ical_uid"] = value
+                elif name == "DTSTART":
+                    event_data.update(_ics_time(value, params, "start"))
+                elif name == "DTEND":
+                    event_data.update(_ics_time(value, params, "end"))
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "ics": read_ics}
+
+
+class Checkpoint:
+    def __init__(self, path: str = ":memory:"):
+        """Файл контрольной точки импорта: позиция, счетчики и iCalUID."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS seen (uid TEXT PRIMARY KEY)")
+
+    def begin(self, source: str) -> dict:
+        """Состояние импорта для source; другой источник считается ошибкой."""
+        state = self.load()
+        if state.get("source") not in (None, os.path.abspath(source)):
+            raise ValueError(f"Checkpoint {self.path} belongs to {state['source']}")
+        state.setdefault("source", os.path.abspath(source))
+        for key in ("position", "imported", "failed", "skipped"):
+            state.setdefault(key, 0)
+        return state
+
+    def load(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM state").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def is_seen(self, uid: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen WHERE uid = ?", (uid,)
+            ).fetchone()
+        return row is not None
+
+    def commit(self, state: dict, uids: List[str]):
+        """Атомарная фиксация позиции, счетчиков и импортированных iCalUID."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen (uid) VALUES (?)", [(u,) for u in uids]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in state.items()],
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Chunk:
+    """Порция записей, отправляемая одним вызовом create_many."""
+
+    def __init__(self):
+        self.positions: List[int] = []
+        self.events: List[dict] = []
+        self.uids = set()
+        self.skipped = 0
+        self.end = 0
+        self.future = None
+
+
+class GImport:
+    def __init__(
+        self,
+        gcalendar,
+        calendar_id: str,
+        checkpoint_path: str = ":memory:",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 4,
+        errors_path: Optional[str] = None,
+    ):
+        """Потоковый импорт событий из CSV, JSONL и iCalendar.
+
+        Записи отправляются порциями через GEvent.create_many в workers потоков.
+        Позиция фиксируется в checkpoint_path только после записи всех
+        предыдущих порций, поэтому прерванный импорт продолжается с места сбоя.
+        Неудачные записи дописываются в errors_path в формате JSONL.
+        """
+        self.gcalendar = gcalendar
+        self.calendar_id = calendar_id
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.errors_path = errors_path
+        self.data = None
+        self.error = None
+        logger.info("GImport initialized")
+
+    def run(self, path: str, fmt: Optional[str] = None):
+        """Импорт файла; возвращает счетчики или False при ошибке."""
+        try:
+            fmt = fmt or detect_format(path)
+            logger.info("Importing %s file %s into %s", fmt, path, self.calendar_id)
+            state = self.checkpoint.begin(path)
+            if state["position"]:
+                logger.info("Resuming import from record %s", state["position"])
+            self._import(READERS[fmt](path), state)
+            self.data = state
+            logger.info(
+                "Import finished: %s imported, %s failed, %s duplicates skipped",
+                state["imported"],
+                state["failed"],
+                state["skipped"],
+            )
+            return state
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error importing %s: %s", path, e)
+            return False
+
+    def _import(self, records: Iterator[dict], state: dict):
+        start = state["position"]
+        inflight: "deque[_Chunk]" = deque()
+        chunk = _Chunk()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for position, event_data in enumerate(records):
+                if position < start:
+                    continue
+                chunk.end = position + 1
+                uid = event_data.get("ical_uid")
+                if uid and self._is_duplicate(uid, chunk, inflight):
+                    chunk.skipped += 1
+                    continue
+                chunk.positions.append(position)
+                chunk.events.append(event_data)
+                if uid:
+                    chunk.uids.add(uid)
+                if len(chunk.events) >= self.chunk_size:
+                    chunk.future = pool.submit(self._write, chunk.events)
+                    inflight.append(chunk)
+                    chunk = _Chunk()
+                    # Ограничиваем число порций в памяти
+                    while len(inflight) > self.workers * 2:
+                        self._commit(inflight.popleft(), state)
+            if chunk.events:
+                chunk.future = pool.submit(self._write, chunk.events)
+            inflight.append(chunk)
+            while inflight:
+                self._commit(inflight.popleft(), state)
+
+    def _is_duplicate(self, uid: str, chunk: _Chunk, inflight) -> bool:
+        if uid in chunk.uids or any(uid in pending.uids for pending in inflight):
+            return True
+        return self.checkpoint.is_seen(uid)
+
+    def _write(self, events: List[dict]):
+        # Отдельный GEvent на порцию: поля data/error не разделяются потоками
+        return GEvent(self.gcalendar).create_many(
+            self.calendar_id, events, chunk_size=self.chunk_size
+        )
+
+    def _commit(self, chunk: _Chunk, state: dict):
+        results = chunk.future.result() if chunk.future is not None else []
+        uids = []
+        failures = []
+        for position, result in zip(chunk.positions, results):
+            if result.ok:
+                state["imported"] += 1
+                if result.item.get("ical_uid"):
+                    uids.append(result.item["ical_uid"])
+            else:
+                state["failed"] += 1
+                failures.append(
+                    {
+                        "position": position,
+                        "event": result.item,
+                        "error": str(result.error),
+                    }
+                )
+        if failures and self.errors_path:
+            with open(self.errors_path, "a", encoding="utf-8") as f:
+                for failure in failures:
+                    f.write(json.dumps(failure) + "\n")
+        state["skipped"] += chunk.skipped
+        state["position"] = max(state["position"], chunk.end)
+        self.checkpoint.commit(state, uids)
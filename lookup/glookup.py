@@ -0,0 +1,220 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбиение строки на слова в нижнем регистре."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Множество триграмм строки в нижнем регистре."""
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class _Scope:
+    """Индексы одного набора объектов (список календарей или события календаря)."""
+
+    def __init__(self, loaded_at: float):
+        self.loaded_at = loaded_at
+        self.items: Dict[str, dict] = {}
+        self.order: Dict[str, int] = {}
+        self.exact: Dict[str, Set[str]] = {}
+        self.names: List[tuple] = []  # Отсортированные пары (summary, id)
+        self.tokens: Dict[str, Set[str]] = {}
+        self.trigrams: Dict[str, Set[str]] = {}
+        self.seq = 0
+
+    def add(self, item: dict):
+        item_id = item["id"]
+        if item_id in self.items:
+            self.discard(item_id)
+        summary = item.get("summary", "")
+        self.items[item_id] = item
+        self.order[item_id] = self.seq
+        self.seq += 1
+        self.exact.setdefault(summary, set()).add(item_id)
+        insort(self.names, (summary, item_id))
+        for token in tokenize(summary):
+            self.tokens.setdefault(token, set()).add(item_id)
+        for gram in trigrams(summary):
+            self.trigrams.setdefault(gram, set()).add(item_id)
+
+    def discard(self, item_id: str):
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return
+        del self.order[item_id]
+        summary = item.get("summary", "")
+        self._unlink(self.exact, summary, item_id)
+        position = bisect_left(self.names, (summary, item_id))
+        if position < len(self.names) and self.names[position] == (summary, item_id):
+            del self.names[position]
+        for token in tokenize(summary):
+            self._unlink(self.tokens, token, item_id)
+        for gram in trigrams(summary):
+            self._unlink(self.trigrams, gram, item_id)
+
+    def ordered(self, ids: Iterable[str]) -> List[dict]:
+        return [self.items[i] for i in sorted(ids, key=self.order.__getitem__)]
+
+    @staticmethod
+    def _unlink(index: Dict[str, Set[str]], key: str, item_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(item_id)
+            if not ids:
+                del index[key]
+
+
+class NameIndex:
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_scopes: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Кэш с индексами по summary для выбора календарей и событий по имени.
+
+        Каждый набор объектов (scope) живет ttl секунд; при превышении
+        max_scopes вытесняется наименее недавно использованный.
+        """
+        self.ttl = ttl
+        self.max_scopes = max_scopes
+        self.clock = clock
+        self._scopes: "OrderedDict[str, _Scope]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def is_fresh(self, scope: str) -> bool:
+        """Проверка, загружен ли набор и не истек ли его TTL."""
+        with self._lock:
+            return self._scope(scope) is not None
+
+    def load(self, scope: str, items: Iterable[dict]):
+        """Полная загрузка набора объектов в индекс."""
+        entry = _Scope(self.clock())
+        for item in items:
+            entry.add(item)
+        with self._lock:
+            self._scopes[scope] = entry
+            self._scopes.move_to_end(scope)
+            while len(self._scopes) > self.max_scopes:
+                evicted, _ = self._scopes.popitem(last=False)
+                logger.info("Evicted lookup scope %s", evicted)
+        logger.info("Loaded %s items into lookup scope %s", len(entry.items), scope)
+
+    def put(self, scope: str, item: dict):
+        """Добавление или обновление объекта в загруженном наборе."""
+        with self._lock:
+            entry = self._scope(scope)
+            if entry is not None:
+                entry.add(item)
+
+    def remove(self, scope: str, item_id: str):
+        """Удаление объекта из загруженного набора."""
+        with self._lock:
+            entry = self._scope(scope)
+            if entry is not None:
+                entry.discard(item_id)
+
+    def invalidate(self, scope: Optional[str] = None):
+        """Сброс одного набора или всего кэша."""
+        with self._lock:
+            if scope is None:
+                self._scopes.clear()
+            else:
+                self._scopes.pop(scope, None)
+        logger.info("Invalidated lookup scope %s", scope or "*")
+
+    def get(self, scope: str, item_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._scope(scope)
+            return entry.items.get(item_id) if entry else None
+
+    def exact(self, scope: str, name: str) -> List[dict]:
+        """Объекты с summary, равным name."""
+        with self._lock:
+            entry = self._scope(scope)
+            if entry is None:
+                return []
+            return entry.ordered(entry.exact.get(name, ()))
+
+    def prefix(self, scope: str, prefix: str) -> List[dict]:
+        """Объекты, summary которых начинается с prefix."""
+        with self._lock:
+            entry = self._scope(scope)
+            if entry is None:
+                return []
+            ids = []
+            position = bisect_left(entry.names, (prefix, ""))
+            while position < len(entry.names):
+                summary, item_id = entry.names[position]
+                if not summary.startswith(prefix):
+                    break
+                ids.append(item_id)
+                position += 1
+            return entry.ordered(ids)
+
+    def search(self, scope: str, text: str) -> List[dict]:
+        """Объекты, summary которых содержит подстроку text."""
+        with self._lock:
+            entry = self._scope(scope)
+            if entry is None:
+                return []
+            grams = trigrams(text)
+            if grams:
+                # Кандидаты по триграммам, затем точная проверка подстроки
+                candidates = set.intersection(
+                    *(entry.trigrams.get(gram, set()) for gram in grams)
+                )
+            else:
+                candidates = entry.items.keys()
+            ids = [
+                item_id
+                for item_id in candidates
+                if text in entry.items[item_id].get("summary", "")
+            ]
+            return entry.ordered(ids)
+
+    def tokens(self, scope: str, query: str) -> List[dict]:
+        """Объекты, summary которых содержит все слова запроса."""
+        with self._lock:
+            entry = self._scope(scope)
+            words = tokenize(query)
+            if entry is None or not words:
+                return []
+            ids = set.intersection(*(entry.tokens.get(word, set()) for word in words))
+            return entry.ordered(ids)
+
+    def find(self, scope: str, text: str, match: str = "substring") -> List[dict]:
+        """Поиск в режиме match: "exact", "prefix", "substring" или "token"."""
+        lookups = {
+            "exact": self.exact,
+            "prefix": self.prefix,
+            "substring": self.search,
+            "token": self.tokens,
+        }
+        if match not in lookups:
+            raise ValueError(f"Unknown match mode: {match}")
+        return lookups[match](scope, text)
+
+    def _scope(self, scope: str) -> Optional[_Scope]:
+        entry = self._scopes.get(scope)
+        if entry is None:
+            return None
+        if self.clock() - entry.loaded_at > self.ttl:
+            del self._scopes[scope]
+            logger.info("Lookup scope %s expired", scope)
+            return None
+        self._scopes.move_to_end(scope)
+        return entry
@@ -1,10 +1,7 @@
 import json
 import logging
-from auth.gapiworkspace import GAPIWorkspace
-from gcalendar.gcalendar import GCalendar
-from event.gevent import GEvent
 
-import conf  # Импорт базовой конфигурации логирования
+import conf
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +18,9 @@ def load_oauth_credentials():
 
 def initialize_gapi():
     """Инициализация авторизации через Google API"""
+    # google-auth загружается только при обращении к API
+    from auth.gapiworkspace import GAPIWorkspace
+
     IDuserOAuth = load_oauth_credentials()
     credsfile = ".env/creds.json"
     return GAPIWorkspace(IDuserOAuth, filename=credsfile)
@@ -39,11 +39,12 @@ def create_calendars(calendar_service):
         "timezone": "GMT+03:00",
     }
 
-    cal1 = calendar_service.create(cal1_data)
-    cal2 = calendar_service.create(cal2_data)
+    # Оба календаря создаются одним batch-запросом
+    results = calendar_service.create_many([cal1_data, cal2_data])
 
-    if cal1 and cal2:
-        logger.info(f"Successfully created calendars: {cal1['id']}, {cal2['id']}")
+    if all(result.ok for result in results):
+        cal1, cal2 = (result.response for result in results)
+        logger.info("Successfully created calendars: %s, %s", cal1["id"], cal2["id"])
         return cal1, cal2
     else:
         logger.error("Failed to create one or more calendars")
@@ -54,9 +55,9 @@ def select_and_edit_calendar(calendar_service, calendar_name):
     """Выбор календаря по имени и его редактирование"""
     selected_calendar = calendar_service.select({"name": calendar_name})
     if selected_calendar:
-        logger.info(f"Selected calendar: {selected_calendar['id']}")
+        logger.info("Selected calendar: %s", selected_calendar["id"])
     else:
-        logger.error(f"Calendar {calendar_name} not found")
+        logger.error("Calendar %s not found", calendar_name)
         raise Exception("Calendar not found")
 
     # Редактирование выбранного календаря
@@ -67,15 +68,17 @@ def select_and_edit_calendar(calendar_service, calendar_name):
     }
     updated_calendar = calendar_service.edit(selected_calendar["id"], updated_data)
     if updated_calendar:
-        logger.info(f"Successfully updated calendar: {updated_calendar['id']}")
+        logger.info("Successfully updated calendar: %s", updated_calendar["id"])
         return updated_calendar
     else:
-        logger.error(f"Failed to update calendar: {selected_calendar['id']}")
+        logger.error("Failed to update calendar: %s", selected_calendar["id"])
         raise Exception("Calendar update failed")
 
 
 def create_and_edit_event(calendar_service, calendar_id):
     """Создание и редактирование события в календаре"""
+    from event.gevent import GEvent
+
     event_service = GEvent(calendar_service)
 
     # Создание события
@@ -88,7 +91,7 @@ def create_and_edit_event(calendar_service, calendar_id):
     }
     created_event = event_service.create(calendar_id, event_data)
     if created_event:
-        logger.info(f"Successfully created event: {created_event['id']}")
+        logger.info("Successfully created event: %s", created_event["id"])
     else:
         logger.error("Failed to create event")
         raise Exception("Event creation failed")
@@ -103,25 +106,30 @@ def create_and_edit_event(calendar_service, calendar_id):
         calendar_id, created_event["id"], updated_event_data
     )
     if updated_event:
-        logger.info(f"Successfully updated event: {updated_event['id']}")
+        logger.info("Successfully updated event: %s", updated_event["id"])
         return updated_event
     else:
-        logger.error(f"Failed to update event: {created_event['id']}")
+        logger.error("Failed to update event: %s", created_event["id"])
         raise Exception("Event update failed")
 
 
 def delete_calendars(calendar_service, calendars):
     """Удаление нескольких календарей"""
-    for calendar in calendars:
-        if calendar_service.delete(calendar["id"]):
-            logger.info(f"Successfully deleted calendar: {calendar['id']}")
+    results = calendar_service.delete_many(calendar["id"] for calendar in calendars)
+    failed = [result.item for result in results if not result.ok]
+    for result in results:
+        if result.ok:
+            logger.info("Successfully deleted calendar: %s", result.item)
         else:
-            logger.error(f"Failed to delete calendar: {calendar['id']}")
-            raise Exception(f"Failed to delete calendar {calendar['id']}")
+            logger.error("Failed to delete calendar: %s", result.item)
+    if failed:
+        raise Exception(f"Failed to delete calendars {', '.join(failed)}")
 
 
 def main():
     """Основная логика программы"""
+    from gcalendar.gcalendar import GCalendar
+
     try:
         # Инициализация Google API
         gapi_workspace = initialize_gapi()
@@ -140,8 +148,9 @@ def main():
         delete_calendars(calendar_service, [cal1, cal2])
 
     except Exception as e:
-        logger.error(f"An error occurred: {str(e)}")
+        logger.error("An error occurred: %s", str(e))
 
 
 if __name__ == "__main__":
+    conf.configure_logging()
     main()
@@ -0,0 +1,423 @@
+import datetime
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from freebusy.gfreebusy import to_rfc3339, to_timestamp
+
+# Проекция полей events().list, которые разбирает Event
+EVENT_API_FIELDS = (
+    "id,status,etag,updated,summary,description,location,start,end,recurrence,"
+    "recurringEventId,originalStartTime,iCalUID,transparency,reminders,"
+    "extendedProperties,attendees(email)"
+)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Часовые пояса и статусы повторяются у тысяч событий
+    return sys.intern(value) if value is not None else None
+
+
+def _moment(value: Optional[dict]) -> Tuple[Optional[str], Optional[str]]:
+    """Пара (dateTime или date, timeZone) из объекта времени API."""
+    if not value:
+        return None, None
+    return value.get("dateTime") or value.get("date"), _intern(value.get("timeZone"))
+
+
+def _moment_body(moment: Optional[str], timezone: Optional[str]) -> dict:
+    if len(moment) == 10:
+        return {"date": moment}
+    body = {"dateTime": moment}
+    if timezone:
+        body["timeZone"] = timezone
+    return body
+
+
+class Event:
+    """Компактное событие: только используемые поля, время разбирается лениво."""
+
+    __slots__ = (
+        "id",
+        "calendar_id",
+        "status",
+        "etag",
+        "updated",
+        "summary",
+        "description",
+        "location",
+        "start",
+        "start_timezone",
+        "end",
+        "end_timezone",
+        "recurrence",
+        "recurring_event_id",
+        "original_start",
+        "ical_uid",
+        "transparency",
+        "use_default_reminders",
+        "reminders",
+        "private",
+        "attendees",
+        "_start_ts",
+        "_end_ts",
+    )
+
+    OPTIONAL = (
+        "status",
+        "etag",
+        "updated",
+        "description",
+        "location",
+        "start_timezone",
+        "end_timezone",
+        "recurrence",
+        "recurring_event_id",
+        "original_start",
+        "ical_uid",
+        "transparency",
+        "use_default_reminders",
+        "reminders",
+        "private",
+        "attendees",
+    )
+
+    def __init__(
+        self,
+        id: Optional[str] = None,
+        summary: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        calendar_id: Optional[str] = None,
+        **fields,
+    ):
+        self.id = id
+        self.summary = summary
+        self.start = start
+        self.end = end
+        self.calendar_id = calendar_id
+        for name in self.OPTIONAL:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Unknown event fields: {', '.join(fields)}")
+        self.start_timezone = _intern(self.start_timezone)
+        self.end_timezone = _intern(self.end_timezone)
+        self.reminders = tuple(self.reminders or ())
+        self.attendees = tuple(self.attendees or ())
+        self._start_ts: Optional[float] = None
+        self._end_ts: Optional[float] = None
+
+    @classmethod
+    def from_api(cls, data: dict, calendar_id: Optional[str] = None) -> "Event":
+        """Разбор ресурса события Calendar API; прочие поля отбрасываются."""
+        start, start_timezone = _moment(data.get("start"))
+        end, end_timezone = _moment(data.get("end"))
+        original, _ = _moment(data.get("originalStartTime"))
+        reminders = data.get("reminders")
+        private = data.get("extendedProperties", {}).get("private")
+        recurrence = data.get("recurrence")
+        return cls(
+            data.get("id"),
+            data.get("summary"),
+            start,
+            end,
+            calendar_id,
+            status=_intern(data.get("status")),
+            etag=data.get("etag"),
+            updated=data.get("updated"),
+            description=data.get("description"),
+            location=data.get("location"),
+            start_timezone=start_timezone,
+            end_timezone=end_timezone,
+            recurrence=tuple(recurrence) if recurrence else None,
+            recurring_event_id=data.get("recurringEventId"),
+            original_start=original,
+            ical_uid=data.get("iCalUID"),
+            transparency=_intern(data.get("transparency")),
+            use_default_reminders=(
+                reminders.get("useDefault", False) if reminders is not None else None
+            ),
+            reminders=(
+                (_intern(item["method"]), item["minutes"])
+                for item in (reminders or {}).get("overrides", ())
+            ),
+            private=dict(private) if private else None,
+            attendees=(
+                attendee["email"].lower()
+                for attendee in data.get("attendees", ())
+                if "email" in attendee
+            ),
+        )
+
+    def to_api(self) -> dict:
+        """Ресурс события в формате Calendar API из разобранных полей."""
+        body = self.to_body()
+        for key, value in (
+            ("id", self.id),
+            ("status", self.status),
+            ("etag", self.etag),
+            ("updated", self.updated),
+            ("recurringEventId", self.recurring_event_id),
+        ):
+            if value is not None:
+                body[key] = value
+        if self.original_start is not None:
+            body["originalStartTime"] = _moment_body(
+                self.original_start, self.start_timezone
+            )
+        return body
+
+    def to_body(self) -> dict:
+        """Тело запроса insert/update: только изменяемые клиентом поля."""
+        body = {}
+        for key, value in (
+            ("summary", self.summary),
+            ("description", self.description),
+            ("location", self.location),
+            ("iCalUID", self.ical_uid),
+            ("transparency", self.transparency),
+        ):
+            if value is not None:
+                body[key] = value
+        if self.start is not None:
+            body["start"] = _moment_body(self.start, self.start_timezone)
+        if self.end is not None:
+            body["end"] = _moment_body(self.end, self.end_timezone)
+        if self.recurrence:
+            body["recurrence"] = list(self.recurrence)
+        if self.use_default_reminders is not None:
+            body["reminders"] = {"useDefault": self.use_default_reminders}
+            if self.reminders:
+                body["reminders"]["overrides"] = [
+                    {"method": method, "minutes": minutes}
+                    for method, minutes in self.reminders
+                ]
+        if self.private:
+            body["extendedProperties"] = {"private": dict(self.private)}
+        if self.attendees:
+            body["attendees"] = [{"email": email} for email in self.attendees]
+        return body
+
+    @property
+    def all_day(self) -> bool:
+        return self.start is not None and len(self.start) == 10
+
+    @property
+    def start_ts(self) -> Optional[float]:
+        """Начало в секундах Unix; вычисляется при первом обращении."""
+        if self._start_ts is None and self.start is not None:
+            self._start_ts = to_timestamp(self.start)
+        return self._start_ts
+
+    @property
+    def end_ts(self) -> Optional[float]:
+        if self._end_ts is None and self.end is not None:
+            self._end_ts = to_timestamp(self.end)
+        return self._end_ts
+
+    @property
+    def start_datetime(self) -> Optional[datetime.datetime]:
+        return datetime.datetime.fromisoformat(self.start) if self.start else None
+
+    @property
+    def end_datetime(self) -> Optional[datetime.datetime]:
+        return datetime.datetime.fromisoformat(self.end) if self.end else None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.status == "cancelled"
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__slots__
+            if name[0] != "_"
+        )
+
+    def __repr__(self):
+        return f"Event(id={self.id!r}, summary={self.summary!r}, start={self.start!r})"
+
+
+class Calendar:
+    """Компактный календарь или запись списка календарей."""
+
+    __slots__ = (
+        "id",
+        "summary",
+        "description",
+        "location",
+        "time_zone",
+        "etag",
+        "access_role",
+        "primary",
+    )
+
+    API_KEYS = (
+        ("id", "id"),
+        ("summary", "summary"),
+        ("description", "description"),
+        ("location", "location"),
+        ("time_zone", "timeZone"),
+        ("etag", "etag"),
+        ("access_role", "accessRole"),
+        ("primary", "primary"),
+    )
+
+    def __init__(
+        self, id: Optional[str] = None, summary: Optional[str] = None, **fields
+    ):
+        self.id = id
+        self.summary = summary
+        for name, _ in self.API_KEYS[2:]:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Unknown calendar fields: {', '.join(fields)}")
+        self.time_zone = _intern(self.time_zone)
+        self.access_role = _intern(self.access_role)
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Calendar":
+        return cls(**{name: data.get(key) for name, key in cls.API_KEYS})
+
+    def to_api(self) -> dict:
+        return {
+            key: getattr(self, name)
+            for name, key in self.API_KEYS
+            if getattr(self, name) is not None
+        }
+
+    def to_body(self) -> dict:
+        """Тело запроса insert/update календаря."""
+        body = self.to_api()
+        for key in ("id", "etag", "accessRole", "primary"):
+            body.pop(key, None)
+        return body
+
+    def __eq__(self, other):
+        if not isinstance(other, Calendar):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        return f"Calendar(id={self.id!r}, summary={self.summary!r})"
+
+
+class EventColumns:
+    def __init__(self):
+        """Колоночное хранение большого набора событий.
+
+        Время хранится в массивах double, календарь — кодом в массиве int,
+        поэтому событие занимает несколько десятков байт вместо словаря
+        с вложенными объектами. Выборка по периоду идет бинарным поиском
+        по началам, отсортированным при первом запросе после изменений.
+        Отмененные события не сохраняются.
+        """
+        self.ids: List[Optional[str]] = []
+        self.summaries: List[Optional[str]] = []
+        self.etags: List[Optional[str]] = []
+        self.starts = array("d")
+        self.ends = array("d")
+        self.all_day = array("b")
+        self._calendar_codes = array("I")
+        self._calendars: List[str] = []
+        self._calendar_index: Dict[str, int] = {}
+        self._max_duration = 0.0
+        self._order: Optional[array] = None
+        self._sorted_starts: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, event: Union[Event, dict], calendar_id: Optional[str] = None):
+        if isinstance(event, dict):
+            event = Event.from_api(event, calendar_id)
+        calendar_id = calendar_id or event.calendar_id or ""
+        if event.cancelled or event.start is None or event.end is None:
+            return
+        code = self._calendar_index.get(calendar_id)
+        if code is None:
+            code = self._calendar_index[calendar_id] = len(self._calendars)
+            self._calendars.append(calendar_id)
+        start, end = event.start_ts, event.end_ts
+        self.ids.append(event.id)
+        self.summaries.append(event.summary)
+        self.etags.append(event.etag)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.all_day.append(event.all_day)
+        self._calendar_codes.append(code)
+        self._max_duration = max(self._max_duration, end - start)
+        self._order = self._sorted_starts = None
+
+    def extend(
+        self, events: Iterable[Union[Event, dict]], calendar_id: Optional[str] = None
+    ):
+        for event in events:
+            self.append(event, calendar_id)
+
+    def calendar_of(self, row: int) -> str:
+        return self._calendars[self._calendar_codes[row]]
+
+    def row(self, row: int) -> Event:
+        """Событие строки row, восстановленное из колонок."""
+        start, end = self.starts[row], self.ends[row]
+        if self.all_day[row]:
+            start_value = to_rfc3339(start)[:10]
+            end_value = to_rfc3339(end)[:10]
+        else:
+            start_value, end_value = to_rfc3339(start), to_rfc3339(end)
+        return Event(
+            self.ids[row],
+            self.summaries[row],
+            start_value,
+            end_value,
+            self.calendar_of(row),
+            etag=self.etags[row],
+        )
+
+    def select(
+        self,
+        time_min=None,
+        time_max=None,
+        calendar_ids: Optional[Iterable[str]] = None,
+    ) -> List[int]:
+        """Номера строк событий, пересекающих период, в порядке начала.
+
+        calendar_ids ограничивает выборку календарями.
+        """
+        order, starts = self._sorted()
+        lower = to_timestamp(time_min) if time_min is not None else None
+        upper = to_timestamp(time_max) if time_max is not None else None
+        first = 0 if lower is None else bisect_left(starts, lower - self._max_duration)
+        last = len(starts) if upper is None else bisect_left(starts, upper)
+        codes = None
+        if calendar_ids is not None:
+            codes = {
+                self._calendar_index[calendar_id]
+                for calendar_id in calendar_ids
+                if calendar_id in self._calendar_index
+            }
+        ends = self.ends
+        calendar_codes = self._calendar_codes
+        return [
+            row
+            for row in order[first:last]
+            if (lower is None or ends[row] > lower)
+            and (codes is None or calendar_codes[row] in codes)
+        ]
+
+    def events(
+        self, time_min=None, time_max=None, calendar_ids=None
+    ) -> Iterator[Event]:
+        for row in self.select(time_min, time_max, calendar_ids):
+            yield self.row(row)
+
+    def _sorted(self) -> Tuple[array, array]:
+        if self._order is None:
+            starts = self.starts
+            self._order = array("I", sorted(range(len(starts)), key=starts.__getitem__))
+            self._sorted_starts = array("d", (starts[row] for row in self._order))
+        return self._order, self._sorted_starts
@@ -0,0 +1,387 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Union
+
+from event.gevent import GEvent
+from gcalendar.gcalendar import GCalendar
+from quota.gquota import QuotaGuard, RateLimiter
+from service.gservice import ServiceFactory, default_factory
+
+logger = logging.getLogger(__name__)
+
+
+def _calendar_create(gcalendar, gevent, calendar_id, data):
+    return gcalendar.create(data)
+
+
+def _calendar_select(gcalendar, gevent, calendar_id, data):
+    return gcalendar.select(data)
+
+
+def _calendar_get(gcalendar, gevent, calendar_id):
+    return gcalendar.get(calendar_id)
+
+
+def _calendar_edit(gcalendar, gevent, calendar_id, data):
+    return gcalendar.edit(calendar_id, data)
+
+
+def _calendar_delete(gcalendar, gevent, calendar_id):
+    return gcalendar.delete(calendar_id)
+
+
+def _event_list(gcalendar, gevent, calendar_id, data=None):
+    return gcalendar.eventlist(calendar_id, data or {})
+
+
+def _event_create(gcalendar, gevent, calendar_id, data):
+    return gevent.create(calendar_id, data)
+
+
+def _event_select(gcalendar, gevent, calendar_id, data):
+    return gevent.select(calendar_id, data)
+
+
+def _event_edit(gcalendar, gevent, calendar_id, event_id, data):
+    return gevent.edit(calendar_id, event_id, data)
+
+
+def _event_delete(gcalendar, gevent, calendar_id, event_id):
+    return gevent.delete(calendar_id, event_id)
+
+
+# Операции заданий: имя -> функция (gcalendar, gevent, calendar_id, **params)
+OPERATIONS: Dict[str, Callable] = {
+    "calendar.create": _calendar_create,
+    "calendar.select": _calendar_select,
+    "calendar.get": _calendar_get,
+    "calendar.edit": _calendar_edit,
+    "calendar.delete": _calendar_delete,
+    "event.list": _event_list,
+    "event.create": _event_create,
+    "event.select": _event_select,
+    "event.edit": _event_edit,
+    "event.delete": _event_delete,
+}
+
+# Значения, которые методы клиентов возвращают при ошибке, если это не False.
+# Само значение отказом не считается: select без совпадений тоже дает False
+FAILURE_VALUES: Dict[str, Any] = {
+    "event.list": [],
+}
+
+
+class CredentialsWorkspace:
+    """Обертка готовых учетных данных с интерфейсом GAPIWorkspace."""
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+
+    def get_credentials(self):
+        return self.credentials
+
+
+class Tenant:
+    def __init__(
+        self,
+        name: str,
+        workspace,
+        quota: QuotaGuard,
+        factory: ServiceFactory,
+        max_workers: Optional[int] = None,
+    ):
+        """Аккаунт пула: собственные учетные данные, сервис и бюджет квоты.
+
+        Клиенты GCalendar/GEvent создаются по одному на поток, поэтому их
+        поля data и error не смешиваются между параллельными заданиями.
+        """
+        self.name = name
+        self.workspace = workspace
+        self.quota = quota
+        self.factory = factory
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._local = threading.local()
+
+    def clients(self):
+        """Пара (GCalendar, GEvent) текущего потока."""
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            gcalendar = GCalendar(
+                self.workspace, quota=self.quota, factory=self.factory
+            )
+            clients = self._local.clients = (gcalendar, GEvent(gcalendar))
+        return clients
+
+    def stats(self) -> dict:
+        elapsed = (
+            self.finished - self.started
+            if self.started is not None and self.finished is not None
+            else 0.0
+        )
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_seconds": self.busy_seconds,
+            "throughput": self.completed / elapsed if elapsed > 0 else 0.0,
+            "quota": self.quota.metrics.snapshot(),
+        }
+
+
+class Job:
+    def __init__(
+        self,
+        tenant: Tenant,
+        action: Union[str, Callable],
+        calendar_id: Optional[str],
+        params: dict,
+        lane: Hashable,
+    ):
+        """Операция над календарем одного аккаунта с результатом во future."""
+        self.tenant = tenant
+        self.action = action
+        self.calendar_id = calendar_id
+        self.params = params
+        self.lane = lane
+        self.future: Future = Future()
+
+    def run(self):
+        gcalendar, gevent = self.tenant.clients()
+        # Клиенты потока переиспользуются: ошибка прошлого задания не в счет
+        gcalendar.error = gevent.error = None
+        if callable(self.action):
+            return self.action(gcalendar, gevent, self.calendar_id, **self.params)
+        return OPERATIONS[self.action](
+            gcalendar, gevent, self.calendar_id, **self.params
+        )
+
+    @property
+    def error(self) -> Optional[str]:
+        gcalendar, gevent = self.tenant.clients()
+        return gevent.error or gcalendar.error
+
+    def failed(self, result) -> bool:
+        """Отказ операции: значение ошибки метода и ошибка этого задания.
+
+        Для функций-заданий достаточно ошибки, записанной в клиент.
+        """
+        if self.error is None:
+            return False
+        if callable(self.action):
+            return True
+        return result == FAILURE_VALUES.get(self.action, False)
+
+
+class JobPool:
+    def __init__(
+        self,
+        workers: int = 16,
+        limiter: Optional[RateLimiter] = None,
+        factory: Optional[ServiceFactory] = None,
+        tenant_workers: Optional[int] = None,
+    ):
+        """Пул потоков для заданий множества аккаунтов.
+
+        Задания одного календаря выполняются строго по очереди, разные
+        календари — параллельно. Свободный поток берет задание у следующего
+        по кругу аккаунта, поэтому квота расходуется всеми аккаунтами
+        равномерно, а не по очереди. tenant_workers ограничивает число
+        потоков, одновременно занятых одним аккаунтом. limiter задает
+        бюджеты запросов: корзина на аккаунт и общая на проект.
+        """
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        self.workers = workers
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.factory = factory if factory is not None else default_factory()
+        self.tenant_workers = tenant_workers
+        self._tenants: Dict[str, Tenant] = {}
+        self._order: Deque[str] = deque()
+        # Очереди заданий по дорожкам (аккаунт, календарь)
+        self._lanes: Dict[Hashable, Deque[Job]] = {}
+        # Дорожки без выполняющегося задания, готовые к запуску, по аккаунтам
+        self._ready: Dict[str, Deque[Hashable]] = {}
+        self._running: Dict[str, int] = {}
+        self._pending = 0
+        self._sequence = itertools.count()
+        self._closed = False
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def add_tenant(
+        self,
+        name: str,
+        workspace,
+        rate: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ) -> Tenant:
+        """Регистрация аккаунта; rate — его бюджет запросов в секунду."""
+        if rate is not None:
+            self.limiter.set_user_rate(name, rate)
+        quota = QuotaGuard(limiter=self.limiter, user=name)
+        tenant = Tenant(
+            name,
+            workspace,
+            quota,
+            self.factory,
+            max_workers if max_workers is not None else self.tenant_workers,
+        )
+        with self._condition:
+            if name in self._tenants:
+                raise ValueError(f"Tenant {name} already exists")
+            self._tenants[name] = tenant
+            self._order.append(name)
+            self._ready[name] = deque()
+            self._running[name] = 0
+        logger.info("Added tenant %s", name)
+        return tenant
+
+    def tenant(self, name: str) -> Tenant:
+        return self._tenants[name]
+
+    def submit(
+        self,
+        tenant: str,
+        action: Union[str, Callable],
+        calendar_id: Optional[str] = None,
+        **params,
+    ) -> Future:
+        """Постановка задания в очередь.
+
+        action — имя из OPERATIONS или функция (gcalendar, gevent, calendar_id,
+        **params). Задания с одинаковым calendar_id одного аккаунта
+        выполняются в порядке постановки; без calendar_id — независимо.
+        """
+        if isinstance(action, str) and action not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {action}")
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("JobPool is shut down")
+            owner = self._tenants[tenant]
+            lane = (
+                (tenant, calendar_id)
+                if calendar_id is not None
+                else (tenant, None, next(self._sequence))
+            )
+            job = Job(owner, action, calendar_id, params, lane)
+            queue = self._lanes.get(lane)
+            if queue is None:
+                queue = self._lanes[lane] = deque()
+                self._ready[tenant].append(lane)
+            queue.append(job)
+            owner.submitted += 1
+            self._pending += 1
+            self._start_workers()
+            self._condition.notify()
+        return job.future
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Ожидание выполнения всех поставленных заданий."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, wait: bool = True):
+        if wait:
+            self.join()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def report(self) -> Dict[str, dict]:
+        """Статистика выполнения по аккаунтам, включая пропускную способность."""
+        with self._condition:
+            return {name: tenant.stats() for name, tenant in self._tenants.items()}
+
+    def _start_workers(self):
+        while len(self._threads) < min(self.workers, self._pending):
+            thread = threading.Thread(
+                target=self._work, name=f"job-pool-{len(self._threads)}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self) -> Optional[Job]:
+        """Задание следующего по кругу аккаунта с готовой дорожкой."""
+        for _ in range(len(self._order)):
+            name = self._order[0]
+            self._order.rotate(-1)
+            tenant = self._tenants[name]
+            ready = self._ready[name]
+            if not ready or (
+                tenant.max_workers is not None
+                and self._running[name] >= tenant.max_workers
+            ):
+                continue
+            lane = ready.popleft()
+            self._running[name] += 1
+            return self._lanes[lane].popleft()
+        return None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._condition.wait()
+                    job = self._next_job()
+            self._execute(job)
+            with self._condition:
+                name = job.tenant.name
+                self._running[name] -= 1
+                if self._lanes[job.lane]:
+                    self._ready[name].append(job.lane)
+                else:
+                    del self._lanes[job.lane]
+                self._pending -= 1
+                self._condition.notify_all()
+
+    def _execute(self, job: Job):
+        tenant = job.tenant
+        started = time.perf_counter()
+        with self._condition:
+            if tenant.started is None:
+                tenant.started = started
+        try:
+            result = job.run()
+        except Exception as e:
+            logger.error("Job %s of tenant %s failed: %s", job.action, tenant.name, e)
+            failed, outcome = True, e
+        else:
+            failed, outcome = job.failed(result), result
+            if failed:
+                logger.error(
+                    "Job %s of tenant %s failed: %s", job.action, tenant.name, job.error
+                )
+        finished = time.perf_counter()
+        with self._condition:
+            tenant.busy_seconds += finished - started
+            tenant.finished = finished
+            if failed:
+                tenant.failed += 1
+            else:
+                tenant.completed += 1
+        if isinstance(outcome, Exception):
+            job.future.set_exception(outcome)
+        else:
+            job.future.set_result(outcome)
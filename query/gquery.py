@@ -0,0 +1,302 @@
+import heapq
+import logging
+import threading
+from array import array
+from itertools import chain, islice
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from freebusy.gfreebusy import to_timestamp
+from lookup.glookup import tokenize
+from model.gmodel import Event
+
+logger = logging.getLogger(__name__)
+
+# Поля события с полнотекстовым индексом
+TEXT_FIELDS = ("summary", "description", "location")
+
+_NO_TIME = float("-inf")
+
+SORT_KEYS = {
+    "start": lambda event: event.start_ts if event.start is not None else _NO_TIME,
+    "end": lambda event: event.end_ts if event.end is not None else _NO_TIME,
+    "updated": lambda event: event.updated or "",
+    "summary": lambda event: (event.summary or "").casefold(),
+}
+
+# Доля новых событий, после которой временной индекс строится заново
+REBUILD_RATIO = 0.1
+
+
+class EventIndex:
+    def __init__(self):
+        """Индексы по событиям многих календарей для локальных запросов.
+
+        Слова summary, description и location, адреса участников, статус и
+        календарь хранятся в инвертированных индексах (ключ -> множество
+        номеров строк), начала событий — в отсортированном массиве.
+        Запрос пересекает множества, начиная с меньшего, и просматривает
+        только окно времени, поэтому не зависит от общего числа событий.
+        Отмененные события удаляются, как в EventStore. Индекс обновляется
+        по страницам изменений sync (apply/clear) без полной перестройки.
+        """
+        self._events: List[Optional[Event]] = []
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self._free: List[int] = []
+        self._text: Dict[str, Dict[str, Set[int]]] = {f: {} for f in TEXT_FIELDS}
+        self._attendees: Dict[str, Set[int]] = {}
+        self._statuses: Dict[str, Set[int]] = {}
+        self._calendars: Dict[str, Set[int]] = {}
+        # Начала событий по возрастанию и соответствующие номера строк
+        self._starts = array("d")
+        self._start_rows = array("I")
+        # Строки, еще не добавленные во временной индекс, и строки без времени
+        self._unsorted: Set[int] = set()
+        self._timeless: Set[int] = set()
+        self._max_duration = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, event: Event):
+        """Добавление или замена события; отмененное событие удаляется."""
+        with self._lock:
+            self.remove(event.calendar_id, event.id)
+            if event.cancelled:
+                return
+            row = self._free.pop() if self._free else len(self._events)
+            if row == len(self._events):
+                self._events.append(event)
+            else:
+                self._events[row] = event
+            self._rows[(event.calendar_id, event.id)] = row
+            self._link(row, event)
+
+    def extend(self, events: Iterable[Event]):
+        for event in events:
+            self.add(event)
+
+    def remove(self, calendar_id: str, event_id: str) -> bool:
+        with self._lock:
+            row = self._rows.pop((calendar_id, event_id), None)
+            if row is None:
+                return False
+            self._unlink(row, self._events[row])
+            self._events[row] = None
+            self._free.append(row)
+            return True
+
+    def apply(self, calendar_id: str, items: Iterable[dict]) -> Tuple[int, int]:
+        """Применение страницы изменений API; возвращает (обновлено, удалено)."""
+        upserted = deleted = 0
+        with self._lock:
+            for item in items:
+                if item.get("status") == "cancelled":
+                    deleted += self.remove(calendar_id, item["id"])
+                else:
+                    self.add(Event.from_api(item, calendar_id))
+                    upserted += 1
+        return upserted, deleted
+
+    def clear(self, calendar_id: str):
+        """Удаление всех событий календаря."""
+        with self._lock:
+            for row in list(self._calendars.get(calendar_id, ())):
+                self.remove(calendar_id, self._events[row].id)
+
+    def load_store(self, store, calendar_ids: Optional[Iterable[str]] = None):
+        """Загрузка снимка событий из EventStore."""
+        calendar_ids = store.calendars() if calendar_ids is None else calendar_ids
+        for calendar_id in calendar_ids:
+            self.extend(store.models(calendar_id))
+        logger.info("Loaded %s events into query index", len(self))
+
+    def get(self, calendar_id: str, event_id: str) -> Optional[Event]:
+        with self._lock:
+            row = self._rows.get((calendar_id, event_id))
+            return self._events[row] if row is not None else None
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        summary: Optional[str] = None,
+        description: Optional[str] = None,
+        location: Optional[str] = None,
+        attendee: Optional[str] = None,
+        status: Optional[str] = None,
+        calendar_ids: Optional[Iterable[str]] = None,
+        time_min=None,
+        time_max=None,
+        order_by: str = "start",
+        descending: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Event]:
+        """События, удовлетворяющие всем заданным условиям.
+
+        text ищет слова во всех текстовых полях, summary/description/location —
+        в одном поле; событие должно содержать каждое слово запроса. attendee —
+        адрес участника, time_min/time_max — период, с которым пересекается
+        событие. order_by: "start", "end", "updated" или "summary".
+        Возвращаются общие с индексом объекты Event, их нельзя изменять.
+        """
+        if order_by not in SORT_KEYS:
+            raise ValueError(f"Unknown order_by: {order_by}")
+        with self._lock:
+            sets = [
+                self._match_text(TEXT_FIELDS, text),
+                self._match_text(("summary",), summary),
+                self._match_text(("description",), description),
+                self._match_text(("location",), location),
+                self._lookup(self._attendees, attendee and [attendee.lower()]),
+                self._lookup(self._statuses, status and [status]),
+                self._lookup(self._calendars, calendar_ids),
+            ]
+            sets = [ids for ids in sets if ids is not None]
+            candidates = None
+            for ids in sorted(sets, key=len):
+                candidates = set(ids) if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+            if time_min is not None or time_max is not None:
+                rows = self._in_period(candidates, time_min, time_max)
+                if order_by == "start":
+                    # Строки уже в порядке начала, сортировка не нужна
+                    if descending:
+                        rows.reverse()
+                    return [self._events[row] for row in rows[:limit]]
+            elif candidates is None and order_by == "start":
+                # Без фильтров строки берутся прямо из временного индекса
+                self._sort_starts()
+                rows = (
+                    chain(self._timeless, reversed(self._start_rows))
+                    if descending
+                    else chain(self._start_rows, self._timeless)
+                )
+                return [self._events[row] for row in islice(rows, limit)]
+            else:
+                rows = candidates if candidates is not None else self._rows.values()
+            events = [self._events[row] for row in rows]
+        key = SORT_KEYS[order_by]
+        if limit is not None:
+            select = heapq.nlargest if descending else heapq.nsmallest
+            return select(limit, events, key=key)
+        return sorted(events, key=key, reverse=descending)
+
+    def _match_text(self, fields, query: Optional[str]) -> Optional[Set[int]]:
+        if query is None:
+            return None
+        result = None
+        for token in set(tokenize(query)):
+            # Множества индекса не копируются: дальше только пересечения
+            if len(fields) == 1:
+                rows = self._text[fields[0]].get(token, set())
+            else:
+                rows = set().union(*(self._text[f].get(token, ()) for f in fields))
+            result = rows if result is None else result & rows
+            if not result:
+                return set()
+        return result if result is not None else set()
+
+    @staticmethod
+    def _lookup(index: Dict[str, Set[int]], keys) -> Optional[Set[int]]:
+        if keys is None:
+            return None
+        if isinstance(keys, str):
+            keys = [keys]
+        keys = list(keys)
+        if len(keys) == 1:
+            return index.get(keys[0], set())
+        return set().union(*(index.get(key, ()) for key in keys))
+
+    def _in_period(self, candidates: Optional[Set[int]], time_min, time_max):
+        """Строки событий, пересекающих период, в порядке начала."""
+        lower = to_timestamp(time_min) if time_min is not None else None
+        upper = to_timestamp(time_max) if time_max is not None else None
+        events = self._events
+        if candidates is not None and len(candidates) * 8 < len(self._rows):
+            # Мало кандидатов: проверка каждого дешевле просмотра окна
+            rows = [
+                row
+                for row in candidates
+                if events[row].start is not None
+                and (upper is None or events[row].start_ts < upper)
+                and (lower is None or events[row].end_ts > lower)
+            ]
+            rows.sort(key=lambda row: events[row].start_ts)
+            return rows
+        self._sort_starts()
+        starts = self._starts
+        first = 0 if lower is None else bisect_left(starts, lower - self._max_duration)
+        last = len(starts) if upper is None else bisect_left(starts, upper)
+        return [
+            row
+            for row in self._start_rows[first:last]
+            if (candidates is None or row in candidates)
+            and (lower is None or events[row].end_ts > lower)
+        ]
+
+    def _link(self, row: int, event: Event):
+        for field in TEXT_FIELDS:
+            index = self._text[field]
+            for token in set(tokenize(getattr(event, field) or "")):
+                index.setdefault(token, set()).add(row)
+        for email in event.attendees:
+            self._attendees.setdefault(email, set()).add(row)
+        self._statuses.setdefault(event.status or "confirmed", set()).add(row)
+        self._calendars.setdefault(event.calendar_id, set()).add(row)
+        if event.start is not None and event.end is not None:
+            self._max_duration = max(self._max_duration, event.end_ts - event.start_ts)
+            self._unsorted.add(row)
+        else:
+            self._timeless.add(row)
+
+    def _unlink(self, row: int, event: Event):
+        for field in TEXT_FIELDS:
+            index = self._text[field]
+            for token in set(tokenize(getattr(event, field) or "")):
+                self._discard(index, token, row)
+        for email in event.attendees:
+            self._discard(self._attendees, email, row)
+        self._discard(self._statuses, event.status or "confirmed", row)
+        self._discard(self._calendars, event.calendar_id, row)
+        if event.start is None or event.end is None:
+            self._timeless.discard(row)
+            return
+        if row in self._unsorted:
+            self._unsorted.discard(row)
+            return
+        start = event.start_ts
+        position = bisect_left(self._starts, start)
+        while self._start_rows[position] != row:
+            position += 1
+        del self._starts[position]
+        del self._start_rows[position]
+
+    def _sort_starts(self):
+        """Добавление новых строк во временной индекс перед запросом."""
+        if not self._unsorted:
+            return
+        events = self._events
+        if len(self._unsorted) > REBUILD_RATIO * len(self._starts):
+            rows = sorted(
+                list(self._start_rows) + list(self._unsorted),
+                key=lambda row: events[row].start_ts,
+            )
+            self._start_rows = array("I", rows)
+            self._starts = array("d", (events[row].start_ts for row in rows))
+        else:
+            for row in self._unsorted:
+                start = events[row].start_ts
+                position = bisect_right(self._starts, start)
+                self._starts.insert(position, start)
+                self._start_rows.insert(position, row)
+        self._unsorted.clear()
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], key: str, row: int):
+        rows = index.get(key)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del index[key]
@@ -0,0 +1,320 @@
+import json
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+from telemetry.gtelemetry import (
+    Telemetry,
+    default_telemetry,
+    payload_size,
+    request_method,
+    watch_response_size,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+RETRYABLE_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+
+def error_reason(error: HttpError) -> Optional[str]:
+    """Извлечение поля reason из тела ошибки Google API."""
+    try:
+        data = json.loads(error.content.decode("utf-8"))
+        return data["error"]["errors"][0]["reason"]
+    except Exception:
+        return None
+
+
+def failure_reason(error: Exception) -> str:
+    """Метка ошибки для метрик: reason Google API, HTTP-статус или тип исключения."""
+    if isinstance(error, HttpError):
+        return error_reason(error) or str(error.resp.status)
+    return type(error).__name__
+
+
+def is_not_modified(error: Exception) -> bool:
+    """Ответ 304 на условный запрос: не ошибка, а подтверждение копии в кэше."""
+    return isinstance(error, HttpError) and error.resp.status == 304
+
+
+def is_retryable(error: Exception) -> bool:
+    """Проверка, имеет ли смысл повторять запрос после ошибки."""
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    if status in RETRYABLE_STATUSES:
+        return True
+    return status == 403 and error_reason(error) in RETRYABLE_REASONS
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Значение заголовка Retry-After в секундах, если сервер его прислал."""
+    if not isinstance(error, HttpError):
+        return None
+    value = error.resp.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Корзина токенов: rate запросов в секунду с запасом capacity."""
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Резервирование токенов; возвращает время ожидания в секундах."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= min(tokens, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+    def slow_down(self, factor: float = 0.5, min_rate: float = 0.1):
+        """Мультипликативное снижение скорости после ответа о превышении квоты."""
+        with self._lock:
+            self.rate = max(min_rate, self.rate * factor)
+
+    def speed_up(self, step: float):
+        """Аддитивное восстановление скорости после успешных запросов."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + step)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        user_rate: float = 10.0,
+        project_rate: float = 100.0,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Адаптивный ограничитель запросов по пользователю и по проекту.
+
+        Бюджеты задаются в запросах в секунду; при ответах о превышении квоты
+        скорость соответствующей корзины снижается вдвое и затем
+        постепенно восстанавливается.
+        """
+        self.user_rate = user_rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.project = TokenBucket(project_rate, burst, clock)
+        self._users: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, user: str = "default", tokens: float = 1) -> float:
+        """Ожидание разрешения на tokens запросов; возвращает время ожидания."""
+        wait = max(self.user(user).reserve(tokens), self.project.reserve(tokens))
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def user(self, user: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._users.get(user)
+            if bucket is None:
+                bucket = TokenBucket(self.user_rate, self.burst, self.clock)
+                self._users[user] = bucket
+            return bucket
+
+    def set_user_rate(self, user: str, rate: float, burst: Optional[float] = None):
+        """Отдельный бюджет запросов в секунду для пользователя user."""
+        with self._lock:
+            self._users[user] = TokenBucket(rate, burst, self.clock)
+
+    def on_throttle(self, user: str, error: Exception):
+        """Снижение скорости корзины, чей лимит был превышен."""
+        if error_reason(error) == "userRateLimitExceeded":
+            self.user(user).slow_down()
+        else:
+            self.project.slow_down()
+        logger.warning("Rate limit hit for user %s, slowing down", user)
+
+    def on_success(self, user: str):
+        bucket = self.user(user)
+        bucket.speed_up(bucket.max_rate * 0.05)
+        self.project.speed_up(self.project.max_rate * 0.05)
+
+
+class RetryPolicy:
+    def __init__(
+        self, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 64.0
+    ):
+        """Экспоненциальная задержка с полным джиттером и учетом Retry-After."""
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Задержка перед повтором номер attempt (с нуля)."""
+        server_delay = retry_after(error)
+        if server_delay is not None:
+            return server_delay
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class QuotaMetrics:
+    def __init__(self):
+        """Счетчики запросов, повторов и ожидания квоты."""
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+        self.throttled: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def record_throttle(self, reason: str):
+        with self._lock:
+            self.throttled[reason] = self.throttled.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict:
+        """Текущие значения счетчиков."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "wait_seconds": self.wait_seconds,
+                "throttled": dict(self.throttled),
+            }
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def default_limiter() -> RateLimiter:
+    """Общий ограничитель скорости процесса: корзины по пользователям и проекту."""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
+
+
+class QuotaGuard:
+    def __init__(
+        self,
+        limiter: Optional[RateLimiter] = None,
+        policy: Optional[RetryPolicy] = None,
+        metrics: Optional[QuotaMetrics] = None,
+        user: str = "default",
+        sleep: Callable[[float], None] = time.sleep,
+        telemetry: Optional[Telemetry] = None,
+    ):
+        """Выполнение запросов Google API с ограничением скорости и повторами.
+
+        limiter по умолчанию общий для процесса, поэтому все клиенты одного
+        пользователя расходуют одну корзину. telemetry собирает задержки,
+        объемы, ошибки и span каждого запроса, по умолчанию общий для процесса.
+        """
+        self.limiter = limiter if limiter is not None else default_limiter()
+        self.policy = policy if policy is not None else RetryPolicy()
+        self.metrics = metrics if metrics is not None else QuotaMetrics()
+        self.user = user
+        self.sleep = sleep
+        self.telemetry = telemetry if telemetry is not None else default_telemetry()
+
+    def acquire(self, tokens: float = 1):
+        """Ожидание квоты на tokens запросов."""
+        if self.limiter is not None:
+            self.metrics.record("wait_seconds", self.limiter.acquire(self.user, tokens))
+
+    def execute(self, request):
+        """Выполнение request.execute() с повтором временных ошибок.
+
+        Ответ 304 учитывается как успешный и пробрасывается вызывающему коду
+        (ResponseCache.fetch) уже после закрытия span.
+        """
+        method = request_method(request)
+        response_size = watch_response_size(request)
+        not_modified = None
+        with self.telemetry.span(method, user=self.user) as span:
+            attempt = 0
+            while True:
+                self.acquire()
+                self.metrics.record("requests")
+                started = time.perf_counter()
+                try:
+                    response = request.execute()
+                except Exception as e:
+                    if is_not_modified(e):
+                        not_modified = e
+                        response = None
+                        break
+                    self.telemetry.observe(
+                        method,
+                        time.perf_counter() - started,
+                        payload_size(request),
+                        len(getattr(e, "content", None) or b""),
+                        failure_reason(e),
+                    )
+                    if not self.should_retry(e, attempt):
+                        self.metrics.record("failures")
+                        raise
+                    delay = self.backoff(e, attempt)
+                    logger.warning(
+                        "Retrying request in %.2fs after error: %s", delay, e
+                    )
+                    self.sleep(delay)
+                    attempt += 1
+                    span.set_attribute("retries", attempt)
+                    continue
+                break
+            self.telemetry.observe(
+                method,
+                time.perf_counter() - started,
+                payload_size(request),
+                0 if not_modified is not None else response_size(),
+            )
+            if self.limiter is not None:
+                self.limiter.on_success(self.user)
+        if not_modified is not None:
+            raise not_modified
+        return response
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        return is_retryable(error) and attempt < self.policy.max_retries
+
+    def backoff(self, error: Exception, attempt: int) -> float:
+        """Учет ошибки квоты и расчет задержки перед повтором."""
+        reason = failure_reason(error)
+        self.metrics.record("retries")
+        self.metrics.record_throttle(reason)
+        self.telemetry.count_retry(reason)
+        if self.limiter is not None:
+            self.limiter.on_throttle(self.user, error)
+        return self.policy.delay(attempt, error)
@@ -0,0 +1,460 @@
+import calendar
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from freebusy.gfreebusy import to_timestamp
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+
+# Число подряд идущих периодов без экземпляров, после которого правило
+# считается исчерпанным (например, BYMONTHDAY=30 при BYMONTH=2)
+MAX_EMPTY_PERIODS = 1000
+
+Occurrence = Union[datetime.datetime, datetime.date]
+UTC = datetime.timezone.utc
+
+
+def _parse_moment(value: str, tz: Optional[datetime.tzinfo]) -> Occurrence:
+    """Дата или время iCalendar: 20241025, 20241025T090000 или 20241025T060000Z."""
+    if "T" not in value:
+        return datetime.date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    moment = datetime.datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return moment.replace(tzinfo=UTC)
+    return moment.replace(tzinfo=tz) if tz is not None else moment
+
+
+def _zone(name: Optional[str]) -> Optional[datetime.tzinfo]:
+    """Часовой пояс IANA; None для пустых и нестандартных имен вроде GMT+02:00."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def _parse_dates(line: str, tz: Optional[datetime.tzinfo]) -> List[Occurrence]:
+    """Значения EXDATE/RDATE с учетом параметра TZID."""
+    head, _, values = line.partition(":")
+    for param in head.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.upper() == "TZID":
+            tz = _zone(value) or tz
+    return [_parse_moment(value, tz) for value in values.split(",") if value]
+
+
+class RRule:
+    def __init__(
+        self,
+        freq: str,
+        interval: int = 1,
+        count: Optional[int] = None,
+        until: Optional[Occurrence] = None,
+        byday: Iterable[Tuple[Optional[int], int]] = (),
+        bymonthday: Iterable[int] = (),
+        bymonth: Iterable[int] = (),
+        bysetpos: Iterable[int] = (),
+        wkst: int = 0,
+    ):
+        """Правило повторения RFC 5545 (RRULE).
+
+        Поддерживаются FREQ=DAILY/WEEKLY/MONTHLY/YEARLY, INTERVAL, COUNT,
+        UNTIL, BYDAY (с порядковым номером), BYMONTHDAY, BYMONTH, BYSETPOS и WKST.
+        """
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unsupported recurrence frequency: {freq}")
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.byday = list(byday)
+        self.bymonthday = list(bymonthday)
+        self.bymonth = list(bymonth)
+        self.bysetpos = list(bysetpos)
+        self.wkst = wkst
+
+    @classmethod
+    def parse(cls, line: str) -> "RRule":
+        """Разбор строки вида "RRULE:FREQ=WEEKLY;BYDAY=MO,WE"."""
+        parts = dict(
+            part.split("=", 1) for part in line.split(":", 1)[-1].split(";") if part
+        )
+
+        def numbers(key: str) -> List[int]:
+            return [int(v) for v in parts[key].split(",")] if key in parts else []
+
+        byday = []
+        for value in parts.get("BYDAY", "").split(","):
+            if value:
+                ordinal = value[:-2]
+                byday.append((int(ordinal) if ordinal else None, WEEKDAYS[value[-2:]]))
+        return cls(
+            parts["FREQ"],
+            interval=int(parts.get("INTERVAL", 1)),
+            count=int(parts["COUNT"]) if "COUNT" in parts else None,
+            until=_parse_moment(parts["UNTIL"], None) if "UNTIL" in parts else None,
+            byday=byday,
+            bymonthday=numbers("BYMONTHDAY"),
+            bymonth=numbers("BYMONTH"),
+            bysetpos=numbers("BYSETPOS"),
+            wkst=WEEKDAYS[parts.get("WKST", "MO")],
+        )
+
+    def iter(
+        self, dtstart: Occurrence, tz: Optional[datetime.tzinfo] = None
+    ) -> Iterator[Occurrence]:
+        """Экземпляры правила начиная с dtstart в местном времени пояса tz."""
+        emitted = 0
+        empty = 0
+        for period in itertools.count():
+            try:
+                days = self._period(dtstart, period)
+            except (ValueError, OverflowError):
+                return  # Вышли за пределы datetime.date
+            if isinstance(dtstart, datetime.datetime):
+                candidates = [
+                    datetime.datetime.combine(d, dtstart.time()) for d in days
+                ]
+            else:
+                candidates = days
+            if self.bysetpos:
+                candidates = [
+                    candidates[p - 1 if p > 0 else p]
+                    for p in self.bysetpos
+                    if -len(candidates) <= p <= len(candidates) and p
+                ]
+                candidates.sort()
+            empty = 0 if candidates else empty + 1
+            if empty > MAX_EMPTY_PERIODS:
+                return
+            for candidate in candidates:
+                if candidate < dtstart:
+                    continue
+                if self._after_until(candidate, tz):
+                    return
+                yield candidate
+                emitted += 1
+                if self.count is not None and emitted >= self.count:
+                    return
+
+    def _after_until(self, candidate: Occurrence, tz) -> bool:
+        if self.until is None:
+            return False
+        if not isinstance(candidate, datetime.datetime):
+            until = self.until
+            return candidate > (
+                until.date() if isinstance(until, datetime.datetime) else until
+            )
+        if not isinstance(self.until, datetime.datetime):
+            return candidate.date() > self.until
+        if self.until.tzinfo is None:
+            return candidate > self.until
+        return candidate.replace(tzinfo=tz or UTC).astimezone(UTC) > self.until
+
+    def _period(self, dtstart: Occurrence, period: int) -> List[datetime.date]:
+        start = dtstart.date() if isinstance(dtstart, datetime.datetime) else dtstart
+        step = period * self.interval
+        if self.freq == "DAILY":
+            day = start + datetime.timedelta(days=step)
+            days = [day] if self._matches_day(day) else []
+        elif self.freq == "WEEKLY":
+            week = start - datetime.timedelta(days=(start.weekday() - self.wkst) % 7)
+            week += datetime.timedelta(weeks=step)
+            weekdays = [weekday for _, weekday in self.byday] or [start.weekday()]
+            days = sorted(
+                week + datetime.timedelta(days=(weekday - self.wkst) % 7)
+                for weekday in set(weekdays)
+            )
+            days = [d for d in days if not self.bymonth or d.month in self.bymonth]
+        elif self.freq == "MONTHLY":
+            year, month = divmod(start.year * 12 + start.month - 1 + step, 12)
+            month += 1
+            if self.bymonth and month not in self.bymonth:
+                return []
+            days = self._month_days(year, month, start)
+        else:
+            year = start.year + step
+            if self.byday and not self.bymonth and not self.bymonthday:
+                days = self._year_weekdays(year)
+            else:
+                months = self.bymonth or (
+                    range(1, 13) if self.bymonthday else [start.month]
+                )
+                days = [d for m in months for d in self._month_days(year, m, start)]
+        return sorted(days)
+
+    def _matches_day(self, day: datetime.date) -> bool:
+        if self.bymonth and day.month not in self.bymonth:
+            return False
+        if self.byday and day.weekday() not in {w for _, w in self.byday}:
+            return False
+        if self.bymonthday:
+            last = calendar.monthrange(day.year, day.month)[1]
+            return any(d == day.day or last + d + 1 == day.day for d in self.bymonthday)
+        return True
+
+    def _month_days(self, year: int, month: int, start: datetime.date):
+        last = calendar.monthrange(year, month)[1]
+        monthdays: Optional[Set[int]] = None
+        if self.bymonthday:
+            monthdays = {d if d > 0 else last + d + 1 for d in self.bymonthday}
+            monthdays = {d for d in monthdays if 1 <= d <= last}
+        if self.byday:
+            weekdays = set()
+            for ordinal, weekday in self.byday:
+                matches = [
+                    d
+                    for d in range(1, last + 1)
+                    if datetime.date(year, month, d).weekday() == weekday
+                ]
+                if ordinal is None:
+                    weekdays.update(matches)
+                elif 0 < abs(ordinal) <= len(matches):
+                    weekdays.add(matches[ordinal - 1 if ordinal > 0 else ordinal])
+            monthdays = weekdays if monthdays is None else monthdays & weekdays
+        if monthdays is None:
+            # 31-е число пропускается в коротких месяцах, как на сервере
+            monthdays = {start.day} if start.day <= last else set()
+        return [datetime.date(year, month, d) for d in sorted(monthdays)]
+
+    def _year_weekdays(self, year: int) -> List[datetime.date]:
+        days = set()
+        first = datetime.date(year, 1, 1)
+        total = 366 if calendar.isleap(year) else 365
+        for ordinal, weekday in self.byday:
+            offset = (weekday - first.weekday()) % 7
+            matches = [
+                first + datetime.timedelta(days=d) for d in range(offset, total, 7)
+            ]
+            if ordinal is None:
+                days.update(matches)
+            elif 0 < abs(ordinal) <= len(matches):
+                days.add(matches[ordinal - 1 if ordinal > 0 else ordinal])
+        return sorted(days)
+
+
+def _event_start(event: dict) -> float:
+    start = event.get("start", {})
+    return to_timestamp(start.get("dateTime") or start.get("date"))
+
+
+def _event_end(event: dict) -> float:
+    end = event.get("end", {})
+    return to_timestamp(end.get("dateTime") or end.get("date"))
+
+
+class Series:
+    def __init__(self, master: dict):
+        """Развернутая серия повторяющегося события.
+
+        Экземпляры вычисляются лениво по мере запроса и кэшируются, поэтому
+        повторные запросы того же периода не пересчитывают правило.
+        """
+        self.master = master
+        self.version = master.get("etag") or master.get("updated")
+        start, end = master["start"], master["end"]
+        self.all_day = "date" in start
+        if self.all_day:
+            self.tz = None
+            self.dtstart: Occurrence = datetime.date.fromisoformat(start["date"])
+            end_date = datetime.date.fromisoformat(end["date"])
+            self.duration = end_date - self.dtstart
+        else:
+            aware = datetime.datetime.fromisoformat(start["dateTime"])
+            self.tz = _zone(start.get("timeZone")) or aware.tzinfo or UTC
+            # Правило разворачивается в местном времени: при переходе на летнее
+            # время экземпляры сохраняют время на часах, а не интервал в UTC
+            self.dtstart = aware.astimezone(self.tz).replace(tzinfo=None)
+            self.duration = datetime.datetime.fromisoformat(end["dateTime"]) - aware
+        self.exdates: Set[float] = set()
+        sources = []
+        rdates = []
+        for line in master.get("recurrence", []):
+            name = line.split(":", 1)[0].split(";", 1)[0].upper()
+            if name == "RRULE":
+                sources.append(RRule.parse(line).iter(self.dtstart, self.tz))
+            elif name == "EXDATE":
+                self.exdates.update(
+                    self._timestamp(d) for d in _parse_dates(line, self.tz)
+                )
+            elif name == "RDATE":
+                rdates.extend(self._local(d) for d in _parse_dates(line, self.tz))
+        if not sources:
+            sources.append(iter([self.dtstart]))
+        sources.append(iter(sorted(rdates)))
+        self._source = heapq.merge(*sources)
+        self._starts: List[float] = []
+        self._locals: List[Occurrence] = []
+        self._exhausted = False
+        self._lock = threading.Lock()
+
+    def occurrences(
+        self, time_min: float = float("-inf"), time_max: float = float("inf")
+    ) -> Iterator[Tuple[float, Occurrence]]:
+        """Экземпляры, пересекающие [time_min, time_max), в порядке начала."""
+        lower = time_min - self.duration.total_seconds()
+        with self._lock:
+            while not self._exhausted and (
+                not self._starts or self._starts[-1] <= lower
+            ):
+                self._advance()
+            position = bisect_left(self._starts, lower)
+            if position < len(self._starts) and self._starts[position] == lower:
+                position += 1
+        while True:
+            with self._lock:
+                if position >= len(self._starts) and not self._advance():
+                    return
+                start, local = self._starts[position], self._locals[position]
+            if start >= time_max:
+                return
+            position += 1
+            yield start, local
+
+    def instance(self, local: Occurrence) -> dict:
+        """Экземпляр серии в формате ответа events().instances()."""
+        master_id = self.master["id"]
+        instance = {k: v for k, v in self.master.items() if k != "recurrence"}
+        if self.all_day:
+            start = {"date": local.isoformat()}
+            end = {"date": (local + self.duration).isoformat()}
+            suffix = local.strftime("%Y%m%d")
+        else:
+            aware = local.replace(tzinfo=self.tz)
+            zone = self.master["start"].get("timeZone")
+            start = {"dateTime": aware.isoformat()}
+            end_moment = aware.astimezone(UTC) + self.duration
+            end = {"dateTime": end_moment.astimezone(self.tz).isoformat()}
+            if zone:
+                start["timeZone"] = end["timeZone"] = zone
+            suffix = aware.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+        instance.update(
+            {
+                "id": f"{master_id}_{suffix}",
+                "recurringEventId": master_id,
+                "originalStartTime": dict(start),
+                "start": start,
+                "end": end,
+            }
+        )
+        return instance
+
+    def _advance(self) -> bool:
+        """Вычисление следующего экземпляра; False, если серия закончилась."""
+        for local in self._source:
+            start = self._timestamp(local)
+            if start in self.exdates or (self._starts and start <= self._starts[-1]):
+                continue  # Исключенная дата или RDATE, совпавший с правилом
+            self._starts.append(start)
+            self._locals.append(local)
+            return True
+        self._exhausted = True
+        return False
+
+    def _local(self, moment: Occurrence) -> Occurrence:
+        if self.all_day:
+            return moment.date() if isinstance(moment, datetime.datetime) else moment
+        if not isinstance(moment, datetime.datetime):
+            return datetime.datetime.combine(moment, self.dtstart.time())
+        if moment.tzinfo is not None:
+            return moment.astimezone(self.tz).replace(tzinfo=None)
+        return moment
+
+    def _timestamp(self, moment: Occurrence) -> float:
+        local = self._local(moment)
+        if self.all_day:
+            return to_timestamp(local.isoformat())
+        return local.replace(tzinfo=self.tz).timestamp()
+
+
+class RecurrenceExpander:
+    def __init__(self, max_series: int = 1024):
+        """Локальное разворачивание повторяющихся событий.
+
+        Принимает основные события серий и исключения (ответ events().list
+        с singleEvents=False) и выдает экземпляры так же, как сервер при
+        singleEvents=True. Развернутые серии кэшируются по ID и etag события.
+        """
+        self.max_series = max_series
+        self._series: "OrderedDict[str, Series]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def series(self, master: dict) -> Series:
+        """Серия события из кэша; пересоздается при изменении etag."""
+        version = master.get("etag") or master.get("updated")
+        with self._lock:
+            series = self._series.get(master["id"])
+            if series is not None and series.version == version:
+                self._series.move_to_end(master["id"])
+                return series
+        series = Series(master)
+        with self._lock:
+            self._series[master["id"]] = series
+            self._series.move_to_end(master["id"])
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        return series
+
+    def invalidate(self, event_id: Optional[str] = None):
+        with self._lock:
+            if event_id is None:
+                self._series.clear()
+            else:
+                self._series.pop(event_id, None)
+
+    def expand(
+        self,
+        events: Iterable[dict],
+        time_min=None,
+        time_max=None,
+    ) -> Iterator[dict]:
+        """Ленивый обход экземпляров событий за период в порядке начала.
+
+        Измененные экземпляры (исключения) заменяют экземпляры серии,
+        отмененные исключения удаляют их.
+        """
+        lower = to_timestamp(time_min) if time_min is not None else float("-inf")
+        upper = to_timestamp(time_max) if time_max is not None else float("inf")
+        masters = []
+        singles = []
+        overridden: Dict[str, Set[float]] = {}
+        for event in events:
+            if event.get("recurrence"):
+                masters.append(event)
+                continue
+            if event.get("recurringEventId"):
+                original = event.get("originalStartTime", {})
+                moment = original.get("dateTime") or original.get("date")
+                overridden.setdefault(event["recurringEventId"], set()).add(
+                    to_timestamp(moment)
+                )
+            if event.get("status") == "cancelled":
+                continue
+            if _event_start(event) < upper and _event_end(event) > lower:
+                singles.append(event)
+        streams = [
+            self._instances(self.series(master), lower, upper, overridden)
+            for master in masters
+            if master.get("status") != "cancelled"
+        ]
+        streams.append(iter(sorted(singles, key=_event_start)))
+        yield from heapq.merge(*streams, key=_event_start)
+
+    def _instances(
+        self, series: Series, lower: float, upper: float, overridden
+    ) -> Iterator[dict]:
+        skip = overridden.get(series.master["id"], set())
+        for start, local in series.occurrences(lower, upper):
+            if start not in skip:
+                yield series.instance(local)
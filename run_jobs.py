@@ -0,0 +1,81 @@
+import argparse
+import json
+import logging
+
+import conf
+from auth.gapiworkspace import GAPIWorkspace
+from main import load_oauth_credentials
+from pool.gpool import JobPool
+from quota.gquota import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(
+        description="Run calendar jobs for many accounts on a shared worker pool"
+    )
+    parser.add_argument(
+        "jobs",
+        help='JSONL file, one job per line: {"tenant", "action", "calendar_id", "params"}',
+    )
+    parser.add_argument(
+        "--tenants",
+        required=True,
+        help='JSON file mapping tenant name to {"creds": path, "rate": requests/s}',
+    )
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument(
+        "--tenant-workers",
+        type=int,
+        default=None,
+        help="maximum concurrent jobs per tenant",
+    )
+    parser.add_argument("--user-rate", type=float, default=10.0)
+    parser.add_argument("--project-rate", type=float, default=100.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Выполнение заданий из файла для нескольких аккаунтов"""
+    args = parse_args(argv)
+    with open(args.tenants, encoding="utf-8") as f:
+        tenants = json.load(f)
+    oauth = load_oauth_credentials()
+    pool = JobPool(
+        workers=args.workers,
+        limiter=RateLimiter(args.user_rate, args.project_rate),
+        tenant_workers=args.tenant_workers,
+    )
+    for name, config in tenants.items():
+        workspace = GAPIWorkspace(oauth, filename=config["creds"], auto_refresh=True)
+        pool.add_tenant(name, workspace, rate=config.get("rate"))
+    with open(args.jobs, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            pool.submit(
+                job["tenant"],
+                job["action"],
+                job.get("calendar_id"),
+                **job.get("params", {}),
+            )
+    pool.shutdown()
+    report = pool.report()
+    for name, stats in report.items():
+        logger.info(
+            "Tenant %s: %s completed, %s failed, %.1f jobs/s",
+            name,
+            stats["completed"],
+            stats["failed"],
+            stats["throughput"],
+        )
+    print(json.dumps(report, indent=2))
+    return 0 if all(stats["failed"] == 0 for stats in report.values()) else 2
+
+
+if __name__ == "__main__":
+    conf.configure_logging()
+    raise SystemExit(main())
@@ -1,10 +1,14 @@
 #!/bin/bash
 
-
-
-# Запуск скрипта установки зависимостей
-chmod +x scripts/setup.sh
-./scripts/setup.sh
-
-# Запуск основного файла
-python main.py
+# Установка зависимостей только при первом запуске
+if [ ! -d venv ]; then
+    chmod +x scripts/setup.sh
+    ./scripts/setup.sh
+fi
+source venv/bin/activate
+
+# Без аргументов запускается демонстрационный main.py, иначе подкоманда cli.py
+if [ $# -eq 0 ]; then
+    exec python main.py
+fi
+exec python cli.py "$@"
@@ -0,0 +1,148 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import build_http
+
+logger = logging.getLogger(__name__)
+
+_documents: Dict[Tuple[str, str], dict] = {}
+_documents_lock = threading.Lock()
+
+
+def discovery_document(api: str = "calendar", version: str = "v3") -> dict:
+    """Разобранный discovery-документ из пакета googleapiclient, без сети."""
+    with _documents_lock:
+        document = _documents.get((api, version))
+        if document is None:
+            content = get_static_doc(api, version)
+            if content is None:
+                raise ValueError(f"No static discovery document for {api} {version}")
+            document = json.loads(content)
+            _documents[(api, version)] = document
+            logger.info("Loaded discovery document for %s %s", api, version)
+        return document
+
+
+class PooledHttp:
+    def __init__(self, credentials, size: int = 10):
+        """Ограниченный пул AuthorizedHttp для безопасной работы из потоков.
+
+        Каждый запрос занимает отдельный транспорт пула, поэтому один
+        httplib2.Http никогда не используется двумя потоками одновременно.
+        """
+        self.credentials = credentials
+        self.size = size
+        self.created = 0
+        self._idle: List[AuthorizedHttp] = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def request(self, *args, **kwargs):
+        http = self._acquire()
+        try:
+            return http.request(*args, **kwargs)
+        finally:
+            self._release(http)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for http in idle:
+            http.close()
+
+    def _acquire(self) -> AuthorizedHttp:
+        self._slots.acquire()
+        try:
+            with self._lock:
+                if self._idle:
+                    # LIFO: берем последний транспорт с живым keep-alive соединением
+                    return self._idle.pop()
+                self.created += 1
+            return AuthorizedHttp(self.credentials, http=build_http())
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, http: AuthorizedHttp):
+        with self._lock:
+            self._idle.append(http)
+        self._slots.release()
+
+
+class ServiceFactory:
+    def __init__(
+        self,
+        api: str = "calendar",
+        version: str = "v3",
+        pool_size: int = 10,
+        max_services: int = 256,
+        root_url: Optional[str] = None,
+    ):
+        """Фабрика сервисов Google API с общим discovery-документом.
+
+        Сервис и пул транспортов создаются один раз на объект учетных данных
+        и переиспользуются всеми GCalendar/GEvent с этими данными.
+        root_url позволяет направить запросы на другой адрес, например эмулятор.
+        """
+        self.api = api
+        self.version = version
+        self.pool_size = pool_size
+        self.max_services = max_services
+        self.root_url = root_url
+        self._document: Optional[dict] = None
+        self._services: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def document(self) -> dict:
+        if self._document is None:
+            document = discovery_document(self.api, self.version)
+            if self.root_url:
+                document = {**document, "rootUrl": self.root_url}
+            self._document = document
+        return self._document
+
+    def build(self, credentials):
+        """Сервис Google API для учетных данных из кэша фабрики."""
+        key = id(credentials)
+        with self._lock:
+            cached = self._services.get(key)
+            if cached is not None:
+                self._services.move_to_end(key)
+                return cached[1]
+            service = build_from_document(
+                self.document, http=PooledHttp(credentials, self.pool_size)
+            )
+            # Держим ссылку на credentials, чтобы id не был переиспользован
+            self._services[key] = (credentials, service)
+            while len(self._services) > self.max_services:
+                _, (_, evicted) = self._services.popitem(last=False)
+                evicted.close()
+        logger.info("Built %s %s service", self.api, self.version)
+        return service
+
+    def clear(self):
+        """Закрытие и удаление всех закэшированных сервисов."""
+        with self._lock:
+            services, self._services = self._services, OrderedDict()
+        for _, service in services.values():
+            service.close()
+
+
+_default_factory: Optional[ServiceFactory] = None
+_default_factory_lock = threading.Lock()
+
+
+def default_factory() -> ServiceFactory:
+    """Общая фабрика сервисов процесса."""
+    global _default_factory
+    with _default_factory_lock:
+        if _default_factory is None:
+            _default_factory = ServiceFactory()
+        return _default_factory
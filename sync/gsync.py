@@ -0,0 +1,218 @@
+import json
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from model.gmodel import Event
+
+logger = logging.getLogger(__name__)
+
+
+class EventStore:
+    def __init__(self, path: str = ":memory:"):
+        """Локальное хранилище событий и sync-токенов на SQLite."""
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " calendar_id TEXT NOT NULL,"
+                " event_id TEXT NOT NULL,"
+                " updated TEXT,"
+                " data TEXT NOT NULL,"
+                " PRIMARY KEY (calendar_id, event_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_tokens ("
+                " calendar_id TEXT PRIMARY KEY,"
+                " token TEXT NOT NULL)"
+            )
+        logger.info("EventStore opened at %s", path)
+
+    def get_token(self, calendar_id: str) -> Optional[str]:
+        """Последний sync-токен календаря."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT token FROM sync_tokens WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply(self, calendar_id: str, items, token: Optional[str] = None):
+        """Применение страницы изменений в одной транзакции.
+
+        Отмененные события (status == "cancelled") удаляются из хранилища,
+        кроме отмененных экземпляров серий: без них развернутая серия
+        вернула бы удаленные повторения. Возвращает пару (обновлено, удалено).
+        """
+        upserted = deleted = 0
+        with self._lock, self._conn:
+            for event in items:
+                if event.get("status") != "cancelled":
+                    self._upsert(calendar_id, event)
+                    upserted += 1
+                    continue
+                if event.get("recurringEventId"):
+                    self._upsert(calendar_id, event)
+                else:
+                    self._conn.execute(
+                        "DELETE FROM events WHERE calendar_id = ? AND event_id = ?",
+                        (calendar_id, event["id"]),
+                    )
+                deleted += 1
+            if token:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_tokens (calendar_id, token)"
+                    " VALUES (?, ?)",
+                    (calendar_id, token),
+                )
+        return upserted, deleted
+
+    def _upsert(self, calendar_id: str, event: dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO events"
+            " (calendar_id, event_id, updated, data) VALUES (?, ?, ?, ?)",
+            (calendar_id, event["id"], event.get("updated"), json.dumps(event)),
+        )
+
+    def clear(self, calendar_id: str):
+        """Удаление всех событий и токена календаря."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM events WHERE calendar_id = ?", (calendar_id,)
+            )
+            self._conn.execute(
+                "DELETE FROM sync_tokens WHERE calendar_id = ?", (calendar_id,)
+            )
+
+    def get(self, calendar_id: str, event_id: str) -> Optional[dict]:
+        """Событие из хранилища по ID."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM events WHERE calendar_id = ? AND event_id = ?",
+                (calendar_id, event_id),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def events(self, calendar_id: str) -> Iterator[dict]:
+        """Обход событий календаря из хранилища, включая отмененные экземпляры."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM events WHERE calendar_id = ? ORDER BY event_id",
+                (calendar_id,),
+            ).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def models(self, calendar_id: str) -> Iterator[Event]:
+        """Обход событий календаря из хранилища в виде моделей Event."""
+        for event in self.events(calendar_id):
+            if event.get("status") != "cancelled":
+                yield Event.from_api(event, calendar_id)
+
+    def calendars(self) -> List[str]:
+        """ID календарей, события или токены которых есть в хранилище."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT calendar_id FROM events UNION"
+                " SELECT calendar_id FROM sync_tokens ORDER BY calendar_id"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, calendar_id: str) -> int:
+        """Количество неотмененных событий календаря в хранилище."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM events WHERE calendar_id = ?"
+                " AND json_extract(data, '$.status') IS NOT 'cancelled'",
+                (calendar_id,),
+            ).fetchone()
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class GSync:
+    def __init__(self, gcalendar, store: EventStore, page_size: int = 2500):
+        """Инкрементальная синхронизация событий через syncToken."""
+        self.service = gcalendar.service
+        self.quota = gcalendar.quota
+        self.store = store
+        self.page_size = page_size
+        self.listeners = []
+        self.data = None
+        self.error = None
+        logger.info("GSync initialized")
+
+    def add_listener(self, listener):
+        """Подписка на изменения синхронизации.
+
+        listener.apply(calendar_id, items) вызывается на каждую страницу,
+        listener.clear(calendar_id) — при сбросе календаря после 410, поэтому
+        локальные индексы обновляются теми же изменениями, что и хранилище.
+        """
+        self.listeners.append(listener)
+
+    def sync(self, calendar_id: str):
+        """Синхронизация календаря: инкрементальная при наличии токена.
+
+        Возвращает статистику {"upserted", "deleted", "full"} или False при ошибке.
+        """
+        try:
+            token = self.store.get_token(calendar_id)
+            if token:
+                try:
+                    logger.info("Incremental sync for calendar %s", calendar_id)
+                    stats = self._sync(calendar_id, token)
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    # Токен устарел: сервер требует полную синхронизацию
+                    logger.warning("Sync token expired for calendar %s", calendar_id)
+                    self.store.clear(calendar_id)
+                    for listener in self.listeners:
+                        listener.clear(calendar_id)
+                    token = None
+            if not token:
+                logger.info("Full sync for calendar %s", calendar_id)
+                stats = self._sync(calendar_id, None)
+            self.data = stats
+            logger.info(
+                "Calendar %s synced: %s upserted, %s deleted",
+                calendar_id,
+                stats["upserted"],
+                stats["deleted"],
+            )
+            return stats
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error syncing calendar %s: %s", calendar_id, e)
+            return False
+
+    def _sync(self, calendar_id: str, token: Optional[str]) -> Dict:
+        stats = {"upserted": 0, "deleted": 0, "full": token is None}
+        params = {"calendarId": calendar_id, "maxResults": self.page_size}
+        if token:
+            params["syncToken"] = token
+        page_token = None
+        while True:
+            response = self.quota.execute(
+                self.service.events().list(pageToken=page_token, **params)
+            )
+            page_token = response.get("nextPageToken")
+            upserted, deleted = self.store.apply(
+                calendar_id,
+                response.get("items", []),
+                None if page_token else response.get("nextSyncToken"),
+            )
+            for listener in self.listeners:
+                listener.apply(calendar_id, response.get("items", []))
+            stats["upserted"] += upserted
+            stats["deleted"] += deleted
+            if not page_token:
+                return stats
@@ -0,0 +1,313 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from googleapiclient.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограммы задержек, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LATENCY = "calendar_api_request_duration_seconds"
+REQUESTS = "calendar_api_requests_total"
+REQUEST_BYTES = "calendar_api_request_bytes_total"
+RESPONSE_BYTES = "calendar_api_response_bytes_total"
+ERRORS = "calendar_api_errors_total"
+RETRIES = "calendar_api_retries_total"
+
+HELP = {
+    LATENCY: "Latency of Calendar API requests.",
+    REQUESTS: "Calendar API requests sent, including retries.",
+    REQUEST_BYTES: "Bytes sent in Calendar API request bodies.",
+    RESPONSE_BYTES: "Bytes received in Calendar API response bodies.",
+    ERRORS: "Failed Calendar API requests by error reason.",
+    RETRIES: "Retried Calendar API requests by error reason.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def request_method(request) -> str:
+    """Имя метода API запроса, например calendar.events.list."""
+    method = getattr(request, "methodId", None)
+    return method if isinstance(method, str) else "unknown"
+
+
+def payload_size(request) -> int:
+    """Размер тела запроса в байтах."""
+    body = getattr(request, "body", None)
+    return len(body) if isinstance(body, (str, bytes)) else 0
+
+
+def watch_response_size(request) -> Callable[[], int]:
+    """Подмена postproc запроса для учета размера тела ответа до разбора JSON.
+
+    Возвращает функцию, отдающую размер последнего ответа.
+    """
+    if not isinstance(request, HttpRequest):
+        return lambda: 0
+    size = getattr(request, "_response_size", None)
+    if size is None:
+        size = request._response_size = [0]
+        postproc = request.postproc
+
+        def measured(resp, content):
+            size[0] = len(content or b"")
+            return postproc(resp, content)
+
+        request.postproc = measured
+    return lambda: size[0]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Значение счетчика без потери точности: целые — без экспоненты."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Накопленные счетчики по верхним границам, включая +Inf."""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+class Span:
+    """Интервал трассировки одной операции."""
+
+    def __init__(self, name: str, attributes: Optional[dict] = None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self._started = time.perf_counter()
+        self.duration = 0.0
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.duration = time.perf_counter() - self._started
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+        self.error = error
+
+
+class Telemetry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Метрики запросов к API и хуки трассировки.
+
+        Задержки собираются в гистограммы по методам, байты, ошибки и повторы —
+        в счетчики с метками. exposition() отдает их в формате Prometheus.
+        Хуки span получают каждый завершенный Span.
+        """
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[Labels, Histogram] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._hooks: List[Callable[[Span], None]] = []
+        self._lock = threading.Lock()
+
+    def add_span_hook(self, hook: Callable[[Span], None]):
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_span_hook(self, hook: Callable[[Span], None]):
+        with self._lock:
+            self._hooks.remove(hook)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Трассировка блока кода; без хуков стоит один замер времени."""
+        span = Span(name, attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            self._emit(span)
+            raise
+        span.finish()
+        self._emit(span)
+
+    def observe(
+        self,
+        method: str,
+        seconds: float,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        error_reason: Optional[str] = None,
+    ):
+        """Учет одного HTTP-запроса метода method."""
+        labels = _labels({"method": method})
+        with self._lock:
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                histogram = self._histograms[labels] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            self._add(REQUESTS, labels, 1)
+            self._add(REQUEST_BYTES, labels, request_bytes)
+            self._add(RESPONSE_BYTES, labels, response_bytes)
+            if error_reason is not None:
+                self._add(
+                    ERRORS, _labels({"method": method, "reason": error_reason}), 1
+                )
+
+    def count(self, name: str, value: float = 1, **labels):
+        """Увеличение произвольного счетчика с метками."""
+        with self._lock:
+            self._add(name, _labels(labels), value)
+
+    def count_retry(self, reason: str):
+        self.count(RETRIES, reason=reason)
+
+    def value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0)
+
+    def histogram(self, method: str) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get(_labels({"method": method}))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def exposition(self) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        lines = []
+        with self._lock:
+            if self._histograms:
+                lines += [
+                    f"# HELP {LATENCY} {HELP[LATENCY]}",
+                    f"# TYPE {LATENCY} histogram",
+                ]
+                for labels, histogram in sorted(self._histograms.items()):
+                    for bound, total in histogram.cumulative():
+                        bucket_labels = _format_labels(labels, (("le", bound),))
+                        lines.append(f"{LATENCY}_bucket{bucket_labels} {total}")
+                    lines.append(
+                        f"{LATENCY}_sum{_format_labels(labels)} {histogram.sum}"
+                    )
+                    lines.append(
+                        f"{LATENCY}_count{_format_labels(labels)} {histogram.count}"
+                    )
+            for name, series in sorted(self._counters.items()):
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _add(self, name: str, labels: Labels, value: float):
+        series = self._counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+    def _emit(self, span: Span):
+        with self._lock:
+            hooks = list(self._hooks)
+        for hook in hooks:
+            try:
+                hook(span)
+            except Exception as e:
+                logger.error("Error in span hook for %s: %s", span.name, e)
+
+
+def opentelemetry_hook(tracer_name: str = "GoogleCalendarIntegration"):
+    """Хук, пересылающий span в OpenTelemetry; требует пакет opentelemetry-api."""
+    try:
+        from opentelemetry import trace
+        from opentelemetry.trace import Status, StatusCode
+    except ImportError as e:
+        raise RuntimeError("OpenTelemetry hook requires opentelemetry-api") from e
+    tracer = trace.get_tracer(tracer_name)
+
+    def hook(span: Span):
+        otel_span = tracer.start_span(
+            span.name, start_time=span.start_ns, attributes=span.attributes
+        )
+        if span.error is not None:
+            otel_span.record_exception(span.error)
+            otel_span.set_status(Status(StatusCode.ERROR, str(span.error)))
+        otel_span.end(end_time=span.end_ns)
+
+    return hook
+
+
+def start_metrics_server(
+    telemetry: Telemetry, host: str = "127.0.0.1", port: int = 9464
+) -> ThreadingHTTPServer:
+    """HTTP-сервер /metrics для Prometheus в фоновом потоке."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = telemetry.exposition().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    logger.info("Metrics server listening on %s:%s", host, server.server_port)
+    return server
+
+
+_default_telemetry: Optional[Telemetry] = None
+_default_telemetry_lock = threading.Lock()
+
+
+def default_telemetry() -> Telemetry:
+    """Общий сборщик метрик процесса."""
+    global _default_telemetry
+    with _default_telemetry_lock:
+        if _default_telemetry is None:
+            _default_telemetry = Telemetry()
+        return _default_telemetry
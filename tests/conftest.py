@@ -3,6 +3,15 @@ from unittest.mock import MagicMock
 from gcalendar.gcalendar import GCalendar
 from event.gevent import GEvent
 from google.oauth2.credentials import Credentials
+from quota import gquota
+
+
+@pytest.fixture(autouse=True)
+def default_limiter(monkeypatch):
+    """Общий ограничитель скорости без реальных пауз, свой для каждого теста."""
+    limiter = gquota.RateLimiter(sleep=lambda delay: None)
+    monkeypatch.setattr(gquota, "_default_limiter", limiter)
+    return limiter
 
 
 @pytest.fixture
@@ -28,3 +37,28 @@ def mock_gevent(mock_gcalendar):
     gevent = GEvent(mock_gcalendar)
     gevent.service = MagicMock()  # Мокируем сервис API
     return gevent
+
+
+class FakeBatchHttpRequest:
+    """Имитация BatchHttpRequest: выполняет подзапросы по очереди."""
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        self.requests.append((request, callback, request_id))
+
+    def execute(self, http=None):
+        for request, callback, request_id in self.requests:
+            try:
+                response, exception = request.execute(), None
+            except Exception as e:
+                response, exception = None, e
+            (callback or self.callback)(request_id, response, exception)
+
+
+@pytest.fixture
+def fake_batch():
+    """Фикстура, возвращающая фабрику поддельных batch-запросов."""
+    return FakeBatchHttpRequest
@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from emulator.gemulator import CalendarEmulator, EmulatorWorkspace, seed_events
+from gcalendar.gcalendar import GCalendar
+from quota.gquota import QuotaGuard
+from telemetry.gtelemetry import Telemetry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def logging_calls(monkeypatch):
+    """Фикстура, заменяющая настройку логирования записью аргументов."""
+    calls = []
+    monkeypatch.setattr(cli.conf, "configure_logging", lambda *a: calls.append(a))
+    return calls
+
+
+@pytest.fixture
+def emulator(monkeypatch):
+    """Фикстура эмулятора, к которому подключаются подкоманды CLI."""
+    with CalendarEmulator() as emulator:
+        quota = QuotaGuard(sleep=lambda s: None, telemetry=Telemetry())
+        gcalendar = GCalendar(
+            EmulatorWorkspace(), factory=emulator.factory(), quota=quota
+        )
+        monkeypatch.setattr(cli, "load_gcalendar", lambda: gcalendar)
+        yield emulator
+
+
+def test_imports_are_lazy(tmp_path):
+    """Тест отсутствия тяжелых импортов и файла лога при импорте точек входа."""
+    code = (
+        "import sys; import cli, main, conf;"
+        "print(sorted(m for m in ('googleapiclient', 'google_auth_oauthlib')"
+        " if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip() == "[]"
+    assert not (tmp_path / "app.log").exists()
+
+
+def test_list_calendars_and_events(emulator, logging_calls, capsys):
+    """Тест вывода календарей и событий в JSONL."""
+    seed_events(emulator.backend, "primary", 3)
+
+    assert cli.main(["--log-file", "", "list"]) == 0
+    calendars = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [c["id"] for c in calendars] == ["emulator@example.com"]
+
+    assert cli.main(["list", "--calendar", "primary", "--limit", "2"]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 2
+    assert logging_calls == [(None, 20), ("app.log", 20)]
+
+
+def test_sync_writes_store(emulator, logging_calls, capsys, tmp_path):
+    """Тест синхронизации в SQLite: полной, затем инкрементальной."""
+    seed_events(emulator.backend, "primary", 5)
+    store = str(tmp_path / "events.db")
+
+    assert cli.main(["sync", "primary", "--store", store]) == 0
+    assert cli.main(["sync", "primary", "--store", store]) == 0
+
+    first, second = map(json.loads, capsys.readouterr().out.splitlines())
+    assert (first["upserted"], first["full"]) == (5, True)
+    assert (second["upserted"], second["full"]) == (0, False)
+
+
+def test_benchmark_reports_import_profile(logging_calls, capsys):
+    """Тест передачи аргументов бенчмарку и отчета о времени импортов."""
+    code = cli.main(["--import-profile", "benchmark", "service", "--rounds", "2"])
+
+    captured = capsys.readouterr()
+    assert code == 0
+    assert "ServiceFactory, shared credentials" in captured.out
+    assert "import benchmarks.bench_service" in captured.err
+
+
+def test_unknown_arguments_are_rejected(logging_calls):
+    """Тест ошибки для лишних аргументов подкоманды со своим разбором."""
+    with pytest.raises(SystemExit):
+        cli.main(["list", "--bogus"])
+    assert cli.main([]) == 2
+    assert logging_calls == []
@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from auth.gapiworkspace import GAPIWorkspace
@@ -25,3 +26,20 @@ def test_gapiworkspace_creds_no_file(mocker):
 
     gapi = GAPIWorkspace({"mock": "oauth_data"})
     assert gapi.get_credentials() == "new_creds"
+
+
+def test_gapiworkspace_read_creates_no_lock_file(tmp_path):
+    """Тест чтения токена из файла без создания файла блокировки."""
+    token_file = tmp_path / "token.json"
+    token_file.write_text(json.dumps({
+        "token": "access",
+        "refresh_token": "refresh",
+        "client_id": "client",
+        "client_secret": "secret",
+        "expiry": "2999-01-01T00:00:00Z",
+    }))
+
+    gapi = GAPIWorkspace({"mock": "oauth_data"}, filename=str(token_file))
+
+    assert gapi.get_credentials().token == "access"
+    assert [path.name for path in tmp_path.iterdir()] == ["token.json"]
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import pytest
+import httpx
+from unittest.mock import MagicMock
+from aio.gasync import AsyncGCalendar, AsyncGEvent
+
+
+def make_calendar(handler, max_concurrency=100):
+    """Асинхронный календарь поверх httpx.MockTransport."""
+    gapi_workspace = MagicMock()
+    gapi_workspace.get_credentials.return_value = None
+    return AsyncGCalendar(
+        gapi_workspace,
+        max_concurrency=max_concurrency,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_async_gcalendar_create_and_get():
+    """Тест создания и получения календаря."""
+
+    def handler(request):
+        if request.method == "POST":
+            body = json.loads(request.content)
+            return httpx.Response(200, json={"id": "cal_1", **body})
+        assert request.url.path == "/calendar/v3/calendars/cal_1"
+        return httpx.Response(200, json={"id": "cal_1", "summary": "Work"})
+
+    async def scenario():
+        gcalendar = make_calendar(handler)
+        created = await gcalendar.create({"name": "Work"})
+        fetched = await gcalendar.get("cal_1")
+        await gcalendar.close()
+        return created, fetched
+
+    created, fetched = asyncio.run(scenario())
+    assert created["summary"] == "Work"
+    assert fetched["id"] == "cal_1"
+
+
+def test_async_gevent_create_many_bounded_concurrency():
+    """Тест ограничения числа одновременных запросов семафором."""
+    state = {"active": 0, "peak": 0}
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        if json.loads(request.content)["summary"] == "bad":
+            return httpx.Response(400, json={"error": {"message": "bad"}})
+        return httpx.Response(200, json={"id": "event"})
+
+    async def scenario():
+        gcalendar = make_calendar(handler, max_concurrency=3)
+        gevent = AsyncGEvent(gcalendar)
+        events = [{"name": f"Event {i}"} for i in range(10)] + [{"name": "bad"}]
+        results = await gevent.create_many("cal_1", events)
+        await gcalendar.close()
+        return gevent, results
+
+    gevent, results = asyncio.run(scenario())
+    assert state["peak"] == 3
+    assert sum(result.ok for result in results) == 10
+    assert results[-1].item == {"name": "bad"}
+    assert gevent.error is not None
+
+
+def test_async_gcalendar_delete_error():
+    """Тест обработки ошибки HTTP при удалении календаря."""
+
+    def handler(request):
+        return httpx.Response(404, json={"error": {"message": "Not Found"}})
+
+    async def scenario():
+        gcalendar = make_calendar(handler)
+        result = await gcalendar.delete("missing")
+        await gcalendar.close()
+        return gcalendar, result
+
+    gcalendar, result = asyncio.run(scenario())
+    assert result is False
+    assert "Not Found" in gcalendar.error
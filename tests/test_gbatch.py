@@ -0,0 +1,107 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from googleapiclient.errors import HttpError
+from batch.gbatch import GBatch
+from quota.gquota import QuotaGuard, RateLimiter
+
+
+def make_http_error(status, reason=None):
+    """Создание HttpError с заданным статусом и причиной."""
+    resp = MagicMock(status=status, reason="error")
+    content = {"error": {"errors": [{"reason": reason}], "message": "error"}}
+    return HttpError(resp, json.dumps(content).encode("utf-8"))
+
+
+def make_request(*outcomes):
+    """Мок-запрос, возвращающий результаты или бросающий ошибки по очереди."""
+    request = MagicMock()
+    request.execute.side_effect = list(outcomes)
+    return request
+
+
+def test_gbatch_chunks_requests(fake_batch):
+    """Тест разбиения запросов на порции заданного размера."""
+    service = MagicMock()
+    batches = []
+
+    def new_batch():
+        batches.append(fake_batch())
+        return batches[-1]
+
+    service.new_batch_http_request.side_effect = new_batch
+
+    batch = GBatch(service, chunk_size=2)
+    for i in range(5):
+        batch.add(make_request({"id": str(i)}), item=i)
+    results = batch.execute()
+
+    assert [len(b.requests) for b in batches] == [2, 2, 1]
+    assert [r.response["id"] for r in results] == ["0", "1", "2", "3", "4"]
+    assert [r.item for r in results] == [0, 1, 2, 3, 4]
+
+
+def test_gbatch_retries_only_failed(fake_batch):
+    """Тест повтора только упавших подзапросов."""
+    service = MagicMock()
+    service.new_batch_http_request.side_effect = lambda: fake_batch()
+
+    ok = make_request({"id": "ok"})
+    flaky = make_request(make_http_error(503), {"id": "flaky"})
+    broken = make_request(make_http_error(404))
+
+    with GBatch(service, quota=QuotaGuard(sleep=lambda delay: None)) as batch:
+        batch.add(ok, item="ok")
+        batch.add(flaky, item="flaky")
+        batch.add(broken, item="broken")
+
+    results = batch.results
+    assert ok.execute.call_count == 1
+    assert flaky.execute.call_count == 2
+    assert broken.execute.call_count == 1
+    assert results[1].ok and results[1].response == {"id": "flaky"}
+    assert not results[2].ok and results[2].item == "broken"
+
+
+def test_gbatch_throttles_once_per_retry_round(fake_batch):
+    """Тест однократного снижения скорости при нескольких ошибках квоты."""
+    service = MagicMock()
+    service.new_batch_http_request.side_effect = lambda: fake_batch()
+    limiter = RateLimiter(project_rate=100.0, sleep=lambda delay: None)
+    quota = QuotaGuard(limiter=limiter, sleep=lambda delay: None)
+
+    with GBatch(service, quota=quota) as batch:
+        for i in range(10):
+            batch.add(make_request(make_http_error(403, "rateLimitExceeded"), {"id": str(i)}))
+
+    assert all(result.ok for result in batch.results)
+    assert limiter.project.rate == 50.0
+    assert quota.metrics.retries == 1
+    assert quota.metrics.throttled == {"rateLimitExceeded": 1}
+
+
+def test_gbatch_parallel_chunks(fake_batch):
+    """Тест параллельной отправки порций с сохранением порядка результатов."""
+    import threading
+    import time
+
+    service = MagicMock()
+    threads = set()
+
+    class SlowBatch(fake_batch):
+        def execute(self, http=None):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.02)
+            super().execute(http)
+
+    service.new_batch_http_request.side_effect = SlowBatch
+
+    batch = GBatch(service, chunk_size=2, quota=QuotaGuard(), workers=3)
+    for i in range(6):
+        batch.add(make_request({"id": str(i)}), item=i)
+    started = time.monotonic()
+    results = batch.execute()
+
+    assert time.monotonic() - started < 0.06
+    assert len(threads) == 3
+    assert [r.response["id"] for r in results] == ["0", "1", "2", "3", "4", "5"]
@@ -0,0 +1,58 @@
+import pytest
+from unittest.mock import MagicMock
+from googleapiclient.errors import HttpError
+from cache.gcache import DiskCache, MemoryCache, ResponseCache
+
+
+def make_request(*outcomes):
+    """Мок-запрос с настоящим словарем заголовков."""
+    request = MagicMock()
+    request.headers = {}
+    request.execute.side_effect = list(outcomes)
+    return request
+
+
+def test_memory_cache_lru():
+    """Тест вытеснения давно не использованных записей."""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})
+    cache.get("a")
+    cache.set("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    """Тест сохранения записей на диск."""
+    cache = DiskCache(str(tmp_path))
+    cache.set("calendars/1", {"etag": '"e1"'})
+
+    assert DiskCache(str(tmp_path)).get("calendars/1") == {"etag": '"e1"'}
+    cache.delete("calendars/1")
+    assert cache.get("calendars/1") is None
+
+
+def test_response_cache_revalidates_with_etag():
+    """Тест условного запроса If-None-Match и ответа 304."""
+    cache = ResponseCache()
+    body = {"id": "cal", "etag": '"e1"', "summary": "Work"}
+    assert cache.fetch("calendars/cal", make_request(body)) == body
+
+    not_modified = HttpError(MagicMock(status=304, reason="Not Modified"), b"")
+    request = make_request(not_modified)
+    assert cache.fetch("calendars/cal", request) == body
+    assert request.headers["If-None-Match"] == '"e1"'
+    assert cache.stats() == {"hits": 0, "misses": 1, "revalidated": 1}
+
+
+def test_response_cache_fresh_hit_skips_request():
+    """Тест ответа из кэша без запроса в пределах max_age."""
+    cache = ResponseCache(max_age=60)
+    cache.store("calendars/cal", {"id": "cal", "etag": '"e1"'})
+    request = make_request()
+
+    assert cache.fetch("calendars/cal", request)["id"] == "cal"
+    request.execute.assert_not_called()
+    assert cache.stats()["hits"] == 1
@@ -39,19 +39,23 @@ def test_gcalendar_select(mock_gcalendar):
 
 def test_gcalendar_edit(mock_gcalendar):
     """Тест редактирования календаря."""
-    mock_gcalendar.service.calendars().get().execute.return_value = {
-        "id": "mocked_calendar_id",
-        "summary": "Test Calendar",
-    }
-    mock_gcalendar.service.calendars().update().execute.return_value = {
+    patch = mock_gcalendar.service.calendars().patch
+    patch.return_value.headers = {}
+    patch.return_value.execute.return_value = {
         "id": "mocked_calendar_id",
         "summary": "Updated Calendar",
     }
 
-    data = {"name": "Updated Calendar", "description": "Updated Description"}
-    result = mock_gcalendar.edit("mocked_calendar_id", data)
+    data = {"name": "Updated Calendar", "timezone": "Europe/Moscow"}
+    result = mock_gcalendar.edit("mocked_calendar_id", data, etag='"c1"')
 
     assert result["summary"] == "Updated Calendar"
+    assert patch.call_args.kwargs["body"] == {
+        "summary": "Updated Calendar",
+        "timeZone": "Europe/Moscow",
+    }
+    assert patch.return_value.headers["If-Match"] == '"c1"'
+    mock_gcalendar.service.calendars().get().execute.assert_not_called()
 
 
 def test_gcalendar_eventlist(mock_gcalendar):
@@ -77,3 +81,158 @@ def test_gcalendar_get(mock_gcalendar):
     result = mock_gcalendar.get("mocked_calendar_id")
 
     assert result["id"] == "mocked_calendar_id"
+
+
+def test_gcalendar_delete_many(mock_gcalendar, fake_batch):
+    """Тест пакетного удаления календарей."""
+    mock_gcalendar.service.new_batch_http_request.side_effect = lambda: fake_batch()
+    mock_gcalendar.service.calendars().delete().execute.return_value = ""
+
+    results = mock_gcalendar.delete_many(["cal_1", "cal_2"])
+
+    assert [r.item for r in results] == ["cal_1", "cal_2"]
+    assert all(r.ok for r in results)
+
+
+def test_gcalendar_iter_events(mock_gcalendar):
+    """Тест постраничного обхода событий."""
+    events_list = mock_gcalendar.service.events().list
+    events_list.return_value.execute.side_effect = [
+        {"items": [{"id": "event_1"}, {"id": "event_2"}], "nextPageToken": "page_2"},
+        {"items": [{"id": "event_3"}]},
+    ]
+
+    data = {"from": "2024-10-01T00:00:00Z"}
+    result = mock_gcalendar.iter_events(
+        "mocked_calendar_id", data, page_size=2, fields="id,summary"
+    )
+
+    assert [event["id"] for event in result] == ["event_1", "event_2", "event_3"]
+    assert events_list.call_args.kwargs["pageToken"] == "page_2"
+    assert events_list.call_args.kwargs["fields"] == "nextPageToken,items(id,summary)"
+
+
+def test_gcalendar_eventlist_fails_on_later_page(mock_gcalendar):
+    """Тест ошибки на второй странице: неполный список не возвращается."""
+    events_list = mock_gcalendar.service.events().list
+    events_list.return_value.execute.side_effect = [
+        {"items": [{"id": "event_1"}], "nextPageToken": "page_2"},
+        RuntimeError("backend error"),
+    ]
+
+    assert mock_gcalendar.eventlist("mocked_calendar_id", {"limit": 10}) == []
+    assert "backend error" in mock_gcalendar.error
+    with pytest.raises(RuntimeError):
+        list(mock_gcalendar.iter_events("mocked_calendar_id", {}))
+
+
+def test_gcalendar_find(mock_gcalendar):
+    """Тест поиска календарей через индекс имен."""
+    from lookup.glookup import NameIndex
+
+    mock_gcalendar.lookup = NameIndex()
+    mock_gcalendar.service.calendarList().list().execute.return_value = {
+        "items": [
+            {"id": "work", "summary": "Work Calendar"},
+            {"id": "home", "summary": "Home Calendar"},
+        ]
+    }
+
+    assert [c["id"] for c in mock_gcalendar.find("Work", match="prefix")] == ["work"]
+    assert mock_gcalendar.select({"name": "Home Calendar"}) == "home"
+
+
+@pytest.fixture
+def emulator_gcalendar():
+    """Фикстура GCalendar, работающего с эмулятором Calendar API."""
+    from emulator.gemulator import CalendarEmulator, EmulatorWorkspace
+    from gcalendar.gcalendar import GCalendar
+    from quota.gquota import QuotaGuard
+    from telemetry.gtelemetry import Telemetry
+
+    with CalendarEmulator() as emulator:
+        quota = QuotaGuard(sleep=lambda s: None, telemetry=Telemetry())
+        gcalendar = GCalendar(
+            EmulatorWorkspace(), factory=emulator.factory(), quota=quota
+        )
+        yield emulator, gcalendar
+
+
+def test_gcalendar_ensure_is_idempotent(emulator_gcalendar):
+    """Тест создания, изменения и удаления календарей по спецификации."""
+    emulator, gcalendar = emulator_gcalendar
+    specs = [
+        {"name": f"Project {n}", "description": "Onboarding", "timezone": "UTC"}
+        for n in range(30)
+    ]
+
+    results = gcalendar.ensure(specs, chunk_size=10)
+
+    assert [r.action for r in results] == ["create"] * 30
+    assert all(r.ok and r.calendar["id"] for r in results)
+
+    specs[0]["description"] = "Archived"
+    specs[1]["state"] = "absent"
+    emulator.calls.clear()
+    results = gcalendar.ensure(specs + [{"name": "Project 30"}], chunk_size=10)
+
+    assert [r.action for r in results[:3]] == ["update", "delete", "unchanged"]
+    assert results[-1].action == "create"
+    assert results[0].calendar["description"] == "Archived"
+    assert emulator.calls["batch"] == 1
+
+    results = gcalendar.ensure(specs + [{"name": "Project 30"}])
+    assert {r.action for r in results} == {"unchanged"}
+    assert len(list(gcalendar.iter_calendars())) == 31
+
+
+def test_gcalendar_ensure_acl_and_prune(emulator_gcalendar):
+    """Тест приведения правил доступа и удаления лишних календарей."""
+    emulator, gcalendar = emulator_gcalendar
+    reader = {"role": "reader", "scope": {"type": "user", "value": "a@example.com"}}
+    writer = {"role": "writer", "scope": {"type": "user", "value": "b@example.com"}}
+    gcalendar.create({"name": "tmp-old"})
+    gcalendar.create({"name": "Personal"})
+
+    results = gcalendar.ensure([{"name": "tmp-team", "acl": [reader, writer]}])
+    assert results[0].acl_changes == 2
+
+    public = {"role": "freeBusyReader", "scope": {"type": "default"}}
+    results = gcalendar.ensure(
+        [{"name": "tmp-team", "acl": [dict(reader, role="writer"), public]}],
+        prune=True,
+        prefix="tmp-",
+    )
+
+    assert [(r.name, r.action) for r in results] == [
+        ("tmp-team", "unchanged"),
+        ("tmp-old", "delete"),
+    ]
+    assert results[0].acl_changes == 3
+    rules = emulator.backend.handle(
+        "GET", f"/calendars/{results[0].calendar['id']}/acl", {}, {}, None
+    )[2]["items"]
+    assert {(r["id"], r["role"]) for r in rules} == {
+        ("user:emulator@example.com", "owner"),
+        ("user:a@example.com", "writer"),
+        ("default", "freeBusyReader"),
+    }
+    names = {c["summary"] for c in gcalendar.iter_calendars()}
+    assert names == {"emulator@example.com", "tmp-team", "Personal"}
+
+
+def test_gcalendar_ensure_absent_missing_calendar_with_acl(emulator_gcalendar):
+    """Тест отсутствующего календаря со state "absent" и списком acl."""
+    emulator, gcalendar = emulator_gcalendar
+    reader = {"role": "reader", "scope": {"type": "user", "value": "a@example.com"}}
+
+    results = gcalendar.ensure(
+        [{"name": "Gone", "state": "absent", "acl": [reader]}, {"name": "Kept"}]
+    )
+
+    assert [(r.name, r.action, r.ok) for r in results] == [
+        ("Gone", "unchanged", True),
+        ("Kept", "create", True),
+    ]
+    assert results[0].calendar is None
+    assert "list_acl" not in emulator.calls
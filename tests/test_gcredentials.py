@@ -0,0 +1,70 @@
+import datetime
+import pytest
+from auth.gcredentials import (
+    BackgroundRefresher,
+    CredentialManager,
+    FileTokenStore,
+)
+
+NOW = datetime.datetime(2024, 10, 25, 9, 0, 0)
+
+
+class FakeCredentials:
+    """Учетные данные, которые обновляются без обращения к сети."""
+
+    def __init__(self, token, expiry):
+        self.token = token
+        self.expiry = expiry
+        self.refresh_calls = 0
+
+    def refresh(self, request):
+        self.refresh_calls += 1
+        self.token = f"fresh-{self.refresh_calls}"
+        self.expiry = NOW + datetime.timedelta(hours=1)
+
+
+def test_credential_manager_refreshes_before_expiry():
+    """Тест обновления токена только в пределах refresh_margin."""
+    creds = FakeCredentials("old", NOW + datetime.timedelta(minutes=20))
+    manager = CredentialManager(creds, refresh_margin=600, clock=lambda: NOW)
+
+    assert manager.due_in() == 600
+    assert manager.refresh_if_needed() is False
+
+    creds.expiry = NOW + datetime.timedelta(minutes=5)
+    assert manager.refresh_if_needed() is True
+    assert creds.token == "fresh-1"
+    assert manager.store.load()["token"] == "fresh-1"
+
+
+def test_credential_manager_adopts_token_from_store(tmp_path):
+    """Тест использования токена, уже обновленного другим процессом."""
+    store = FileTokenStore(str(tmp_path / "creds.json"))
+    expiry = NOW + datetime.timedelta(minutes=50)
+    store.save({"token": "shared", "expiry": expiry.isoformat() + "Z"})
+    creds = FakeCredentials("old", NOW + datetime.timedelta(minutes=1))
+    manager = CredentialManager(creds, store=store, clock=lambda: NOW)
+
+    assert manager.refresh_if_needed() is False
+    assert creds.token == "shared"
+    assert creds.expiry == expiry
+    assert creds.refresh_calls == 0
+
+
+def test_background_refresher_run_once():
+    """Тест обхода менеджеров фоновым обновлением."""
+    expiring = FakeCredentials("a", NOW + datetime.timedelta(minutes=1))
+    fresh = FakeCredentials("b", NOW + datetime.timedelta(minutes=30))
+    refresher = BackgroundRefresher(
+        [
+            CredentialManager(expiring, clock=lambda: NOW),
+            CredentialManager(fresh, clock=lambda: NOW),
+        ],
+        max_wait=3600,
+    )
+
+    wait = refresher.run_once()
+
+    assert expiring.refresh_calls == 1
+    assert fresh.refresh_calls == 0
+    assert wait == 20 * 60
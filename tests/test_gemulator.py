@@ -0,0 +1,144 @@
+import time
+
+import pytest
+
+from benchmarks import bench_api
+from emulator.gemulator import CalendarEmulator, EmulatorWorkspace, Faults, seed_events
+from event.gevent import GEvent
+from gcalendar.gcalendar import GCalendar
+from quota.gquota import QuotaGuard, RetryPolicy
+from sync.gsync import EventStore, GSync
+from telemetry.gtelemetry import RETRIES, Telemetry
+
+
+@pytest.fixture
+def emulator():
+    """Фикстура с запущенным эмулятором Calendar API."""
+    with CalendarEmulator() as emulator:
+        yield emulator
+
+
+@pytest.fixture
+def gcalendar(emulator):
+    """Фикстура GCalendar, работающего с эмулятором без задержек повторов."""
+    quota = QuotaGuard(
+        policy=RetryPolicy(max_retries=2), sleep=lambda s: None, telemetry=Telemetry()
+    )
+    return GCalendar(EmulatorWorkspace(), factory=emulator.factory(), quota=quota)
+
+
+def event_data(number):
+    return {
+        "name": f"Event {number}",
+        "start_time": f"2024-05-01T{number % 24:02d}:00:00+00:00",
+        "end_time": f"2024-05-01T{number % 24:02d}:30:00+00:00",
+    }
+
+
+def test_calendar_and_event_lifecycle(gcalendar):
+    """Тест создания, выбора, изменения и удаления через HTTP."""
+    calendar = gcalendar.create({"name": "Work", "timezone": "UTC"})
+    assert gcalendar.select({"name": "Work"}) == calendar["id"]
+    assert gcalendar.edit(calendar["id"], {"name": "Office"})["summary"] == "Office"
+
+    gevent = GEvent(gcalendar)
+    event = gevent.create(calendar["id"], event_data(9))
+    edited = gevent.edit(calendar["id"], event["id"], {"name": "Standup"})
+    assert edited["summary"] == "Standup"
+    assert edited["etag"] != event["etag"]
+    assert gevent.get(calendar["id"], event["id"])["summary"] == "Standup"
+
+    assert gevent.delete(calendar["id"], event["id"]) is True
+    assert gcalendar.eventlist(calendar["id"], {}) == []
+    assert gcalendar.delete(calendar["id"]) is True
+    assert gcalendar.get(calendar["id"]) is False
+    assert "404" in gcalendar.error
+
+
+def test_stale_etag_is_rejected(emulator, gcalendar):
+    """Тест If-Match: изменение по устаревшему ETag отклоняется с 412."""
+    gevent = GEvent(gcalendar)
+    event = gevent.create("primary", event_data(1))
+    gevent.edit("primary", event["id"], {"name": "Changed"})
+
+    assert (
+        gevent.edit("primary", event["id"], {"name": "Lost"}, etag=event["etag"])
+        is False
+    )
+    assert "412" in gevent.error
+
+
+def test_pagination_and_incremental_sync(emulator, gcalendar):
+    """Тест постраничного списка и инкрементальной синхронизации по syncToken."""
+    calendar_id = gcalendar.create({"name": "Sync"})["id"]
+    ids = seed_events(emulator.backend, calendar_id, 25)
+    events = list(gcalendar.iter_events(calendar_id, {}, page_size=10))
+    assert [event["id"] for event in events] == ids
+    assert emulator.calls["list_events"] == 3
+
+    store = EventStore()
+    gsync = GSync(gcalendar, store, page_size=10)
+    assert gsync.sync(calendar_id)["upserted"] == 25
+    GEvent(gcalendar).delete(calendar_id, ids[0])
+    assert gsync.sync(calendar_id) == {"upserted": 0, "deleted": 1, "full": False}
+
+    # Просроченный токен приводит к полной синхронизации
+    emulator.backend.expire_sync_tokens()
+    assert gsync.sync(calendar_id)["full"] is True
+    assert store.count(calendar_id) == 24
+
+
+def test_batch_requests(emulator, gcalendar):
+    """Тест multipart batch: одна HTTP-отправка на порцию подзапросов."""
+    gevent = GEvent(gcalendar)
+    results = gevent.create_many("primary", (event_data(n) for n in range(60)))
+    assert all(result.ok for result in results)
+    assert emulator.backend.event_count(emulator.backend.owner) == 60
+
+    deleted = gevent.delete_many("primary", [r.response["id"] for r in results[:5]])
+    assert all(result.ok for result in deleted)
+    assert emulator.backend.event_count(emulator.backend.owner) == 55
+    # 60 вставок уходят двумя порциями по 50, удаления — одной
+    assert emulator.calls["batch"] == 3
+    assert emulator.calls["insert_event"] == 60
+
+
+def test_injected_quota_errors_are_retried(emulator, gcalendar):
+    """Тест ошибок квоты: повтор после 403 rateLimitExceeded и отказ после лимита."""
+    emulator.faults = Faults(error_rate=1.0)
+    gevent = GEvent(gcalendar)
+    assert gevent.create("primary", event_data(1)) is False
+    assert "rateLimitExceeded" in gevent.error
+    assert gcalendar.quota.telemetry.value(RETRIES, reason="rateLimitExceeded") == 2
+
+    emulator.faults = Faults(error_rate=0.2, seed=1)
+    for number in range(10):
+        assert gevent.create("primary", event_data(number))
+
+
+def test_injected_latency(emulator, gcalendar):
+    """Тест внедренной задержки ответа."""
+    emulator.faults = Faults(latency=0.05)
+    started = time.perf_counter()
+    gcalendar.get("primary")
+    assert time.perf_counter() - started >= 0.05
+
+
+def test_benchmark_suite(emulator):
+    """Тест сценариев бенчмарка и сравнения с базовыми результатами."""
+    results = bench_api.run(emulator, rounds=3, events=20)
+    assert set(results) == {
+        "create",
+        "edit",
+        "list",
+        "select_event",
+        "select_calendar",
+        "create_many",
+    }
+    assert results["list"]["throughput"] > 0
+
+    slower = {
+        name: dict(stats, p95_ms=stats["p95_ms"] * 2) for name, stats in results.items()
+    }
+    assert bench_api.compare(results, results, tolerance=0.2) == []
+    assert bench_api.compare(slower, results, tolerance=0.2)
@@ -1,5 +1,12 @@
 import pytest
 
+from emulator.gemulator import CalendarEmulator, EmulatorWorkspace
+from event.gevent import GEvent, event_body, event_query
+from gcalendar.gcalendar import GCalendar
+from quota.gquota import QuotaGuard
+from telemetry.gtelemetry import Telemetry
+
+
 def test_gevent_create(mock_gevent):
     """Тест создания события."""
     mock_gevent.service.events().insert().execute.return_value = {"id": "mocked_event_id"}
@@ -38,10 +45,270 @@ def test_gevent_select(mock_gevent):
 
 def test_gevent_edit(mock_gevent):
     """Тест редактирования события."""
-    mock_gevent.service.events().get().execute.return_value = {"id": "mocked_event_id", "summary": "Test Event"}
-    mock_gevent.service.events().update().execute.return_value = {"id": "mocked_event_id", "summary": "Updated Event"}
+    mock_gevent.service.events().patch().execute.return_value = {"id": "mocked_event_id", "summary": "Updated Event"}
 
     event_data = {"name": "Updated Event", "description": "Updated Description"}
     result = mock_gevent.edit("mocked_calendar_id", "mocked_event_id", event_data)
 
     assert result["summary"] == "Updated Event"
+    assert mock_gevent.service.events().patch.call_args.kwargs["body"] == {
+        "summary": "Updated Event",
+        "description": "Updated Description",
+    }
+    mock_gevent.service.events().get().execute.assert_not_called()
+
+
+def test_gevent_create_many(mock_gevent, fake_batch):
+    """Тест пакетного создания событий."""
+    mock_gevent.service.new_batch_http_request.side_effect = lambda: fake_batch()
+    mock_gevent.service.events().insert().execute.side_effect = [
+        {"id": "event_1"},
+        Exception("quota"),
+    ]
+
+    events = [{"name": "First"}, {"name": "Second"}]
+    results = mock_gevent.create_many("mocked_calendar_id", events)
+
+    assert results[0].response == {"id": "event_1"}
+    assert not results[1].ok and results[1].item == {"name": "Second"}
+    assert mock_gevent.error is not None
+
+
+def test_gevent_select_uses_lookup(mock_gevent):
+    """Тест выбора события через индекс без повторных запросов списка."""
+    from lookup.glookup import NameIndex
+
+    mock_gevent.lookup = NameIndex()
+    mock_gevent.service.events().list().execute.return_value = {
+        "items": [{"id": "mocked_event_id", "summary": "Test Event"}]
+    }
+    mock_gevent.service.events().insert().execute.return_value = {
+        "id": "new_event_id",
+        "summary": "New Event",
+    }
+    mock_gevent.service.events().list.reset_mock()
+
+    assert mock_gevent.select("mocked_calendar_id", {"name": "Test"}) == "mocked_event_id"
+    mock_gevent.create("mocked_calendar_id", {"name": "New Event"})
+    assert mock_gevent.select("mocked_calendar_id", {"name": "New"}) == "new_event_id"
+    assert mock_gevent.service.events().list.call_count == 1
+
+
+def test_gevent_edit_uses_cache_and_if_match(mock_gevent):
+    """Тест редактирования по закэшированной копии с заголовком If-Match."""
+    from cache.gcache import ResponseCache
+
+    mock_gevent.cache = ResponseCache(max_age=60)
+    mock_gevent.cache.store(
+        "events/mocked_calendar_id/mocked_event_id",
+        {"id": "mocked_event_id", "summary": "Test Event", "etag": '"e1"'},
+    )
+    update_request = mock_gevent.service.events().patch.return_value
+    update_request.headers = {}
+    update_request.execute.return_value = {
+        "id": "mocked_event_id",
+        "summary": "Updated Event",
+        "etag": '"e2"',
+    }
+
+    result = mock_gevent.edit(
+        "mocked_calendar_id", "mocked_event_id", {"name": "Updated Event"}
+    )
+
+    assert result["summary"] == "Updated Event"
+    assert update_request.headers["If-Match"] == '"e1"'
+    mock_gevent.service.events().get().execute.assert_not_called()
+    assert mock_gevent.get("mocked_calendar_id", "mocked_event_id")["etag"] == '"e2"'
+
+
+def test_event_patch_diffs_against_current():
+    """Тест вычисления минимального PATCH по текущей версии события."""
+    from event.gevent import event_patch
+
+    current = {
+        "summary": "Standup",
+        "start": {"dateTime": "2024-10-25T09:00:00+03:00", "timeZone": "Europe/Moscow"},
+        "end": {"dateTime": "2024-10-25T09:15:00+03:00", "timeZone": "Europe/Moscow"},
+        "reminders": {"useDefault": False, "overrides": [{"method": "popup", "minutes": 10}]},
+    }
+    event_data = {
+        "name": "Standup",
+        "end_time": "2024-10-25T09:30:00+03:00",
+        "alarm": [{"type": "popup", "time": "10"}],
+    }
+
+    assert event_patch(event_data, current) == {
+        "end": {"dateTime": "2024-10-25T09:30:00+03:00", "timeZone": "Europe/Moscow"}
+    }
+    assert event_patch({"start_date": "2024-11-04"}) == {
+        "start": {"date": "2024-11-04", "dateTime": None, "timeZone": None},
+        "end": {"date": "2024-11-05", "dateTime": None, "timeZone": None},
+    }
+
+
+def test_gevent_edit_skips_unchanged(mock_gevent):
+    """Тест пропуска запроса, если поля не изменились и копия подтверждена 304."""
+    from unittest.mock import MagicMock
+    from cache.gcache import ResponseCache
+    from googleapiclient.errors import HttpError
+
+    mock_gevent.cache = ResponseCache()
+    cached = {"id": "mocked_event_id", "summary": "Same", "etag": '"e1"'}
+    mock_gevent.cache.store("events/mocked_calendar_id/mocked_event_id", cached)
+    get_request = mock_gevent.service.events().get.return_value
+    get_request.headers = {}
+    get_request.execute.side_effect = HttpError(MagicMock(status=304), b"")
+
+    result = mock_gevent.edit("mocked_calendar_id", "mocked_event_id", {"name": "Same"})
+
+    assert result == cached
+    assert get_request.headers["If-None-Match"] == '"e1"'
+    mock_gevent.service.events().patch().execute.assert_not_called()
+
+
+@pytest.fixture
+def emulator_gevent():
+    """Фикстура GEvent и GCalendar, работающих с эмулятором."""
+    with CalendarEmulator() as emulator:
+        quota = QuotaGuard(sleep=lambda s: None, telemetry=Telemetry())
+        gcalendar = GCalendar(
+            EmulatorWorkspace(), factory=emulator.factory(), quota=quota
+        )
+        yield emulator, gcalendar, GEvent(gcalendar)
+
+
+def planned(name, day, **fields):
+    return {
+        "name": name,
+        "start_time": f"2024-05-{day:02d}T09:00:00+00:00",
+        "end_time": f"2024-05-{day:02d}T10:00:00+00:00",
+        **fields,
+    }
+
+
+def test_event_query_maps_filters():
+    """Тест преобразования фильтров в параметры events().list."""
+    assert event_query({}) == {}
+    assert event_query(
+        {
+            "text": "review",
+            "updated_min": "2024-05-01T00:00:00Z",
+            "ical_uid": "uid@example.com",
+            "properties": {"service": "billing", "order": 42},
+            "show_deleted": True,
+        }
+    ) == {
+        "q": "review",
+        "updatedMin": "2024-05-01T00:00:00Z",
+        "iCalUID": "uid@example.com",
+        "privateExtendedProperty": ["service=billing", "order=42"],
+        "showDeleted": True,
+    }
+    body = event_body(planned("Invoice", 1, properties={"order": 42}))
+    assert body["extendedProperties"] == {"private": {"order": "42"}}
+
+
+def test_event_body_all_day_end_is_exclusive():
+    """Тест конца события на весь день: следующий день, если не задан."""
+    assert event_body({"start_date": "2024-12-31"})["end"] == {"date": "2025-01-01"}
+    assert event_body({"start_date": "2024-11-04", "end_date": ""})["end"] == {
+        "date": "2024-11-05"
+    }
+    assert event_body({"start_date": "2024-11-04", "end_date": "2024-11-08"})[
+        "end"
+    ] == {"date": "2024-11-08"}
+
+
+def test_edit_with_stale_cache_is_sent(emulator_gevent):
+    """Тест правки, совпадающей с устаревшей копией в кэше: запрос отправляется."""
+    from cache.gcache import ResponseCache
+
+    emulator, gcalendar, _ = emulator_gevent
+    gcalendar.cache = ResponseCache(max_age=60)
+    gevent = GEvent(gcalendar)
+    other = GEvent(gcalendar)
+    other.cache = None
+    event = gevent.create("primary", planned("Standup", 1))
+    other.edit("primary", event["id"], {"name": "Retro"})
+
+    edited = gevent.edit("primary", event["id"], {"name": "Standup"})
+
+    assert edited["summary"] == "Standup"
+    assert emulator.calls["patch_event"] == 2
+    assert gevent.edit("primary", event["id"], {"name": "Standup"}) == edited
+    assert emulator.calls["patch_event"] == 2
+
+
+def test_select_finds_substring_of_a_word(emulator_gevent):
+    """Тест выбора по части слова, которую не находит q сервера."""
+    emulator, gcalendar, gevent = emulator_gevent
+    event = gevent.create("primary", planned("Team Meeting", 1))
+    emulator.calls.clear()
+
+    assert gevent.search("primary", {"text": "Meet"}) == []
+    assert gevent.select("primary", {"name": "Team"}) == event["id"]
+    assert emulator.calls["list_events"] == 2
+    assert gevent.select("primary", {"name": "Meet"}) == event["id"]
+    assert emulator.calls["list_events"] == 4
+    assert gevent.select("primary", {"name": "Retro"}) is False
+
+
+def test_find_by_properties_sends_one_request(emulator_gevent):
+    """Тест поиска событий по приватным свойствам одним запросом."""
+    emulator, gcalendar, gevent = emulator_gevent
+    for n in range(5):
+        gevent.create(
+            "primary",
+            planned(f"Order {n}", n + 1, properties={"service": "billing", "order": n}),
+        )
+    gevent.create("primary", planned("Lunch", 6))
+    emulator.calls.clear()
+
+    events = gevent.find_by_properties(
+        "primary", {"service": "billing", "order": 3}, fields="id,summary"
+    )
+
+    assert [event["summary"] for event in events] == ["Order 3"]
+    assert emulator.calls == {"list_events": 1}
+    assert len(gevent.find_by_properties("primary", {"service": "billing"})) == 5
+
+    gevent.edit("primary", events[0]["id"], {"properties": {"service": "archive"}})
+    assert (
+        gevent.find_by_properties("primary", {"service": "archive", "order": 3})[0][
+            "id"
+        ]
+        == events[0]["id"]
+    )
+
+
+def test_search_filters_on_server_across_pages(emulator_gevent):
+    """Тест серверной фильтрации с обходом страниц в GEvent и GCalendar."""
+    emulator, gcalendar, gevent = emulator_gevent
+    created = [
+        gevent.create(
+            "primary", planned(f"Sprint review {n}" if n % 2 else f"Standup {n}", n + 1)
+        )
+        for n in range(8)
+    ]
+    gevent.delete("primary", created[1]["id"])
+    emulator.calls.clear()
+
+    found = gcalendar.eventlist("primary", {"text": "review", "limit": 10})
+    assert [event["summary"] for event in found] == [
+        "Sprint review 3",
+        "Sprint review 5",
+        "Sprint review 7",
+    ]
+    assert gevent.select("primary", {"name": "review 7"}) == created[7]["id"]
+
+    paged = list(gcalendar.iter_events("primary", {"text": "standup"}, page_size=2))
+    assert len(paged) == 4
+    assert emulator.calls["list_events"] == 1 + 1 + 2
+
+    deleted = gevent.search("primary", {"text": "review", "show_deleted": True})
+    assert len(deleted) == 4
+    assert (
+        gevent.search("primary", {"ical_uid": created[0]["iCalUID"]})[0]["id"]
+        == created[0]["id"]
+    )
+    assert gevent.search("primary", {"updated_min": "2999-01-01T00:00:00Z"}) == []
@@ -0,0 +1,204 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from exporter.gexport import ExportCheckpoint, GExport, event_ics
+
+
+def fake_list(pages, fail_tokens=()):
+    """Поддельный events().list: страницы событий по календарям и токенам."""
+    calls = []
+
+    def events_list(calendarId, maxResults, pageToken=None, **params):
+        calls.append((calendarId, pageToken))
+        request = MagicMock()
+        if (calendarId, pageToken) in fail_tokens:
+            request.execute.side_effect = Exception("connection reset")
+        else:
+            request.execute.return_value = pages[(calendarId, pageToken)]
+        return request
+
+    return events_list, calls
+
+
+PAGES = {
+    ("cal_1", None): {"items": [{"id": "a1"}], "nextPageToken": "p2"},
+    ("cal_1", "p2"): {"items": [{"id": "a2"}, {"id": "a3"}]},
+    ("cal_2", None): {"items": [{"id": "b1"}]},
+}
+
+
+def test_gexport_writes_calendars_and_events(mock_gcalendar, tmp_path):
+    """Тест экспорта всех календарей из calendarList в JSONL."""
+    events_list, _ = fake_list(PAGES)
+    mock_gcalendar.service.events().list.side_effect = events_list
+    mock_gcalendar.service.calendarList().list().execute.side_effect = [
+        {"items": [{"id": "cal_1"}], "nextPageToken": "c2"},
+        {"items": [{"id": "cal_2"}]},
+    ]
+
+    stats = GExport(mock_gcalendar, str(tmp_path), workers=2).run()
+
+    assert stats == {"calendars": 2, "events": 4, "resumed": 0, "failed": []}
+    calendars = (tmp_path / "calendars.jsonl").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in calendars] == ["cal_1", "cal_2"]
+    lines = (tmp_path / "cal_1.jsonl").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["a1", "a2", "a3"]
+
+
+def test_gexport_resumes_from_last_page(mock_gcalendar, tmp_path):
+    """Тест продолжения экспорта с последней сохраненной страницы."""
+    events_list, calls = fake_list(PAGES, fail_tokens={("cal_1", "p2")})
+    mock_gcalendar.service.events().list.side_effect = events_list
+
+    stats = GExport(mock_gcalendar, str(tmp_path)).run(["cal_1", "cal_2"])
+
+    assert stats["failed"] == ["cal_1"]
+    events_list, calls = fake_list(PAGES)
+    mock_gcalendar.service.events().list.side_effect = events_list
+    stats = GExport(mock_gcalendar, str(tmp_path)).run(["cal_1", "cal_2"])
+
+    assert stats == {"calendars": 2, "events": 4, "resumed": 1, "failed": []}
+    # cal_2 уже выгружен, cal_1 продолжен со второй страницы
+    assert calls == [("cal_1", "p2")]
+    lines = (tmp_path / "cal_1.jsonl").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["a1", "a2", "a3"]
+
+
+def test_gexport_rerun_after_complete_export(mock_gcalendar, tmp_path):
+    """Тест повторного экспорта в тот же каталог после завершенного."""
+    for _ in range(2):
+        events_list, calls = fake_list(PAGES)
+        mock_gcalendar.service.events().list.side_effect = events_list
+        stats = GExport(mock_gcalendar, str(tmp_path)).run(["cal_1", "cal_2"])
+
+        assert stats == {"calendars": 2, "events": 4, "resumed": 0, "failed": []}
+        assert len(calls) == 3
+        assert set(calls) == {("cal_1", None), ("cal_1", "p2"), ("cal_2", None)}
+    lines = (tmp_path / "cal_1.jsonl").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["a1", "a2", "a3"]
+
+
+def test_checkpoint_keeps_progress_per_format():
+    """Тест прогресса одного календаря в двух форматах."""
+    checkpoint = ExportCheckpoint()
+    jsonl = {"page_token": "p2", "offset": 10, "events": 1, "done": False}
+    ics = {"page_token": None, "offset": 99, "events": 3, "done": True}
+    checkpoint.save("cal_1", "jsonl", jsonl)
+    checkpoint.save("cal_1", "ics", ics)
+
+    assert checkpoint.get("cal_1", "jsonl") == jsonl
+    assert checkpoint.get("cal_1", "ics") == ics
+    checkpoint.close()
+
+
+def test_checkpoint_replaces_old_schema(tmp_path):
+    """Тест файла прогресса со старым ключом только по календарю."""
+    import sqlite3
+
+    path = str(tmp_path / "checkpoint.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE calendars (calendar_id TEXT PRIMARY KEY, format TEXT NOT NULL,"
+        " page_token TEXT, offset INTEGER NOT NULL, events INTEGER NOT NULL,"
+        " done INTEGER NOT NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    checkpoint = ExportCheckpoint(path)
+    checkpoint.save(
+        "cal_1", "jsonl", {"page_token": None, "offset": 1, "events": 1, "done": True}
+    )
+    checkpoint.save(
+        "cal_1", "ics", {"page_token": None, "offset": 2, "events": 1, "done": True}
+    )
+
+    assert checkpoint.get("cal_1", "jsonl")["offset"] == 1
+    checkpoint.close()
+
+
+def test_gexport_ics(mock_gcalendar, tmp_path):
+    """Тест экспорта в iCalendar."""
+    pages = {
+        ("cal", None): {
+            "items": [
+                {
+                    "id": "e1",
+                    "iCalUID": "e1@google.com",
+                    "summary": "Sync, weekly",
+                    "start": {"dateTime": "2024-10-25T09:00:00+03:00"},
+                    "end": {"dateTime": "2024-10-25T10:00:00+03:00"},
+                    "recurrence": ["RRULE:FREQ=WEEKLY"],
+                    "reminders": {"overrides": [{"method": "popup", "minutes": 10}]},
+                }
+            ]
+        }
+    }
+    events_list, _ = fake_list(pages)
+    mock_gcalendar.service.events().list.side_effect = events_list
+
+    assert GExport(mock_gcalendar, str(tmp_path), fmt="ics").run(["cal"])
+
+    content = (tmp_path / "cal.ics").read_text()
+    assert content.startswith("BEGIN:VCALENDAR\n")
+    assert content.endswith("END:VCALENDAR\n")
+    assert "UID:e1@google.com" in content
+    assert "DTSTART:20241025T060000Z" in content
+    assert "SUMMARY:Sync\\, weekly" in content
+    assert "RRULE:FREQ=WEEKLY" in content
+    assert "TRIGGER:-PT10M" in content
+
+
+def test_event_ics_exception_instances():
+    """Тест измененного и отмененного экземпляров серии с RECURRENCE-ID."""
+    moved = event_ics(
+        {
+            "id": "e1_20241101T060000Z",
+            "iCalUID": "e1@google.com",
+            "recurringEventId": "e1",
+            "originalStartTime": {"dateTime": "2024-11-01T09:00:00+03:00"},
+            "start": {"dateTime": "2024-11-01T11:00:00+03:00"},
+            "end": {"dateTime": "2024-11-01T12:00:00+03:00"},
+            "summary": "Sync, moved",
+        }
+    )
+    cancelled = event_ics(
+        {
+            "id": "e1_20241108T060000Z",
+            "recurringEventId": "e1",
+            "originalStartTime": {"dateTime": "2024-11-08T09:00:00+03:00"},
+            "status": "cancelled",
+        }
+    ).split("\r\n")
+
+    assert "UID:e1@google.com\r\n" in moved
+    assert "RECURRENCE-ID:20241101T060000Z\r\n" in moved
+    assert "DTSTART:20241101T080000Z\r\n" in moved
+    assert cancelled[1:5] == [
+        "UID:e1",
+        "RECURRENCE-ID:20241108T060000Z",
+        "DTSTART:20241108T060000Z",
+        "STATUS:CANCELLED",
+    ]
+
+
+def test_event_ics_folds_long_lines():
+    """Тест переноса длинных строк iCalendar."""
+    content = event_ics({"id": "e1", "description": "ж" * 100})
+
+    assert all(len(line.encode()) <= 75 for line in content.split("\r\n"))
+    assert "\r\n " in content
+
+
+def test_gexport_parquet(mock_gcalendar, tmp_path):
+    """Тест колоночного экспорта в Parquet."""
+    parquet = pytest.importorskip("pyarrow.parquet")
+    events_list, _ = fake_list(PAGES)
+    mock_gcalendar.service.events().list.side_effect = events_list
+
+    assert GExport(mock_gcalendar, str(tmp_path), fmt="parquet").run(["cal_1"])
+
+    table = parquet.read_table(str(tmp_path / "cal_1.parquet"))
+    assert table.column("id").to_pylist() == ["a1", "a2", "a3"]
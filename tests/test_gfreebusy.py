@@ -0,0 +1,122 @@
+import datetime
+
+from freebusy.gfreebusy import BusyIndex, GFreeBusy, to_timestamp
+
+DAY = "2024-10-25T"
+
+
+def at(hour: int, minute: int = 0) -> str:
+    return f"{DAY}{hour:02d}:{minute:02d}:00Z"
+
+
+def test_busy_index_merges_and_detects_conflicts():
+    """Тест объединения интервалов и проверки конфликтов."""
+    index = BusyIndex()
+    index.load_events(
+        "alice",
+        [
+            {"start": {"dateTime": at(9)}, "end": {"dateTime": at(10)}},
+            {"start": {"dateTime": at(9, 30)}, "end": {"dateTime": at(11)}},
+            {"start": {"dateTime": at(13)}, "end": {"dateTime": at(14)}},
+            {
+                "start": {"dateTime": at(15)},
+                "end": {"dateTime": at(16)},
+                "transparency": "transparent",
+            },
+        ],
+    )
+    index.add("alice", at(14), at(14, 30))
+
+    assert index.busy("alice", at(0), at(23)) == [
+        (to_timestamp(at(9)), to_timestamp(at(11))),
+        (to_timestamp(at(13)), to_timestamp(at(14, 30))),
+    ]
+    assert index.conflicts("alice", at(10, 30), at(12))
+    assert not index.conflicts("alice", at(11), at(13))
+    assert not index.conflicts("alice", at(15), at(16))
+    assert index.conflicts_many(["alice", "bob"], at(14), at(15)) == ["alice"]
+
+
+def test_busy_index_first_free_slot():
+    """Тест поиска первого общего свободного окна."""
+    index = BusyIndex()
+    index.set("alice", [(to_timestamp(at(9)), to_timestamp(at(10)))])
+    index.set(
+        "bob",
+        [
+            (to_timestamp(at(9, 30)), to_timestamp(at(10, 30))),
+            (to_timestamp(at(11)), to_timestamp(at(12))),
+        ],
+    )
+
+    slot = index.first_free_slot(["alice", "bob"], 3600, at(9), at(18))
+    short = index.first_free_slot(["alice", "bob"], 1800, at(9), at(18))
+
+    utc = datetime.timezone.utc
+    assert slot == (
+        datetime.datetime(2024, 10, 25, 12, tzinfo=utc),
+        datetime.datetime(2024, 10, 25, 13, tzinfo=utc),
+    )
+    assert short[0] == datetime.datetime(2024, 10, 25, 10, 30, tzinfo=utc)
+    assert index.first_free_slot(["alice", "bob"], 3600, at(9), at(12, 30)) is None
+
+
+def test_gfreebusy_query_chunks_calendars(mock_gcalendar):
+    """Тест разбиения запроса freebusy на порции календарей."""
+    query = mock_gcalendar.service.freebusy().query
+    query.return_value.execute.side_effect = [
+        {"calendars": {"a": {"busy": [{"start": at(9), "end": at(10)}]}, "b": {}}},
+        {"calendars": {"c": {"errors": [{"reason": "notFound"}]}}},
+    ]
+    freebusy = GFreeBusy(mock_gcalendar, chunk_size=2, workers=1)
+
+    busy = freebusy.query(["a", "b", "c"], at(0), at(23))
+
+    assert busy == {"a": [(to_timestamp(at(9)), to_timestamp(at(10)))], "b": []}
+    assert [len(c.kwargs["body"]["items"]) for c in query.call_args_list[-2:]] == [2, 1]
+    assert "c: notFound" in freebusy.error
+    assert freebusy.index.conflicts("a", at(9, 30), at(9, 45))
+
+
+def test_busy_index_expands_recurring_series():
+    """Тест занятости еженедельной серии с перенесенным и отмененным экземплярами."""
+    from sync.gsync import EventStore
+
+    store = EventStore()
+    store.apply(
+        "alice",
+        [
+            {
+                "id": "standup",
+                "start": {"dateTime": "2024-10-07T09:00:00Z", "timeZone": "UTC"},
+                "end": {"dateTime": "2024-10-07T10:00:00Z", "timeZone": "UTC"},
+                "recurrence": ["RRULE:FREQ=WEEKLY"],
+            },
+            {
+                "id": "standup_20241021T090000Z",
+                "recurringEventId": "standup",
+                "originalStartTime": {"dateTime": "2024-10-21T09:00:00Z"},
+                "start": {"dateTime": "2024-10-21T13:00:00Z"},
+                "end": {"dateTime": "2024-10-21T14:00:00Z"},
+            },
+            {
+                "id": "standup_20241028T090000Z",
+                "recurringEventId": "standup",
+                "originalStartTime": {"dateTime": "2024-10-28T09:00:00Z"},
+                "status": "cancelled",
+            },
+        ],
+    )
+    index = BusyIndex()
+    index.load_store(store, "alice", time_max="2024-12-01T00:00:00Z")
+
+    assert index.conflicts("alice", "2024-10-14T09:30:00Z", "2024-10-14T09:45:00Z")
+    assert not index.conflicts("alice", "2024-10-21T09:30:00Z", "2024-10-21T09:45:00Z")
+    assert index.conflicts("alice", "2024-10-21T13:30:00Z", "2024-10-21T13:45:00Z")
+    assert not index.conflicts("alice", "2024-10-28T09:30:00Z", "2024-10-28T09:45:00Z")
+    assert index.conflicts("alice", "2024-11-25T09:30:00Z", "2024-11-25T09:45:00Z")
+    start, _ = index.first_free_slot(
+        ["alice"], 3600, "2024-11-11T09:00:00Z", "2024-11-11T12:00:00Z"
+    )
+    assert start.isoformat() == "2024-11-11T10:00:00+00:00"
+    assert store.count("alice") == 2
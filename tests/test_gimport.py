@@ -0,0 +1,170 @@
+import json
+from unittest.mock import MagicMock
+
+from importer.gimport import GImport, read_csv, read_ics
+
+
+def fake_insert(fail_names=()):
+    """Поддельный events().insert, запоминающий тела созданных событий."""
+    created = []
+
+    def insert(calendarId, body):
+        request = MagicMock()
+
+        def execute():
+            if body.get("summary") in fail_names:
+                raise Exception("quota")
+            created.append(body)
+            return {"id": f"event_{len(created)}", **body}
+
+        request.execute.side_effect = execute
+        return request
+
+    return insert, created
+
+
+def test_read_csv(tmp_path):
+    """Тест чтения CSV с напоминаниями."""
+    path = tmp_path / "events.csv"
+    path.write_text(
+        "name,start_time,end_time,alarm,ical_uid\n"
+        "Standup,2024-10-25T09:00:00+03:00,2024-10-25T09:15:00+03:00,popup:10;email:30,uid-1\n"
+    )
+
+    events = list(read_csv(str(path)))
+
+    assert events == [
+        {
+            "name": "Standup",
+            "start_time": "2024-10-25T09:00:00+03:00",
+            "end_time": "2024-10-25T09:15:00+03:00",
+            "alarm": [{"type": "popup", "time": "10"}, {"type": "email", "time": "30"}],
+            "ical_uid": "uid-1",
+        }
+    ]
+
+
+def test_read_ics(tmp_path):
+    """Тест чтения iCalendar: перенос строк, TZID, события на весь день."""
+    path = tmp_path / "events.ics"
+    path.write_text(
+        "BEGIN:VCALENDAR\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:uid-1\r\n"
+        "SUMMARY:Team\r\n"
+        "  Meeting\r\n"
+        "DESCRIPTION:Line one\\nLine two\\, done\r\n"
+        "DTSTART;TZID=Europe/Moscow:20241025T090000\r\n"
+        "DTEND;TZID=Europe/Moscow:20241025T100000\r\n"
+        "BEGIN:VALARM\r\n"
+        "ACTION:DISPLAY\r\n"
+        "TRIGGER:-PT15M\r\n"
+        "END:VALARM\r\n"
+        "END:VEVENT\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:uid-2\r\n"
+        "SUMMARY:Holiday\r\n"
+        "DTSTART;VALUE=DATE:20241104\r\n"
+        "DTEND;VALUE=DATE:20241105\r\n"
+        "END:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+
+    first, second = read_ics(str(path))
+
+    assert first == {
+        "ical_uid": "uid-1",
+        "name": "Team Meeting",
+        "description": "Line one\nLine two, done",
+        "start_time": "2024-10-25T09:00:00",
+        "end_time": "2024-10-25T10:00:00",
+        "timezone": "Europe/Moscow",
+        "alarm": [{"type": "popup", "time": 15}],
+    }
+    assert second == {
+        "ical_uid": "uid-2",
+        "name": "Holiday",
+        "start_date": "2024-11-04",
+        "end_date": "2024-11-05",
+    }
+
+
+def test_gimport_dedupes_and_reports_failures(mock_gcalendar, fake_batch, tmp_path):
+    """Тест импорта: дубликаты iCalUID пропускаются, ошибки пишутся в файл."""
+    insert, created = fake_insert(fail_names={"Broken"})
+    mock_gcalendar.service.new_batch_http_request.side_effect = lambda: fake_batch()
+    mock_gcalendar.service.events().insert.side_effect = insert
+    path = tmp_path / "events.jsonl"
+    records = [
+        {"name": "First", "ical_uid": "uid-1"},
+        {"name": "First again", "ical_uid": "uid-1"},
+        {"name": "Broken"},
+        {"name": "Second", "ical_uid": "uid-2"},
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    errors = tmp_path / "errors.jsonl"
+
+    importer = GImport(
+        mock_gcalendar, "primary", chunk_size=2, workers=2, errors_path=str(errors)
+    )
+    stats = importer.run(str(path))
+
+    assert stats["imported"] == 2
+    assert stats["failed"] == 1
+    assert stats["skipped"] == 1
+    assert stats["position"] == 4
+    assert sorted(body["summary"] for body in created) == ["First", "Second"]
+    failure = json.loads(errors.read_text())
+    assert failure["position"] == 2
+    assert failure["event"] == {"name": "Broken"}
+
+
+def test_gimport_resumes_from_checkpoint(mock_gcalendar, fake_batch, tmp_path):
+    """Тест продолжения импорта с контрольной точки."""
+    insert, created = fake_insert()
+    mock_gcalendar.service.new_batch_http_request.side_effect = lambda: fake_batch()
+    mock_gcalendar.service.events().insert.side_effect = insert
+    path = tmp_path / "events.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps({"name": f"Event {i}", "ical_uid": f"uid-{i}"}) for i in range(3)
+        )
+        + "\n"
+    )
+    checkpoint = str(tmp_path / "import.checkpoint")
+
+    assert GImport(mock_gcalendar, "primary", checkpoint_path=checkpoint).run(str(path))
+    # Файл дополнен, в том числе повтором уже импортированного события
+    with open(path, "a") as f:
+        f.write(json.dumps({"name": "Event 3", "ical_uid": "uid-3"}) + "\n")
+        f.write(json.dumps({"name": "Event 0", "ical_uid": "uid-0"}) + "\n")
+    stats = GImport(mock_gcalendar, "primary", checkpoint_path=checkpoint).run(
+        str(path)
+    )
+
+    assert [body["summary"] for body in created] == [
+        "Event 0",
+        "Event 1",
+        "Event 2",
+        "Event 3",
+    ]
+    assert stats["imported"] == 4
+    assert stats["skipped"] == 1
+    assert stats["position"] == 5
+
+
+def test_gimport_rejects_foreign_checkpoint(mock_gcalendar, tmp_path):
+    """Тест защиты контрольной точки от другого исходного файла."""
+    checkpoint = str(tmp_path / "import.checkpoint")
+    first = tmp_path / "a.jsonl"
+    second = tmp_path / "b.jsonl"
+    first.write_text("")
+    second.write_text("")
+
+    assert GImport(mock_gcalendar, "primary", checkpoint_path=checkpoint).run(
+        str(first)
+    )
+    importer = GImport(mock_gcalendar, "primary", checkpoint_path=checkpoint)
+
+    assert importer.run(str(second)) is False
+    assert "belongs to" in importer.error
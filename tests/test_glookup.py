@@ -0,0 +1,60 @@
+import pytest
+from lookup.glookup import NameIndex
+
+
+class FakeClock:
+    """Управляемые часы для проверки TTL."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def index():
+    """Фикстура индекса с тремя событиями."""
+    name_index = NameIndex(ttl=60, max_scopes=2, clock=FakeClock())
+    name_index.load(
+        "events",
+        [
+            {"id": "1", "summary": "Team Meeting"},
+            {"id": "2", "summary": "Team Lunch"},
+            {"id": "3", "summary": "Weekly meeting notes"},
+        ],
+    )
+    return name_index
+
+
+def test_name_index_lookups(index):
+    """Тест точного, префиксного, подстрочного и пословного поиска."""
+    assert [e["id"] for e in index.exact("events", "Team Lunch")] == ["2"]
+    assert [e["id"] for e in index.prefix("events", "Team")] == ["1", "2"]
+    assert [e["id"] for e in index.search("events", "eeting")] == ["1", "3"]
+    assert [e["id"] for e in index.search("events", "Me")] == ["1"]
+    assert [e["id"] for e in index.tokens("events", "meeting team")] == ["1"]
+
+
+def test_name_index_put_and_remove(index):
+    """Тест обновления индекса при изменении объектов."""
+    index.put("events", {"id": "2", "summary": "Team Dinner"})
+    index.remove("events", "1")
+
+    assert index.exact("events", "Team Lunch") == []
+    assert [e["id"] for e in index.prefix("events", "Team")] == ["2"]
+    assert index.get("events", "1") is None
+
+
+def test_name_index_ttl_lru_and_invalidate(index):
+    """Тест истечения TTL, вытеснения LRU и явного сброса."""
+    index.load("a", [])
+    index.is_fresh("events")
+    index.load("b", [])
+    assert index.is_fresh("events") and not index.is_fresh("a")
+
+    index.invalidate("events")
+    assert not index.is_fresh("events")
+
+    index.clock.now = 61
+    assert not index.is_fresh("b")
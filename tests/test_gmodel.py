@@ -0,0 +1,170 @@
+import json
+import tracemalloc
+
+from model.gmodel import EVENT_API_FIELDS, Calendar, Event, EventColumns
+from sync.gsync import EventStore
+
+API_EVENT = {
+    "kind": "calendar#event",
+    "id": "event_1",
+    "etag": '"3181161784712000"',
+    "status": "confirmed",
+    "htmlLink": "https://www.google.com/calendar/event?eid=ZXZlbnRfMQ",
+    "created": "2024-04-01T08:00:00.000Z",
+    "updated": "2024-04-02T08:00:00.000Z",
+    "summary": "Planning",
+    "description": "Quarterly planning",
+    "creator": {"email": "owner@example.com", "self": True},
+    "organizer": {"email": "owner@example.com", "self": True},
+    "start": {"dateTime": "2024-05-01T09:00:00+03:00", "timeZone": "Europe/Moscow"},
+    "end": {"dateTime": "2024-05-01T10:30:00+03:00", "timeZone": "Europe/Moscow"},
+    "iCalUID": "event_1@google.com",
+    "sequence": 0,
+    "reminders": {
+        "useDefault": False,
+        "overrides": [{"method": "popup", "minutes": 10}],
+    },
+    "extendedProperties": {"private": {"source": "crm"}},
+    "eventType": "default",
+}
+
+
+def test_event_round_trip():
+    """Тест разбора события и обратного преобразования в тело API."""
+    event = Event.from_api(API_EVENT, "primary")
+    unused = {
+        "kind",
+        "htmlLink",
+        "created",
+        "creator",
+        "organizer",
+        "sequence",
+        "eventType",
+    }
+
+    assert event.to_api() == {k: v for k, v in API_EVENT.items() if k not in unused}
+    assert Event.from_api(event.to_api(), "primary") == event
+    body = event.to_body()
+    assert "id" not in body and "etag" not in body
+    assert body["reminders"]["overrides"] == [{"method": "popup", "minutes": 10}]
+
+
+def test_event_timestamps_are_lazy():
+    """Тест ленивого разбора времени и событий на весь день."""
+    event = Event.from_api(API_EVENT)
+    assert event._start_ts is None
+    assert event.start_ts == 1714543200.0
+    assert event.end_ts - event.start_ts == 5400
+    assert not event.all_day
+
+    all_day = Event("day", "Holiday", "2024-05-09", "2024-05-10")
+    assert all_day.all_day
+    assert all_day.to_body() == {
+        "summary": "Holiday",
+        "start": {"date": "2024-05-09"},
+        "end": {"date": "2024-05-10"},
+    }
+
+
+def test_calendar_round_trip():
+    """Тест модели календаря."""
+    data = {
+        "kind": "calendar#calendarListEntry",
+        "id": "work@group.calendar.google.com",
+        "etag": '"1"',
+        "summary": "Work",
+        "timeZone": "Europe/Moscow",
+        "accessRole": "owner",
+        "colorId": "7",
+    }
+    calendar = Calendar.from_api(data)
+
+    assert calendar.time_zone == "Europe/Moscow"
+    assert calendar.to_api() == {
+        k: v for k, v in data.items() if k not in ("kind", "colorId")
+    }
+    assert calendar.to_body() == {"summary": "Work", "timeZone": "Europe/Moscow"}
+
+
+def test_models_use_less_memory_than_dicts():
+    """Тест объема памяти моделей и колоночного набора по сравнению со словарями."""
+    raw = json.dumps(API_EVENT)
+
+    def allocated(build):
+        tracemalloc.start()
+        items = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del items
+        return size
+
+    dicts = allocated(lambda: [json.loads(raw) for _ in range(2000)])
+    models = allocated(lambda: [Event.from_api(json.loads(raw)) for _ in range(2000)])
+    columns = EventColumns()
+    columnar = allocated(
+        lambda: columns.extend(json.loads(raw) for _ in range(2000)) or columns
+    )
+
+    assert models * 3 < dicts
+    assert columnar * 3 < models
+
+
+def test_columns_select_by_time_and_calendar():
+    """Тест выборки колоночного набора по периоду и календарям."""
+    columns = EventColumns()
+    columns.extend(
+        [
+            Event("long", "Conference", "2024-05-01T00:00:00Z", "2024-05-04T00:00:00Z"),
+            Event("late", "Late", "2024-05-03T18:00:00Z", "2024-05-03T19:00:00Z"),
+            Event("early", "Early", "2024-05-03T08:00:00Z", "2024-05-03T09:00:00Z"),
+            Event("day", "Holiday", "2024-05-03", "2024-05-04"),
+        ],
+        "work",
+    )
+    columns.append(
+        {
+            "id": "gym",
+            "summary": "Gym",
+            "start": {"dateTime": "2024-05-03T07:00:00Z"},
+            "end": {"dateTime": "2024-05-03T08:00:00Z"},
+        },
+        "home",
+    )
+    columns.append({"id": "gone", "status": "cancelled"}, "home")
+
+    def ids(rows):
+        return [columns.ids[row] for row in rows]
+
+    assert len(columns) == 5
+    assert ids(columns.select("2024-05-03T00:00:00Z", "2024-05-03T12:00:00Z")) == [
+        "long",
+        "day",
+        "gym",
+        "early",
+    ]
+    assert ids(columns.select("2024-05-03T08:00:00Z", calendar_ids=["home"])) == []
+    assert ids(columns.select(time_max="2024-05-02T00:00:00Z")) == ["long"]
+
+    holiday = next(columns.events("2024-05-03T00:00:00Z", calendar_ids=["work"]))
+    assert holiday.id == "long"
+    day = columns.row(columns.ids.index("day"))
+    assert (day.start, day.end, day.calendar_id) == ("2024-05-03", "2024-05-04", "work")
+
+
+def test_iter_event_models_requests_parsed_fields(mock_gcalendar):
+    """Тест обхода событий в виде моделей с проекцией полей."""
+    events = mock_gcalendar.service.events.return_value
+    events.list.return_value.execute.return_value = {"items": [API_EVENT]}
+
+    models = list(mock_gcalendar.iter_event_models("primary", {}))
+
+    assert models == [Event.from_api(API_EVENT, "primary")]
+    fields = events.list.call_args.kwargs["fields"]
+    assert fields == f"nextPageToken,items({EVENT_API_FIELDS})"
+
+
+def test_store_models():
+    """Тест чтения моделей из хранилища синхронизации."""
+    store = EventStore()
+    store.apply("primary", [API_EVENT], "token")
+    assert list(store.models("primary")) == [Event.from_api(API_EVENT, "primary")]
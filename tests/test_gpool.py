@@ -0,0 +1,171 @@
+import threading
+import time
+
+import pytest
+
+from emulator.gemulator import CalendarEmulator, EmulatorWorkspace
+from pool.gpool import JobPool
+from quota.gquota import RateLimiter
+
+
+@pytest.fixture
+def emulator():
+    """Фикстура с запущенным эмулятором Calendar API."""
+    with CalendarEmulator() as emulator:
+        yield emulator
+
+
+@pytest.fixture
+def pool(emulator):
+    """Фикстура пула с двумя аккаунтами на эмуляторе."""
+    pool = JobPool(workers=4, factory=emulator.factory())
+    pool.add_tenant("alice", EmulatorWorkspace())
+    pool.add_tenant("bob", EmulatorWorkspace(), rate=5.0)
+    yield pool
+    pool.shutdown()
+
+
+def event_data(name):
+    return {
+        "name": name,
+        "start_time": "2024-05-01T09:00:00+00:00",
+        "end_time": "2024-05-01T10:00:00+00:00",
+    }
+
+
+def test_jobs_on_same_calendar_run_in_order(pool):
+    """Тест порядка заданий одного календаря и параллельности разных."""
+    log = []
+    active = []
+    peak = [0]
+    lock = threading.Lock()
+
+    def step(gcalendar, gevent, calendar_id, number):
+        with lock:
+            active.append(calendar_id)
+            peak[0] = max(peak[0], len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(calendar_id)
+            log.append((calendar_id, number))
+        return number
+
+    futures = [
+        pool.submit("alice", step, calendar_id, number=number)
+        for number in range(5)
+        for calendar_id in ("work", "home")
+    ]
+    assert pool.join(timeout=5)
+
+    assert [f.result() for f in futures] == [n for n in range(5) for _ in range(2)]
+    for calendar_id in ("work", "home"):
+        assert [n for c, n in log if c == calendar_id] == list(range(5))
+    # Один календарь никогда не выполняется в двух потоках сразу
+    assert peak[0] == 2
+
+
+def test_tenants_are_served_round_robin(emulator):
+    """Тест равномерного чередования аккаунтов при одном потоке."""
+    order = []
+    with JobPool(workers=1, factory=emulator.factory()) as pool:
+        for name in ("alice", "bob"):
+            pool.add_tenant(name, EmulatorWorkspace())
+        gate = threading.Event()
+        pool.submit("alice", lambda *args: gate.wait(5))
+        for number in range(3):
+            pool.submit("alice", lambda *args, n=number: order.append(("alice", n)))
+        for number in range(3):
+            pool.submit("bob", lambda *args, n=number: order.append(("bob", n)))
+        gate.set()
+
+    assert order == [
+        ("bob", 0),
+        ("alice", 0),
+        ("bob", 1),
+        ("alice", 1),
+        ("bob", 2),
+        ("alice", 2),
+    ]
+
+
+def test_tenant_isolation_and_quota_budgets(pool):
+    """Тест изоляции учетных данных и бюджетов квоты аккаунтов."""
+    alice, bob = pool.tenant("alice"), pool.tenant("bob")
+    assert alice.clients()[0].service is not bob.clients()[0].service
+    assert alice.quota.user == "alice" and bob.quota.user == "bob"
+    assert pool.limiter.user("bob").rate == 5.0
+    assert pool.limiter.user("alice").rate == RateLimiter().user_rate
+
+
+def test_operations_and_report(emulator, pool):
+    """Тест встроенных операций и статистики по аккаунтам."""
+    created = pool.submit("alice", "event.create", "primary", data=event_data("A"))
+    pool.join()
+    event_id = created.result()["id"]
+    edited = pool.submit(
+        "alice", "event.edit", "primary", event_id=event_id, data={"name": "B"}
+    )
+    deleted = pool.submit("alice", "event.delete", "primary", event_id=event_id)
+    missing = pool.submit("bob", "event.delete", "primary", event_id="missing")
+    pool.join()
+
+    assert edited.result()["summary"] == "B"
+    assert deleted.result() is True
+    assert missing.result() is False
+    report = pool.report()
+    assert report["alice"]["completed"] == 3
+    assert report["alice"]["throughput"] > 0
+    assert report["bob"]["failed"] == 1
+    assert report["alice"]["quota"]["requests"] == 3
+
+
+
+def test_failures_follow_job_errors(emulator):
+    """Тест учета отказов: ошибка прошлого задания и пустой ответ select."""
+    with JobPool(workers=1, factory=emulator.factory()) as pool:
+        pool.add_tenant("alice", EmulatorWorkspace())
+        missing = pool.submit("alice", "event.delete", "primary", event_id="missing")
+        # Задание в том же потоке после ошибки
+        after = pool.submit("alice", lambda *args: "done")
+        absent = [
+            pool.submit("alice", "event.select", "primary", data={"q": name})
+            for name in ("Nothing", "Nobody")
+        ]
+        broken = pool.submit("alice", "event.list", "missing-calendar")
+        listed = pool.submit("alice", "event.list", "primary")
+
+    assert missing.result() is False
+    assert after.result() == "done"
+    assert [f.result() for f in absent] == [False, False]
+    assert broken.result() == []
+    assert listed.result() == []
+    report = pool.report()
+    assert report["alice"]["failed"] == 2
+    assert report["alice"]["completed"] == 4
+
+
+def test_tenant_worker_limit(emulator):
+    """Тест ограничения числа потоков одного аккаунта."""
+    active = []
+    peak = [0]
+    lock = threading.Lock()
+
+    def step(*args):
+        with lock:
+            active.append(1)
+            peak[0] = max(peak[0], len(active))
+        time.sleep(0.01)
+        with lock:
+            active.pop()
+
+    with JobPool(workers=4, factory=emulator.factory(), tenant_workers=2) as pool:
+        pool.add_tenant("alice", EmulatorWorkspace())
+        for number in range(8):
+            pool.submit("alice", step, f"calendar-{number}")
+
+    assert peak[0] == 2
+
+
+def test_unknown_operation_is_rejected(pool):
+    with pytest.raises(ValueError):
+        pool.submit("alice", "calendar.rename")
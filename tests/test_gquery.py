@@ -0,0 +1,160 @@
+import pytest
+
+from emulator.gemulator import CalendarEmulator, EmulatorWorkspace
+from event.gevent import GEvent
+from gcalendar.gcalendar import GCalendar
+from model.gmodel import Event
+from query.gquery import EventIndex
+from quota.gquota import QuotaGuard
+from sync.gsync import EventStore, GSync
+from telemetry.gtelemetry import Telemetry
+
+
+def event(event_id, summary, day, hour, calendar_id="work", **fields):
+    return Event(
+        event_id,
+        summary,
+        f"2024-05-{day:02d}T{hour:02d}:00:00+00:00",
+        f"2024-05-{day:02d}T{hour + 1:02d}:00:00+00:00",
+        calendar_id,
+        **fields,
+    )
+
+
+@pytest.fixture
+def index():
+    """Фикстура индекса с событиями двух календарей."""
+    index = EventIndex()
+    index.extend(
+        [
+            event(
+                "standup",
+                "Daily standup",
+                1,
+                9,
+                location="Room A",
+                attendees=("ann@example.com", "bob@example.com"),
+                updated="2024-04-03T00:00:00Z",
+            ),
+            event(
+                "review",
+                "Design review",
+                2,
+                14,
+                description="Review the storage design",
+                attendees=("ann@example.com",),
+                updated="2024-04-01T00:00:00Z",
+            ),
+            event(
+                "lunch",
+                "Team lunch",
+                3,
+                12,
+                "home",
+                location="Berlin office",
+                status="tentative",
+                updated="2024-04-02T00:00:00Z",
+            ),
+        ]
+    )
+    return index
+
+
+def ids(events):
+    return [event.id for event in events]
+
+
+def test_filters_intersect(index):
+    """Тест пересечения текстовых, адресных и временных условий."""
+    assert ids(index.search(text="design")) == ["review"]
+    assert ids(index.search(text="review storage")) == ["review"]
+    assert ids(index.search(text="review lunch")) == []
+    assert ids(index.search(attendee="ANN@example.com")) == ["standup", "review"]
+    assert ids(index.search(location="berlin")) == ["lunch"]
+    assert ids(index.search(status="tentative")) == ["lunch"]
+    assert ids(index.search(calendar_ids=["home"])) == ["lunch"]
+    assert ids(
+        index.search(
+            attendee="ann@example.com",
+            time_min="2024-05-02T00:00:00Z",
+            time_max="2024-05-03T00:00:00Z",
+        )
+    ) == ["review"]
+
+
+def test_sort_and_limit(index):
+    """Тест сортировки по полям и ограничения числа результатов."""
+    assert ids(index.search()) == ["standup", "review", "lunch"]
+    assert ids(index.search(descending=True, limit=2)) == ["lunch", "review"]
+    assert ids(index.search(order_by="updated", limit=2)) == ["review", "lunch"]
+    assert ids(index.search(order_by="summary", descending=True)) == [
+        "lunch",
+        "review",
+        "standup",
+    ]
+    with pytest.raises(ValueError):
+        index.search(order_by="location")
+
+
+def test_incremental_updates(index):
+    """Тест замены, удаления и очистки календаря без перестройки индекса."""
+    index.add(event("review", "Architecture review", 4, 10))
+    index.apply("work", [{"id": "standup", "status": "cancelled"}])
+    index.apply(
+        "home",
+        [
+            {
+                "id": "gym",
+                "summary": "Gym",
+                "start": {"dateTime": "2024-05-01T07:00:00+00:00"},
+                "end": {"dateTime": "2024-05-01T08:00:00+00:00"},
+                "attendees": [{"email": "Coach@example.com"}],
+            }
+        ],
+    )
+
+    assert ids(index.search()) == ["gym", "lunch", "review"]
+    assert ids(index.search(text="design")) == []
+    assert ids(index.search(attendee="coach@example.com")) == ["gym"]
+    assert ids(index.search(time_min="2024-05-04T00:00:00Z")) == ["review"]
+
+    index.clear("home")
+    assert ids(index.search()) == ["review"]
+    assert len(index) == 1
+
+
+def test_sync_listener_refreshes_index(tmp_path):
+    """Тест обновления индекса страницами изменений GSync."""
+    with CalendarEmulator() as emulator:
+        quota = QuotaGuard(sleep=lambda s: None, telemetry=Telemetry())
+        gcalendar = GCalendar(
+            EmulatorWorkspace(), factory=emulator.factory(), quota=quota
+        )
+        gevent = GEvent(gcalendar)
+        store = EventStore(str(tmp_path / "events.db"))
+        index = EventIndex()
+        gsync = GSync(gcalendar, store)
+        gsync.add_listener(index)
+        created = [
+            gevent.create(
+                "primary",
+                {
+                    "name": f"Planning {n}",
+                    "start_time": f"2024-05-0{n + 1}T09:00:00+00:00",
+                    "end_time": f"2024-05-0{n + 1}T10:00:00+00:00",
+                },
+            )
+            for n in range(3)
+        ]
+        gsync.sync("primary")
+        gevent.delete("primary", created[0]["id"])
+        gevent.edit("primary", created[1]["id"], {"name": "Retro"})
+        gsync.sync("primary")
+
+        assert ids(index.search(text="planning")) == [created[2]["id"]]
+        assert ids(index.search(summary="retro")) == [created[1]["id"]]
+
+        restored = EventIndex()
+        restored.load_store(store)
+        assert ids(restored.search()) == ids(index.search())
+        store.close()
@@ -0,0 +1,125 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+import httplib2
+from googleapiclient.errors import HttpError
+from quota.gquota import (
+    QuotaGuard,
+    RateLimiter,
+    RetryPolicy,
+    TokenBucket,
+    is_retryable,
+    retry_after,
+)
+
+
+def make_http_error(status, reason=None, headers=None):
+    """Создание HttpError с заданным статусом, причиной и заголовками."""
+    resp = httplib2.Response({"status": status, **(headers or {})})
+    content = {"error": {"errors": [{"reason": reason}], "message": "error"}}
+    return HttpError(resp, json.dumps(content).encode("utf-8"))
+
+
+class FakeClock:
+    """Управляемые часы, которые сдвигаются при ожидании."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_is_retryable():
+    """Тест определения повторяемых ошибок."""
+    assert is_retryable(make_http_error(503))
+    assert is_retryable(make_http_error(429))
+    assert is_retryable(make_http_error(403, "rateLimitExceeded"))
+    assert not is_retryable(make_http_error(403, "forbidden"))
+    assert not is_retryable(make_http_error(404))
+    assert not is_retryable(ValueError("boom"))
+
+
+def test_retry_after_header():
+    """Тест учета заголовка Retry-After."""
+    error = make_http_error(429, headers={"retry-after": "7"})
+
+    assert retry_after(error) == 7.0
+    assert RetryPolicy().delay(0, error) == 7.0
+    assert retry_after(make_http_error(429)) is None
+
+
+def test_token_bucket_reserve():
+    """Тест ожидания при исчерпании корзины токенов."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    clock.now += 1.5
+    assert bucket.reserve() == 0
+
+
+def test_rate_limiter_adapts_to_throttling():
+    """Тест снижения скорости после ошибки квоты пользователя."""
+    clock = FakeClock()
+    limiter = RateLimiter(user_rate=4, project_rate=100, clock=clock, sleep=clock.sleep)
+
+    limiter.on_throttle("alice", make_http_error(403, "userRateLimitExceeded"))
+
+    assert limiter.user("alice").rate == 2
+    assert limiter.user("bob").rate == 4
+    assert limiter.project.rate == 100
+    for _ in range(5):
+        limiter.acquire("alice")
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_quota_guard_retries_and_metrics():
+    """Тест повтора временной ошибки и учета метрик."""
+    delays = []
+    guard = QuotaGuard(policy=RetryPolicy(max_retries=2), sleep=delays.append)
+    request = MagicMock()
+    request.execute.side_effect = [
+        make_http_error(429, headers={"retry-after": "1"}),
+        {"id": "ok"},
+    ]
+
+    assert guard.execute(request) == {"id": "ok"}
+    assert delays == [1.0]
+    snapshot = guard.metrics.snapshot()
+    assert snapshot["requests"] == 2
+    assert snapshot["retries"] == 1
+    assert snapshot["throttled"] == {"429": 1}
+
+
+def test_quota_guard_gives_up():
+    """Тест отказа после исчерпания попыток."""
+    guard = QuotaGuard(policy=RetryPolicy(max_retries=1), sleep=lambda delay: None)
+    request = MagicMock()
+    request.execute.side_effect = make_http_error(503)
+
+    with pytest.raises(HttpError):
+        guard.execute(request)
+    assert request.execute.call_count == 2
+    assert guard.metrics.snapshot()["failures"] == 1
+
+
+def test_clients_share_default_limiter(default_limiter):
+    """Тест общего ограничителя: два клиента расходуют одну корзину."""
+    from gcalendar.gcalendar import GCalendar
+    from event.gevent import GEvent
+
+    first = GCalendar(MagicMock(), factory=MagicMock())
+    second = GCalendar(MagicMock(), factory=MagicMock())
+
+    assert first.quota.limiter is second.quota.limiter is default_limiter
+    assert GEvent(second).quota.limiter is default_limiter
+    bucket = default_limiter.user("default")
+    first.quota.acquire(6)
+    second.quota.acquire(6)
+    assert bucket.reserve(0) > 0
@@ -0,0 +1,142 @@
+import datetime
+
+from recurrence.grecurrence import RecurrenceExpander, RRule
+
+
+def starts(instances):
+    return [i["start"].get("dateTime") or i["start"].get("date") for i in instances]
+
+
+def test_rrule_monthly_byday_and_bysetpos():
+    """Тест правил с порядковым днем недели и BYSETPOS."""
+    dtstart = datetime.datetime(2024, 1, 1, 10)
+    second_tuesday = RRule.parse("RRULE:FREQ=MONTHLY;BYDAY=2TU;COUNT=3")
+    last_workday = RRule.parse("RRULE:FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1")
+
+    assert [d.day for d in second_tuesday.iter(dtstart)] == [9, 13, 12]
+    days = last_workday.iter(dtstart)
+    assert [next(days).date() for _ in range(3)] == [
+        datetime.date(2024, 1, 31),
+        datetime.date(2024, 2, 29),
+        datetime.date(2024, 3, 29),
+    ]
+
+
+def test_rrule_skips_missing_month_days():
+    """Тест пропуска 31-го числа в коротких месяцах."""
+    rule = RRule.parse("RRULE:FREQ=MONTHLY;COUNT=3")
+
+    assert [d.month for d in rule.iter(datetime.date(2024, 1, 31))] == [1, 3, 5]
+
+
+def test_expand_keeps_wall_clock_across_dst():
+    """Тест сохранения местного времени экземпляров при переходе на зимнее время."""
+    master = {
+        "id": "weekly",
+        "summary": "Sync",
+        "start": {"dateTime": "2024-10-21T09:00:00+02:00", "timeZone": "Europe/Berlin"},
+        "end": {"dateTime": "2024-10-21T10:00:00+02:00", "timeZone": "Europe/Berlin"},
+        "recurrence": ["RRULE:FREQ=WEEKLY;UNTIL=20241105T000000Z"],
+    }
+
+    instances = list(RecurrenceExpander().expand([master]))
+
+    assert starts(instances) == [
+        "2024-10-21T09:00:00+02:00",
+        "2024-10-28T09:00:00+01:00",
+        "2024-11-04T09:00:00+01:00",
+    ]
+    assert instances[1]["id"] == "weekly_20241028T080000Z"
+    assert instances[1]["end"]["dateTime"] == "2024-10-28T10:00:00+01:00"
+    assert "recurrence" not in instances[1]
+
+
+def test_expand_applies_exdates_rdates_and_exceptions():
+    """Тест EXDATE, RDATE и измененных экземпляров серии."""
+    master = {
+        "id": "daily",
+        "start": {"dateTime": "2024-10-01T09:00:00Z"},
+        "end": {"dateTime": "2024-10-01T09:30:00Z"},
+        "recurrence": [
+            "RRULE:FREQ=DAILY;COUNT=4",
+            "EXDATE:20241002T090000Z",
+            "RDATE:20241010T090000Z",
+        ],
+    }
+    moved = {
+        "id": "daily_20241003T090000Z",
+        "recurringEventId": "daily",
+        "originalStartTime": {"dateTime": "2024-10-03T09:00:00Z"},
+        "start": {"dateTime": "2024-10-03T15:00:00Z"},
+        "end": {"dateTime": "2024-10-03T15:30:00Z"},
+    }
+    cancelled = {
+        "id": "daily_20241004T090000Z",
+        "recurringEventId": "daily",
+        "originalStartTime": {"dateTime": "2024-10-04T09:00:00Z"},
+        "status": "cancelled",
+    }
+    single = {
+        "id": "single",
+        "start": {"date": "2024-10-05"},
+        "end": {"date": "2024-10-06"},
+    }
+
+    instances = RecurrenceExpander().expand(
+        [master, moved, cancelled, single],
+        "2024-10-01T09:15:00Z",
+        "2024-10-31T00:00:00Z",
+    )
+
+    assert starts(instances) == [
+        "2024-10-01T09:00:00+00:00",
+        "2024-10-03T15:00:00Z",
+        "2024-10-05",
+        "2024-10-10T09:00:00+00:00",
+    ]
+
+
+def test_expander_caches_series_by_etag():
+    """Тест кэширования развернутой серии до изменения etag."""
+    master = {
+        "id": "yearly",
+        "etag": '"1"',
+        "start": {"date": "2024-02-29"},
+        "end": {"date": "2024-03-01"},
+        "recurrence": ["RRULE:FREQ=YEARLY"],
+    }
+    expander = RecurrenceExpander()
+
+    first = expander.series(master)
+    list(expander.expand([master], "2024-01-01T00:00:00Z", "2033-01-01T00:00:00Z"))
+
+    assert expander.series(master) is first
+    assert starts(expander.expand([master], None, "2029-01-01T00:00:00Z")) == [
+        "2024-02-29",
+        "2028-02-29",
+    ]
+    assert expander.series({**master, "etag": '"2"'}) is not first
+
+
+def test_gcalendar_iter_instances(mock_gcalendar):
+    """Тест загрузки серий без singleEvents и локального разворачивания."""
+    events_list = mock_gcalendar.service.events().list
+    events_list.return_value.execute.return_value = {
+        "items": [
+            {
+                "id": "daily",
+                "start": {"dateTime": "2024-10-01T09:00:00Z"},
+                "end": {"dateTime": "2024-10-01T10:00:00Z"},
+                "recurrence": ["RRULE:FREQ=DAILY"],
+            }
+        ]
+    }
+
+    data = {"from": "2024-10-01T00:00:00Z", "till": "2024-10-03T00:00:00Z"}
+    instances = list(mock_gcalendar.iter_instances("cal", data))
+
+    assert [i["id"] for i in instances] == [
+        "daily_20241001T090000Z",
+        "daily_20241002T090000Z",
+    ]
+    assert "singleEvents" not in events_list.call_args.kwargs
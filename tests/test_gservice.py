@@ -0,0 +1,47 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from google.oauth2.credentials import Credentials
+from service.gservice import PooledHttp, ServiceFactory, discovery_document
+
+
+def test_discovery_document_is_cached():
+    """Тест однократного разбора discovery-документа."""
+    assert discovery_document() is discovery_document()
+    assert discovery_document()["name"] == "calendar"
+
+
+def test_service_factory_shares_service_per_credentials():
+    """Тест переиспользования сервиса для одних учетных данных."""
+    factory = ServiceFactory(root_url="http://127.0.0.1:8080/")
+    creds = Credentials(token="token")
+
+    service = factory.build(creds)
+
+    assert factory.build(creds) is service
+    assert factory.build(Credentials(token="other")) is not service
+    assert service._baseUrl.startswith("http://127.0.0.1:8080/")
+
+
+def test_pooled_http_reuses_transports(mocker):
+    """Тест выдачи отдельных транспортов потокам и их переиспользования."""
+    barrier = threading.Barrier(3)
+
+    def request(*args, **kwargs):
+        barrier.wait(timeout=5)
+        return "response"
+
+    transport = mocker.patch("service.gservice.AuthorizedHttp")
+    transport.return_value.request.side_effect = request
+    pool = PooledHttp(MagicMock(), size=3)
+
+    threads = [threading.Thread(target=pool.request, args=("uri",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.created == 3
+    transport.return_value.request.side_effect = None
+    pool.request("uri")
+    assert pool.created == 3
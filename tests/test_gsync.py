@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import MagicMock
+from googleapiclient.errors import HttpError
+from sync.gsync import EventStore, GSync
+
+
+@pytest.fixture
+def gsync(mock_gcalendar):
+    """Фикстура синхронизатора с хранилищем в памяти."""
+    return GSync(mock_gcalendar, EventStore())
+
+
+def test_gsync_full_sync(gsync):
+    """Тест первичной полной синхронизации."""
+    gsync.service.events().list().execute.side_effect = [
+        {"items": [{"id": "event_1", "summary": "One"}], "nextPageToken": "p2"},
+        {"items": [{"id": "event_2", "summary": "Two"}], "nextSyncToken": "token_1"},
+    ]
+
+    stats = gsync.sync("cal")
+
+    assert stats == {"upserted": 2, "deleted": 0, "full": True}
+    assert gsync.store.count("cal") == 2
+    assert gsync.store.get_token("cal") == "token_1"
+
+
+def test_gsync_incremental_applies_cancellations(gsync):
+    """Тест применения дельты с отмененными событиями."""
+    gsync.store.apply("cal", [{"id": "event_1"}, {"id": "event_2"}], "token_1")
+    events_list = gsync.service.events().list
+    events_list.return_value.execute.return_value = {
+        "items": [
+            {"id": "event_1", "status": "cancelled"},
+            {"id": "event_3", "summary": "Three"},
+        ],
+        "nextSyncToken": "token_2",
+    }
+
+    stats = gsync.sync("cal")
+
+    assert stats == {"upserted": 1, "deleted": 1, "full": False}
+    assert events_list.call_args.kwargs["syncToken"] == "token_1"
+    assert gsync.store.get("cal", "event_1") is None
+    assert gsync.store.get("cal", "event_3")["summary"] == "Three"
+    assert gsync.store.get_token("cal") == "token_2"
+
+
+def test_gsync_full_resync_on_410(gsync):
+    """Тест полной пересинхронизации при устаревшем токене."""
+    gsync.store.apply("cal", [{"id": "stale"}], "old_token")
+    gone = HttpError(MagicMock(status=410, reason="Gone"), b"")
+    gsync.service.events().list().execute.side_effect = [
+        gone,
+        {"items": [{"id": "event_1"}], "nextSyncToken": "new_token"},
+    ]
+
+    stats = gsync.sync("cal")
+
+    assert stats["full"] is True
+    assert gsync.store.get("cal", "stale") is None
+    assert gsync.store.get_token("cal") == "new_token"
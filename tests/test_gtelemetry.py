@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from googleapiclient.http import HttpMockSequence, HttpRequest
+from googleapiclient.model import JsonModel
+
+from cache.gcache import ResponseCache
+from quota.gquota import QuotaGuard, RetryPolicy
+from telemetry.gtelemetry import ERRORS, RETRIES, Telemetry
+
+
+def api_request(responses, body=None):
+    """Настоящий HttpRequest поверх последовательности поддельных ответов."""
+    return HttpRequest(
+        HttpMockSequence(responses),
+        JsonModel().response,
+        "https://www.googleapis.com/calendar/v3/calendars/primary/events",
+        method="POST",
+        body=body,
+        methodId="calendar.events.insert",
+    )
+
+
+def test_quota_guard_records_latency_bytes_and_retries():
+    """Тест метрик запроса с повтором после 503."""
+    telemetry = Telemetry()
+    spans = []
+    telemetry.add_span_hook(spans.append)
+    guard = QuotaGuard(
+        policy=RetryPolicy(base_delay=0), sleep=lambda s: None, telemetry=telemetry
+    )
+    content = json.dumps({"id": "event_1"})
+    request = api_request(
+        [({"status": "503"}, "unavailable"), ({"status": "200"}, content)],
+        body='{"summary": "x"}',
+    )
+
+    assert guard.execute(request) == {"id": "event_1"}
+
+    histogram = telemetry.histogram("calendar.events.insert")
+    assert histogram.count == 2
+    assert telemetry.value(RETRIES, reason="503") == 1
+    assert telemetry.value(ERRORS, method="calendar.events.insert", reason="503") == 1
+    assert telemetry.value(
+        "calendar_api_response_bytes_total", method="calendar.events.insert"
+    ) == len("unavailable") + len(content)
+    assert telemetry.value(
+        "calendar_api_request_bytes_total", method="calendar.events.insert"
+    ) == 2 * len('{"summary": "x"}')
+    assert [(s.name, s.attributes["retries"], s.error) for s in spans] == [
+        ("calendar.events.insert", 1, None)
+    ]
+
+
+def test_span_records_errors():
+    """Тест span с ошибкой и изоляции упавших хуков."""
+    telemetry = Telemetry()
+    spans = []
+    telemetry.add_span_hook(lambda span: 1 / 0)
+    telemetry.add_span_hook(spans.append)
+
+    with pytest.raises(KeyError):
+        with telemetry.span("lookup", scope="events"):
+            raise KeyError("missing")
+
+    assert spans[0].attributes == {"scope": "events"}
+    assert isinstance(spans[0].error, KeyError)
+    assert spans[0].end_ns >= spans[0].start_ns
+
+
+def test_prometheus_exposition():
+    """Тест текстового формата Prometheus."""
+    telemetry = Telemetry(buckets=(0.1, 1.0))
+    telemetry.observe("calendar.events.list", 0.05, 10, 200)
+    telemetry.observe("calendar.events.list", 0.5, 10, 300, error_reason="notFound")
+
+    text = telemetry.exposition()
+
+    method = 'method="calendar.events.list"'
+    assert "# TYPE calendar_api_request_duration_seconds histogram" in text
+    assert (
+        f'calendar_api_request_duration_seconds_bucket{{{method},le="0.1"}} 1' in text
+    )
+    assert (
+        f'calendar_api_request_duration_seconds_bucket{{{method},le="+Inf"}} 2' in text
+    )
+    assert f"calendar_api_request_duration_seconds_count{{{method}}} 2" in text
+    assert f"calendar_api_response_bytes_total{{{method}}} 500" in text
+    assert f'calendar_api_errors_total{{{method},reason="notFound"}} 1' in text
+
+
+def test_exposition_keeps_counter_precision():
+    """Тест вывода больших и дробных счетчиков без округления."""
+    telemetry = Telemetry()
+    telemetry.count("calendar_api_request_bytes_total", 1234567, method="m")
+    telemetry.count("calendar_api_wait_seconds_total", 0.1234567, method="m")
+
+    text = telemetry.exposition()
+
+    assert 'calendar_api_request_bytes_total{method="m"} 1234567\n' in text
+    assert 'calendar_api_wait_seconds_total{method="m"} 0.1234567\n' in text
+
+
+def test_quota_guard_counts_not_modified_as_success():
+    """Тест ответа 304 при перепроверке кэша: без ошибок и отказов."""
+    telemetry = Telemetry()
+    spans = []
+    telemetry.add_span_hook(spans.append)
+    guard = QuotaGuard(telemetry=telemetry)
+    cache = ResponseCache()
+    body = {"id": "event_1", "etag": '"1"'}
+    cache.store("event_1", body)
+    request = api_request([({"status": "304"}, "")])
+
+    assert cache.fetch("event_1", request, guard.execute, revalidate=True) == body
+
+    assert request.headers["If-None-Match"] == '"1"'
+    assert cache.stats()["revalidated"] == 1
+    assert telemetry.histogram("calendar.events.insert").count == 1
+    assert telemetry.value(ERRORS, method="calendar.events.insert", reason="304") == 0
+    assert guard.metrics.snapshot()["failures"] == 0
+    assert [s.error for s in spans] == [None]
@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+
+from watch.gwatch import ChannelManager, NotificationReceiver
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def watch_manager(mock_gcalendar, clock=None):
+    """Менеджер каналов с поддельными ответами watch."""
+    service = mock_gcalendar.service
+    service.events().watch.return_value.execute.side_effect = lambda: {
+        "resourceId": "res-events",
+        "expiration": str(int((clock or FakeClock())() + 3600) * 1000),
+    }
+    service.calendarList().watch.return_value.execute.return_value = {
+        "resourceId": "res-list"
+    }
+    return ChannelManager(
+        mock_gcalendar,
+        "https://example.com/notifications",
+        renew_margin=600,
+        clock=clock or FakeClock(),
+    )
+
+
+def notification(channel, state="exists"):
+    return {
+        "X-Goog-Channel-ID": channel.id,
+        "X-Goog-Channel-Token": channel.token,
+        "X-Goog-Resource-ID": channel.resource_id,
+        "X-Goog-Resource-State": state,
+    }
+
+
+def test_channel_manager_renews_before_expiration(mock_gcalendar):
+    """Тест продления канала до истечения срока."""
+    clock = FakeClock()
+    manager = watch_manager(mock_gcalendar, clock)
+    channel = manager.watch_events("cal")
+    body = mock_gcalendar.service.events().watch.call_args.kwargs["body"]
+
+    assert body["type"] == "web_hook"
+    assert channel.expiration == 4600
+    assert manager.renew_due() == []
+
+    clock.now = 4100
+    renewed = manager.renew_due()
+
+    assert [c.calendar_id for c in renewed] == ["cal"]
+    assert manager.channels() == renewed
+    stop = mock_gcalendar.service.channels().stop
+    assert stop.call_args.kwargs["body"] == {
+        "id": channel.id,
+        "resourceId": "res-events",
+    }
+
+
+def test_receiver_debounces_notifications(mock_gcalendar):
+    """Тест схлопывания серии уведомлений в один вызов обработчика."""
+    manager = watch_manager(mock_gcalendar)
+    events_channel = manager.watch_events("cal")
+    list_channel = manager.watch_calendar_list()
+    changes = []
+
+    async def on_change(kind, calendar_id):
+        changes.append((kind, calendar_id))
+
+    async def scenario():
+        receiver = await NotificationReceiver(
+            manager, on_change, debounce=0.05, port=0
+        ).start()
+        url = f"http://127.0.0.1:{receiver.port}/notifications"
+        async with httpx.AsyncClient() as client:
+            sync = await client.post(url, headers=notification(events_channel, "sync"))
+            statuses = [
+                (
+                    await client.post(url, headers=notification(events_channel))
+                ).status_code
+                for _ in range(3)
+            ]
+            await client.post(url, headers=notification(list_channel))
+            forged = {**notification(events_channel), "X-Goog-Channel-Token": "x"}
+            rejected = await client.post(url, headers=forged)
+            unknown = await client.post(url, headers={"X-Goog-Channel-ID": "nope"})
+        await receiver.close()
+        return sync.status_code, statuses, rejected.status_code, unknown.status_code
+
+    sync, statuses, rejected, unknown = asyncio.run(scenario())
+
+    assert (sync, statuses, rejected, unknown) == (200, [200, 200, 200], 403, 404)
+    assert sorted(changes, key=str) == [("calendarList", None), ("events", "cal")]
+
+
+def test_receiver_runs_blocking_handler(mock_gcalendar):
+    """Тест запуска синхронного обработчика в пуле потоков."""
+    manager = watch_manager(mock_gcalendar)
+    channel = manager.watch_events("cal")
+    synced = []
+
+    async def scenario():
+        receiver = NotificationReceiver(
+            manager, lambda kind, cal: synced.append(cal), debounce=0
+        )
+        assert await receiver.handle(notification(channel)) == 200
+        await receiver.drain()
+
+    asyncio.run(scenario())
+
+    assert synced == ["cal"]
+
+
+def test_receiver_runs_one_handler_per_resource(mock_gcalendar):
+    """Тест уведомлений во время обработки: повторный запуск после нее."""
+    manager = watch_manager(mock_gcalendar)
+    channel = manager.watch_events("cal")
+    running = []
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+        started = asyncio.Event()
+
+        async def on_change(kind, calendar_id):
+            running.append(calendar_id)
+            calls.append(len(running))
+            started.set()
+            await release.wait()
+            running.remove(calendar_id)
+
+        receiver = NotificationReceiver(manager, on_change, debounce=0)
+        await receiver.handle(notification(channel))
+        await started.wait()
+        for _ in range(3):
+            await receiver.handle(notification(channel))
+            await asyncio.sleep(0.01)
+        release.set()
+        await receiver.drain()
+        return receiver.dispatched
+
+    assert asyncio.run(scenario()) == 2
+    assert calls == [1, 1]
@@ -0,0 +1,217 @@
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from batch.gbatch import BatchResult
+from emulator.gemulator import CalendarEmulator, EmulatorWorkspace
+from event.gevent import GEvent
+from gcalendar.gcalendar import GCalendar
+from quota.gquota import QuotaGuard, RetryPolicy
+from telemetry.gtelemetry import Telemetry
+from writebehind.gwritebehind import MutationJournal, WriteBehindQueue
+
+
+def failed_result(index, status):
+    result = BatchResult(index)
+    content = {"error": {"errors": [{"reason": "backendError"}], "message": "error"}}
+    result.error = HttpError(
+        MagicMock(status=status, reason="error"), json.dumps(content).encode()
+    )
+    return result
+
+
+@pytest.fixture
+def emulator():
+    """Фикстура с запущенным эмулятором Calendar API."""
+    with CalendarEmulator() as emulator:
+        yield emulator
+
+
+@pytest.fixture
+def gevent(emulator):
+    """Фикстура GEvent, работающего с эмулятором без задержек повторов."""
+    quota = QuotaGuard(
+        policy=RetryPolicy(max_retries=2), sleep=lambda s: None, telemetry=Telemetry()
+    )
+    gcalendar = GCalendar(EmulatorWorkspace(), factory=emulator.factory(), quota=quota)
+    return GEvent(gcalendar)
+
+
+def event_data(name):
+    return {
+        "name": name,
+        "start_time": "2024-05-01T09:00:00+00:00",
+        "end_time": "2024-05-01T10:00:00+00:00",
+    }
+
+
+def stored(emulator, event_id):
+    entry = emulator.backend._events["emulator@example.com"].get(event_id)
+    return entry[1] if entry else None
+
+
+def test_create_and_edits_are_sent_as_one_insert(emulator, gevent):
+    """Тест слияния создания и правок в одну вставку."""
+    with WriteBehindQueue(gevent, max_delay=60) as queue:
+        created = queue.create("primary", event_data("Draft"))
+        edited = queue.edit("primary", created.event_id, {"name": "Review"})
+        queue.edit("primary", created.event_id, {"description": "Notes"})
+        assert queue.pending() == 1
+
+    event = created.result(timeout=5)
+    assert edited.result(timeout=5) == event
+    assert event["id"] == created.event_id
+    assert event["summary"] == "Review"
+    assert event["description"] == "Notes"
+    assert queue.coalesced == 2
+    assert emulator.calls == {"batch": 1, "insert_event": 1}
+
+
+def test_edits_are_sent_as_one_patch(emulator, gevent):
+    """Тест слияния нескольких правок существующего события."""
+    event = gevent.create("primary", event_data("Standup"))
+    emulator.calls.clear()
+    with WriteBehindQueue(gevent, max_delay=60) as queue:
+        futures = [
+            queue.edit("primary", event["id"], {"name": f"Standup {n}"})
+            for n in range(5)
+        ]
+
+    assert {f.result(timeout=5)["summary"] for f in futures} == {"Standup 4"}
+    assert stored(emulator, event["id"])["summary"] == "Standup 4"
+    assert emulator.calls == {"batch": 1, "patch_event": 1}
+    assert queue.sent == 1
+
+
+def test_create_then_delete_sends_nothing(emulator, gevent):
+    """Тест отмены создания удалением до отправки."""
+    existing = gevent.create("primary", event_data("Old"))
+    emulator.calls.clear()
+    with WriteBehindQueue(gevent, max_delay=60) as queue:
+        created = queue.create("primary", event_data("Temporary"))
+        deleted = queue.delete("primary", created.event_id)
+        queue.edit("primary", existing["id"], {"name": "Gone"})
+        removed = queue.delete("primary", existing["id"])
+
+        assert created.result(timeout=1) is None
+        assert deleted.result(timeout=1) is None
+        with pytest.raises(ValueError):
+            queue.edit("primary", existing["id"], {"name": "Back"}).result()
+
+    assert removed.result(timeout=5) is True
+    assert stored(emulator, created.event_id) is None
+    assert stored(emulator, existing["id"])["status"] == "cancelled"
+    assert emulator.calls == {"batch": 1, "delete_event": 1}
+
+
+def test_flush_on_size_and_age(emulator, gevent):
+    """Тест фоновой отправки по числу операций и по возрасту."""
+    queue = WriteBehindQueue(gevent, max_pending=3, max_delay=60)
+    futures = [queue.create("primary", event_data(f"E{n}")) for n in range(3)]
+    assert all(f.result(timeout=5)["id"] for f in futures)
+    queue.close()
+
+    queue = WriteBehindQueue(gevent, max_pending=100, max_delay=0.05)
+    started = time.monotonic()
+    future = queue.create("primary", event_data("Late"))
+    assert future.result(timeout=5)["summary"] == "Late"
+    assert time.monotonic() - started >= 0.05
+    queue.close()
+    assert emulator.backend.event_count("emulator@example.com") == 4
+
+
+def test_journal_recovers_unsent_mutations(emulator, gevent, tmp_path):
+    """Тест отправки операций, оставшихся в журнале после сбоя."""
+    path = str(tmp_path / "mutations.db")
+    event = gevent.create("primary", event_data("Planning"))
+    journal = MutationJournal(path)
+    journal.save(
+        1,
+        ("primary", "draft0001"),
+        "create",
+        dict(event_data("Draft"), event_id="draft0001"),
+    )
+    journal.save(2, ("primary", event["id"]), "edit", {"name": "Retro"})
+    journal.save(3, ("primary", "draft0001"), "edit", {"name": "Final"})
+    journal.close()
+
+    with WriteBehindQueue(gevent, max_delay=60, journal_path=path) as queue:
+        assert queue.recovered == 3
+        assert queue.pending() == 2
+
+    assert stored(emulator, "draft0001")["summary"] == "Final"
+    assert stored(emulator, event["id"])["summary"] == "Retro"
+    journal = MutationJournal(path)
+    assert journal.load() == []
+    journal.close()
+
+
+def test_failed_mutation_sets_exception(gevent):
+    """Тест передачи ошибки API во future операции."""
+    with WriteBehindQueue(gevent, max_delay=60) as queue:
+        future = queue.edit("primary", "missing", {"name": "Nothing"})
+    assert future.exception(timeout=5) is not None
+    with pytest.raises(RuntimeError):
+        queue.create("primary", event_data("Closed"))
+
+
+def test_send_error_fails_group_and_sends_the_rest(tmp_path):
+    """Тест исключения при отправке группы: остальные группы отправляются."""
+    path = str(tmp_path / "mutations.db")
+    gevent = MagicMock()
+    gevent.edit_many.side_effect = ValueError("invalid literal for int()")
+    gevent.delete_many.return_value = [BatchResult(0, "event2")]
+    with WriteBehindQueue(gevent, max_delay=60, journal_path=path) as queue:
+        edited = queue.edit("primary", "event1", {"alarm": [{"type": "popup"}]})
+        deleted = queue.delete("primary", "event2")
+
+    assert isinstance(edited.exception(timeout=5), ValueError)
+    assert deleted.result(timeout=5) is True
+    journal = MutationJournal(path)
+    assert [row[3] for row in journal.load()] == ["edit"]
+    journal.close()
+
+
+def test_invalid_edit_is_rejected_alone(emulator, gevent):
+    """Тест правки с ошибкой в данных: остальные правки batch отправляются."""
+    first = gevent.create("primary", event_data("Planning"))
+    second = gevent.create("primary", event_data("Retro"))
+    with WriteBehindQueue(gevent, max_delay=60) as queue:
+        invalid = queue.edit("primary", first["id"], {"alarm": [{"type": "popup"}]})
+        renamed = queue.edit("primary", second["id"], {"name": "Review"})
+
+    assert isinstance(invalid.exception(timeout=5), KeyError)
+    assert renamed.result(timeout=5)["summary"] == "Review"
+    assert stored(emulator, second["id"])["summary"] == "Review"
+
+
+def test_journal_keeps_empty_edit(tmp_path):
+    """Тест журнала: пустая правка не превращается в NULL."""
+    journal = MutationJournal(str(tmp_path / "mutations.db"))
+    journal.save(1, ("primary", "event1"), "edit", {})
+    journal.save(2, ("primary", "event2"), "delete", None)
+
+    assert journal.load() == [
+        (1, "primary", "event1", "edit", {}),
+        (2, "primary", "event2", "delete", None),
+    ]
+    journal.close()
+
+
+def test_journal_keeps_only_retryable_failures(tmp_path):
+    """Тест журнала: временная ошибка остается, отказ API удаляется."""
+    path = str(tmp_path / "mutations.db")
+    gevent = MagicMock()
+    gevent.edit_many.return_value = [failed_result(0, 503), failed_result(1, 404)]
+    with WriteBehindQueue(gevent, max_delay=60, journal_path=path) as queue:
+        unavailable = queue.edit("primary", "event1", {"name": "Retro"})
+        missing = queue.edit("primary", "event2", {"name": "Gone"})
+
+    assert unavailable.exception(timeout=5).resp.status == 503
+    assert missing.exception(timeout=5).resp.status == 404
+    journal = MutationJournal(path)
+    assert [row[2] for row in journal.load()] == ["event1"]
+    journal.close()
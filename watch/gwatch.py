@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import secrets
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gcalendar.gcalendar import CALENDAR_LIST_SCOPE
+
+logger = logging.getLogger(__name__)
+
+# Срок жизни канала по умолчанию; Calendar API ограничивает его сверху сам
+DEFAULT_CHANNEL_TTL = 7 * 24 * 3600
+
+EVENTS = "events"
+CALENDAR_LIST = "calendarList"
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+class Channel:
+    """Зарегистрированный канал уведомлений events или calendarList."""
+
+    def __init__(
+        self,
+        channel_id: str,
+        resource_id: str,
+        kind: str,
+        calendar_id: Optional[str],
+        token: str,
+        expiration: float,
+    ):
+        self.id = channel_id
+        self.resource_id = resource_id
+        self.kind = kind
+        self.calendar_id = calendar_id
+        self.token = token
+        self.expiration = expiration
+
+
+class ChannelManager:
+    def __init__(
+        self,
+        gcalendar,
+        address: str,
+        ttl: int = DEFAULT_CHANNEL_TTL,
+        renew_margin: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Регистрация и продление каналов events().watch и calendarList().watch.
+
+        address — HTTPS-адрес приемника уведомлений. Канал продлевается за
+        renew_margin секунд до истечения: сначала создается новый канал,
+        затем останавливается старый, чтобы не терять уведомления.
+        """
+        self.service = gcalendar.service
+        self.quota = gcalendar.quota
+        self.address = address
+        self.ttl = ttl
+        self.renew_margin = renew_margin
+        self.clock = clock
+        self._channels: Dict[str, Channel] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        logger.info("ChannelManager initialized")
+
+    def watch_events(self, calendar_id: str) -> Channel:
+        """Подписка на изменения событий календаря."""
+        body = self._channel_body()
+        response = self.quota.execute(
+            self.service.events().watch(calendarId=calendar_id, body=body)
+        )
+        return self._register(response, body, EVENTS, calendar_id)
+
+    def watch_calendar_list(self) -> Channel:
+        """Подписка на изменения списка календарей."""
+        body = self._channel_body()
+        response = self.quota.execute(self.service.calendarList().watch(body=body))
+        return self._register(response, body, CALENDAR_LIST, None)
+
+    def stop(self, channel: Channel):
+        """Остановка канала на сервере и удаление его из реестра."""
+        with self._lock:
+            self._channels.pop(channel.id, None)
+        self.quota.execute(
+            self.service.channels().stop(
+                body={"id": channel.id, "resourceId": channel.resource_id}
+            )
+        )
+        logger.info("Stopped channel %s", channel.id)
+
+    def stop_all(self):
+        for channel in self.channels():
+            try:
+                self.stop(channel)
+            except Exception as e:
+                logger.error("Error stopping channel %s: %s", channel.id, e)
+
+    def get(self, channel_id: str) -> Optional[Channel]:
+        with self._lock:
+            return self._channels.get(channel_id)
+
+    def channels(self) -> List[Channel]:
+        with self._lock:
+            return list(self._channels.values())
+
+    def renew_due(self) -> List[Channel]:
+        """Продление каналов, истекающих в ближайшие renew_margin секунд."""
+        renewed = []
+        deadline = self.clock() + self.renew_margin
+        for channel in self.channels():
+            if channel.expiration > deadline:
+                continue
+            try:
+                if channel.kind == EVENTS:
+                    renewed.append(self.watch_events(channel.calendar_id))
+                else:
+                    renewed.append(self.watch_calendar_list())
+                self.stop(channel)
+            except Exception as e:
+                logger.error("Error renewing channel %s: %s", channel.id, e)
+        return renewed
+
+    def next_renewal_in(self) -> float:
+        """Секунды до ближайшего продления."""
+        expirations = [channel.expiration for channel in self.channels()]
+        if not expirations:
+            return float(self.ttl)
+        return max(0.0, min(expirations) - self.renew_margin - self.clock())
+
+    def start(self, retry_interval: float = 60.0):
+        """Фоновое продление каналов."""
+        if self._thread is None or not self._thread.is_alive():
+            self._wakeup.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(retry_interval,),
+                name="channel-renewal",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def shutdown(self, timeout: Optional[float] = None):
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, retry_interval: float):
+        while not self._wakeup.is_set():
+            self.renew_due()
+            wait = min(self.next_renewal_in(), retry_interval)
+            self._wakeup.wait(max(wait, 1.0))
+
+    def _channel_body(self) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "type": "web_hook",
+            "address": self.address,
+            "token": secrets.token_urlsafe(16),
+            "params": {"ttl": str(self.ttl)},
+        }
+
+    def _register(
+        self, response: dict, body: dict, kind: str, calendar_id: Optional[str]
+    ) -> Channel:
+        expiration = response.get("expiration")
+        channel = Channel(
+            body["id"],
+            response["resourceId"],
+            kind,
+            calendar_id,
+            body["token"],
+            int(expiration) / 1000 if expiration else self.clock() + self.ttl,
+        )
+        with self._lock:
+            self._channels[channel.id] = channel
+        logger.info(
+            "Watching %s %s via channel %s", kind, calendar_id or "", channel.id
+        )
+        return channel
+
+
+def sync_handler(gsync, gcalendar=None) -> Callable[[str, Optional[str]], None]:
+    """Обработчик изменений: инкрементальная синхронизация затронутого календаря.
+
+    Изменения calendarList перезагружают индекс имен gcalendar, если он подключен.
+    """
+
+    def on_change(kind: str, calendar_id: Optional[str]):
+        if kind == EVENTS:
+            gsync.sync(calendar_id)
+        elif gcalendar is not None and gcalendar.lookup is not None:
+            gcalendar.lookup.load(CALENDAR_LIST_SCOPE, list(gcalendar.iter_calendars()))
+
+    return on_change
+
+
+class NotificationReceiver:
+    def __init__(
+        self,
+        manager: ChannelManager,
+        on_change: Callable,
+        debounce: float = 2.0,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        path: str = "/notifications",
+    ):
+        """Асинхронный приемник webhook-уведомлений Calendar API.
+
+        Уведомления проверяются по ID, токену и resourceId канала. Серия
+        уведомлений по одному ресурсу за debounce секунд схлопывается в один
+        вызов on_change(kind, calendar_id). Для ресурса выполняется не больше
+        одного обработчика: уведомления, пришедшие во время его работы,
+        вызывают еще один запуск после него. Синхронные обработчики выполняются
+        в пуле потоков, корутины — в цикле событий.
+        """
+        self.manager = manager
+        self.on_change = on_change
+        self.debounce = debounce
+        self.host = host
+        self.port = port
+        self.path = path
+        self.received = 0
+        self.dispatched = 0
+        self._pending: Dict[Tuple[str, Optional[str]], int] = {}
+        # Ресурсы, для которых уже есть задача обработки
+        self._active: set = set()
+        self._tasks: set = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Notification receiver listening on %s:%s", self.host, self.port)
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.drain()
+
+    async def drain(self):
+        """Ожидание всех отложенных обработчиков."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def handle(self, headers: Dict[str, str]) -> int:
+        """Обработка уведомления по заголовкам X-Goog-*; возвращает HTTP-статус."""
+        headers = {key.lower(): value for key, value in headers.items()}
+        channel = self.manager.get(headers.get("x-goog-channel-id", ""))
+        if channel is None:
+            logger.warning("Notification for unknown channel")
+            return 404
+        if headers.get("x-goog-channel-token") != channel.token or (
+            headers.get("x-goog-resource-id") != channel.resource_id
+        ):
+            logger.warning("Rejected notification for channel %s", channel.id)
+            return 403
+        self.received += 1
+        state = headers.get("x-goog-resource-state")
+        if state == "sync":
+            # Первое уведомление после регистрации канала
+            return 200
+        key = (channel.kind, channel.calendar_id)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        if key not in self._active:
+            self._active.add(key)
+            task = asyncio.get_running_loop().create_task(self._dispatch(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return 200
+
+    async def _dispatch(self, key: Tuple[str, Optional[str]]):
+        """Обработка ресурса, пока для него приходят новые уведомления."""
+        try:
+            while key in self._pending:
+                await asyncio.sleep(self.debounce)
+                await self._run_handler(key, self._pending.pop(key, 0))
+        finally:
+            self._active.discard(key)
+
+    async def _run_handler(self, key: Tuple[str, Optional[str]], count: int):
+        kind, calendar_id = key
+        logger.info(
+            "Dispatching %s notifications for %s %s", count, kind, calendar_id or ""
+        )
+        self.dispatched += 1
+        try:
+            if asyncio.iscoroutinefunction(self.on_change):
+                await self.on_change(kind, calendar_id)
+            else:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.on_change, kind, calendar_id)
+        except Exception as e:
+            logger.error(
+                "Error handling change of %s %s: %s", kind, calendar_id or "", e
+            )
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        status = 400
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip()] = value.strip()
+            length = int(
+                headers.get("Content-Length", headers.get("content-length", 0))
+            )
+            if length:
+                await reader.readexactly(length)
+            if len(request_line) < 2 or request_line[1].split("?")[0] != self.path:
+                status = 404
+            elif request_line[0] != "POST":
+                status = 405
+            else:
+                status = await self.handle(headers)
+        except Exception as e:
+            logger.error("Error reading notification: %s", e)
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            "Content-Length: 0\r\nConnection: close\r\n\r\n".encode("latin-1")
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
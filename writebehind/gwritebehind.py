@@ -0,0 +1,349 @@
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+from batch.gbatch import DEFAULT_CHUNK_SIZE
+from quota.gquota import is_retryable
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+EDIT = "edit"
+DELETE = "delete"
+
+Key = Tuple[str, str]
+
+
+class PendingWrite(Future):
+    """Future отложенной операции с ID события, известным до отправки."""
+
+    def __init__(self, calendar_id: str, event_id: str):
+        super().__init__()
+        self.calendar_id = calendar_id
+        self.event_id = event_id
+
+
+class MutationJournal:
+    def __init__(self, path: str):
+        """Журнал неотправленных операций на SQLite.
+
+        Каждая запись — итоговая операция над событием после слияния.
+        Запись удаляется после успешной отправки или отказа API, который
+        повтор не исправит, поэтому при перезапуске журнал содержит ровно
+        то, что еще не дошло до API.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS mutations ("
+                " seq INTEGER PRIMARY KEY,"
+                " calendar_id TEXT NOT NULL,"
+                " event_id TEXT NOT NULL,"
+                " op TEXT NOT NULL,"
+                " data TEXT)"
+            )
+
+    def load(self) -> List[Tuple[int, str, str, str, Optional[dict]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, calendar_id, event_id, op, data FROM mutations"
+                " ORDER BY seq"
+            ).fetchall()
+        return [
+            (
+                seq,
+                calendar_id,
+                event_id,
+                op,
+                json.loads(data) if data is not None else None,
+            )
+            for seq, calendar_id, event_id, op, data in rows
+        ]
+
+    def next_seq(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(seq) FROM mutations").fetchone()
+        return (row[0] or 0) + 1
+
+    def save(self, seq: int, key: Key, op: str, data: Optional[dict]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mutations (seq, calendar_id, event_id, op, data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    seq,
+                    key[0],
+                    key[1],
+                    op,
+                    json.dumps(data) if data is not None else None,
+                ),
+            )
+
+    def remove(self, seqs: List[int]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM mutations WHERE seq = ?", [(seq,) for seq in seqs]
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+def _rejected(error: Exception) -> bool:
+    """Отказ API в самой операции (4xx), который повтор не исправит."""
+    return (
+        isinstance(error, HttpError)
+        and 400 <= error.resp.status < 500
+        and not is_retryable(error)
+    )
+
+
+class _Entry:
+    """Итоговая операция над событием и futures всех слитых в нее вызовов."""
+
+    __slots__ = ("seq", "key", "op", "data", "futures", "queued_at")
+
+    def __init__(self, seq: int, key: Key, op: str, data: Optional[dict]):
+        self.seq = seq
+        self.key = key
+        self.op = op
+        self.data = data
+        self.futures: List[Future] = []
+        self.queued_at = time.monotonic()
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        gevent,
+        max_pending: int = 100,
+        max_delay: float = 2.0,
+        journal_path: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """Отложенная запись изменений событий со слиянием операций.
+
+        Операции над одним событием сливаются до отправки: создание и
+        правки — в одно создание, несколько правок — в один PATCH, создание
+        и удаление — в ничто. Очередь отправляется batch-запросами, когда
+        в ней max_pending событий или самой старой операции max_delay
+        секунд. Futures слитых вызовов получают результат итоговой операции.
+        Новым событиям ID назначается сразу, поэтому их можно править и
+        удалять до отправки. С journal_path операции переживают перезапуск:
+        неотправленные из-за сбоя остаются в журнале и отправляются снова
+        при следующем запуске.
+        """
+        self.gevent = gevent
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self.chunk_size = chunk_size
+        self.journal = MutationJournal(journal_path) if journal_path else None
+        self.submitted = 0
+        self.coalesced = 0
+        self.sent = 0
+        self._pending: Dict[Key, _Entry] = {}
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._seq = itertools.count(self.journal.next_seq() if self.journal else 1)
+        self._closed = False
+        self.recovered = self._recover()
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def create(self, calendar_id: str, event_data: dict) -> PendingWrite:
+        """Отложенное создание; ID события берется из event_id или генерируется."""
+        event_id = event_data.get("event_id") or uuid.uuid4().hex
+        return self._submit(
+            CREATE, calendar_id, event_id, dict(event_data, event_id=event_id)
+        )
+
+    def edit(self, calendar_id: str, event_id: str, event_data: dict) -> PendingWrite:
+        return self._submit(EDIT, calendar_id, event_id, dict(event_data))
+
+    def delete(self, calendar_id: str, event_id: str) -> PendingWrite:
+        return self._submit(DELETE, calendar_id, event_id, None)
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def flush(self):
+        """Синхронная отправка всех накопленных операций."""
+        with self._flush_lock:
+            with self._condition:
+                entries = list(self._pending.values())
+                self._pending.clear()
+            if entries:
+                self._send(entries)
+
+    def close(self):
+        """Отправка оставшихся операций и остановка фонового потока."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self.flush()
+        if self.journal is not None:
+            self.journal.close()
+
+    def _submit(
+        self, op: str, calendar_id: str, event_id: str, data: Optional[dict]
+    ) -> PendingWrite:
+        future = PendingWrite(calendar_id, event_id)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            self.submitted += 1
+            error = self._merge((calendar_id, event_id), op, data, future)
+            if error is not None:
+                future.set_exception(error)
+            elif len(self._pending) >= self.max_pending:
+                self._condition.notify_all()
+        return future
+
+    def _merge(self, key: Key, op: str, data: Optional[dict], future: Future):
+        """Слияние операции с ожидающей; возвращает ошибку недопустимой пары."""
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = _Entry(next(self._seq), key, op, data)
+            entry.futures.append(future)
+            self._pending[key] = entry
+            self._journal_save(entry)
+            if len(self._pending) == 1:
+                self._condition.notify_all()
+            return None
+        if entry.op == DELETE or op == CREATE:
+            return ValueError(f"Cannot {op} event {key[1]} after {entry.op}")
+        self.coalesced += 1
+        entry.futures.append(future)
+        if op == EDIT:
+            # Правка дополняет создание или предыдущую правку
+            entry.data = {**entry.data, **data}
+        elif entry.op == CREATE:
+            # Событие не было создано: отправлять нечего
+            del self._pending[key]
+            self._journal_remove([entry.seq])
+            for pending in entry.futures:
+                pending.set_result(None)
+            return None
+        else:
+            entry.op, entry.data = DELETE, None
+        self._journal_save(entry)
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    if len(self._pending) >= self.max_pending:
+                        break
+                    if self._pending:
+                        oldest = min(e.queued_at for e in self._pending.values())
+                        wait = oldest + self.max_delay - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Error flushing write-behind queue: %s", e)
+
+    def _send(self, entries: List["_Entry"]):
+        """Отправка операций batch-запросами по календарям и видам операций."""
+        groups: Dict[Tuple[str, str], List[_Entry]] = {}
+        for entry in entries:
+            groups.setdefault((entry.key[0], entry.op), []).append(entry)
+        for (calendar_id, op), group in groups.items():
+            try:
+                results = self._send_group(calendar_id, op, group)
+            except Exception as e:
+                # Записи журнала сохраняются до успешной отправки,
+                # остальные группы отправляются независимо
+                logger.error(
+                    "Error sending %s operations for calendar %s: %s",
+                    op,
+                    calendar_id,
+                    e,
+                )
+                for entry in group:
+                    for future in entry.futures:
+                        future.set_exception(e)
+                continue
+            self.sent += len(group)
+            self._journal_remove(
+                [
+                    entry.seq
+                    for entry, result in zip(group, results)
+                    if result.ok or _rejected(result.error)
+                ]
+            )
+            for entry, result in zip(group, results):
+                for future in entry.futures:
+                    if not result.ok:
+                        future.set_exception(result.error)
+                    else:
+                        future.set_result(True if op == DELETE else result.response)
+        logger.info("Flushed %s event mutations", len(entries))
+
+    def _send_group(self, calendar_id: str, op: str, group: List["_Entry"]):
+        if op == CREATE:
+            return self.gevent.create_many(
+                calendar_id, [e.data for e in group], chunk_size=self.chunk_size
+            )
+        if op == EDIT:
+            return self.gevent.edit_many(
+                calendar_id,
+                [(e.key[1], e.data) for e in group],
+                chunk_size=self.chunk_size,
+            )
+        return self.gevent.delete_many(
+            calendar_id, [e.key[1] for e in group], chunk_size=self.chunk_size
+        )
+
+    def _recover(self) -> int:
+        """Повторная постановка операций, оставшихся в журнале."""
+        if self.journal is None:
+            return 0
+        rows = self.journal.load()
+        with self._condition:
+            for seq, calendar_id, event_id, op, data in rows:
+                key = (calendar_id, event_id)
+                if key not in self._pending:
+                    self._pending[key] = _Entry(seq, key, op, data)
+                    continue
+                # Две записи одного события: отправлявшаяся до сбоя и следующая
+                self._merge(key, op, data, Future())
+                self._journal_remove([seq])
+        if rows:
+            logger.info("Recovered %s event mutations from journal", len(rows))
+        return len(rows)
+
+    def _journal_save(self, entry: "_Entry"):
+        if self.journal is not None:
+            self.journal.save(entry.seq, entry.key, entry.op, entry.data)
+
+    def _journal_remove(self, seqs: List[int]):
+        if self.journal is not None:
+            self.journal.remove(seqs)